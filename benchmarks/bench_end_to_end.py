@@ -0,0 +1,168 @@
+# Benchmark de ponta a ponta, sem acessar os portais: as consultas são feitas contra o SAJ e o PROJUDI
+# simulados por um servidor local (benchmarks/fake_tjam.py), com latência artificial, e a vazão
+# (processos/s) de cada fluxo é comparada entre execuções para detectar regressões.
+#
+# Uso (a partir da raiz do projeto):
+#     python -m benchmarks.bench_end_to_end [--count N] [--saj-latency-ms MS] [--projudi-latency-ms MS]
+#                                            [--workers N] [--scenarios saj,saj_lote_threads,...]
+#
+# Os cenários que usam o navegador (projudi_selenium, projudi_hybrid, tjam_misto) precisam do Google
+# Chrome e são pulados se ele não puder ser iniciado. Os limites de taxa do PROJUDI e do SAJ são
+# desativados, para medir apenas o custo das consultas.
+import argparse
+import logging
+import sys
+import time
+
+import requests
+
+import core.tjam_scraper as tjam_scraper
+from core.batch_runner import run_consultation_batch
+from core.projudi_http_client import ProjudiHybridScraper
+from core.projudi_orchestrator import (
+    get_projudi_process_movement, configure_projudi_workers, configure_projudi_client, shutdown_session_pools
+)
+from core.projudi_pages import ProjudiLoginPage, ProjudiSearchPage
+from core.projudi_parser import parse_search_form
+from core.projudi_session_pool import create_projudi_driver
+
+from benchmarks.fake_tjam import (
+    FakeTjamServer, make_process_numbers, expected_result, expected_projudi_result,
+    SAJ_COM_MOVIMENTACOES, PROJUDI_ENCONTRADO
+)
+
+BENCH_USERNAME = "benchmark"
+BENCH_PASSWORD = "benchmark"
+UNLIMITED_RATE = 1e9 # Taxa (req/s) dos limitadores do SAJ e do PROJUDI durante o benchmark
+
+def _configure_for_fake(server):
+    tjam_scraper.SAJ_URL_TEMPLATE = server.saj_url_template
+    tjam_scraper.projudi_rate_limiter.rate = UNLIMITED_RATE
+    tjam_scraper.saj_rate_limiter.rate = UNLIMITED_RATE
+    ProjudiLoginPage.URL = server.projudi_url
+    # Workers em outros processos não enxergariam as URLs acima: o PROJUDI é consultado no próprio processo.
+    configure_projudi_workers(0)
+
+def _chrome_available():
+    try:
+        create_projudi_driver().quit()
+        return True
+    except Exception as e:
+        print(f"AVISO: Chrome indisponível ({e.__class__.__name__}); cenários com navegador serão pulados.", file=sys.stderr)
+        return False
+
+def bench_saj(numbers, args):
+    """`get_tjam_process_movement_with_source`, um processo por vez, em processos resolvidos no SAJ."""
+    return [tjam_scraper.get_tjam_process_movement_with_source(n, BENCH_USERNAME, BENCH_PASSWORD) for n in numbers]
+
+def _bench_batch(numbers, args, mode):
+    results = [None] * len(numbers)
+    def on_result(index, process_number, result, source):
+        results[index] = (*result, source)
+    run_consultation_batch(numbers, BENCH_USERNAME, BENCH_PASSWORD, max_workers=args.workers, on_result=on_result,
+                           mode=mode, collect_results=False)
+    return results
+
+def bench_saj_batch_threads(numbers, args):
+    """`run_consultation_batch` no modo "threads", em processos resolvidos no SAJ."""
+    return _bench_batch(numbers, args, "threads")
+
+def bench_saj_batch_asyncio(numbers, args):
+    """`run_consultation_batch` no modo "asyncio", em processos resolvidos no SAJ."""
+    return _bench_batch(numbers, args, "asyncio")
+
+def bench_projudi_http(numbers, args):
+    """Busca e detalhes do PROJUDI via HTTP (cliente híbrido), com o login feito por HTTP em vez do navegador."""
+    scraper = ProjudiHybridScraper(None)
+    session = requests.Session()
+    session.post(ProjudiLoginPage.URL + "login", data={"login": BENCH_USERNAME, "senha": BENCH_PASSWORD}).raise_for_status()
+    search_page = session.get(ProjudiLoginPage.URL + "buscas/processos")
+    scraper._search_form = parse_search_form(search_page.text, search_page.url,
+                                             ProjudiSearchPage.NUMERO_PROCESSO_FIELD_ID, ProjudiSearchPage.SEARCH_BUTTON_ID)
+    scraper.http_session = session
+    try:
+        return [scraper._lookup_http(n) for n in numbers]
+    finally:
+        session.close()
+
+def _bench_projudi_pool(numbers, mode):
+    configure_projudi_client(mode)
+    try:
+        return [get_projudi_process_movement(n, BENCH_USERNAME, BENCH_PASSWORD) for n in numbers]
+    finally:
+        shutdown_session_pools()
+
+def bench_projudi_selenium(numbers, args):
+    """`get_projudi_process_movement` com o navegador em todas as etapas (sessão reaproveitada)."""
+    return _bench_projudi_pool(numbers, "selenium")
+
+def bench_projudi_hybrid(numbers, args):
+    """`get_projudi_process_movement` no modo híbrido (login pelo navegador, consultas via HTTP)."""
+    return _bench_projudi_pool(numbers, "hybrid")
+
+def bench_tjam_mixed(numbers, args):
+    """`get_tjam_process_movement_with_source` em todos os cenários (SAJ e fallback para o PROJUDI)."""
+    configure_projudi_client(args.projudi_mode)
+    try:
+        return [tjam_scraper.get_tjam_process_movement_with_source(n, BENCH_USERNAME, BENCH_PASSWORD) for n in numbers]
+    finally:
+        shutdown_session_pools()
+
+# nome -> (função, cenários de entrada (página do SAJ, situação no PROJUDI), resultado esperado, usa o navegador)
+BENCHMARKS = {
+    "saj": (bench_saj, (SAJ_COM_MOVIMENTACOES, None), expected_result, False),
+    "saj_lote_threads": (bench_saj_batch_threads, (SAJ_COM_MOVIMENTACOES, None), expected_result, False),
+    "saj_lote_asyncio": (bench_saj_batch_asyncio, (SAJ_COM_MOVIMENTACOES, None), expected_result, False),
+    "projudi_http": (bench_projudi_http, (None, PROJUDI_ENCONTRADO), expected_projudi_result, False),
+    "projudi_selenium": (bench_projudi_selenium, (None, PROJUDI_ENCONTRADO), expected_projudi_result, True),
+    "projudi_hybrid": (bench_projudi_hybrid, (None, PROJUDI_ENCONTRADO), expected_projudi_result, True),
+    "tjam_misto": (bench_tjam_mixed, (None, None), expected_result, True),
+}
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Benchmark de ponta a ponta com SAJ e PROJUDI simulados localmente.")
+    arg_parser.add_argument("--count", type=int, default=60, help="Processos por cenário (padrão: 60).")
+    arg_parser.add_argument("--saj-latency-ms", type=float, default=50.0, help="Latência de cada resposta do SAJ (padrão: 50 ms).")
+    arg_parser.add_argument("--projudi-latency-ms", type=float, default=100.0,
+                            help="Latência de cada resposta do PROJUDI (padrão: 100 ms).")
+    arg_parser.add_argument("--workers", type=int, default=8, help="Consultas simultâneas nos cenários em lote (padrão: 8).")
+    arg_parser.add_argument("--projudi-mode", choices=["selenium", "hybrid"], default="selenium",
+                            help="Consulta ao PROJUDI no cenário tjam_misto (padrão: selenium).")
+    arg_parser.add_argument("--scenarios", default=",".join(BENCHMARKS),
+                            help=f"Cenários a executar, separados por vírgula (padrão: todos: {','.join(BENCHMARKS)}).")
+    args = arg_parser.parse_args(argv)
+
+    selected = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in selected if name not in BENCHMARKS]
+    if unknown:
+        arg_parser.error(f"Cenários desconhecidos: {', '.join(unknown)}")
+
+    logging.basicConfig(level=logging.ERROR)
+    mismatches = 0
+    with FakeTjamServer(args.saj_latency_ms / 1000, args.projudi_latency_ms / 1000) as server:
+        _configure_for_fake(server)
+        chrome_available = None
+        print(f"SAJ: {args.saj_latency_ms:.0f} ms, PROJUDI: {args.projudi_latency_ms:.0f} ms por resposta; "
+              f"{args.count} processos por cenário")
+        print(f"{'cenário':<20}{'processos':>10}{'tempo (s)':>12}{'processos/s':>14}{'divergências':>15}")
+        for name in selected:
+            bench, (saj_page, projudi_state), expected, needs_browser = BENCHMARKS[name]
+            if needs_browser:
+                if chrome_available is None:
+                    chrome_available = _chrome_available()
+                if not chrome_available:
+                    print(f"{name:<20}{'(pulado: sem Chrome)':>36}")
+                    continue
+            numbers = make_process_numbers(args.count, saj_page=saj_page, projudi=projudi_state)
+            started = time.perf_counter()
+            results = bench(numbers, args)
+            elapsed = time.perf_counter() - started
+            wrong = sum(1 for n, result in zip(numbers, results) if tuple(result) != expected(n))
+            mismatches += wrong
+            print(f"{name:<20}{len(numbers):>10}{elapsed:>12.2f}{len(numbers) / elapsed:>14.1f}{wrong:>15}")
+    if mismatches:
+        print(f"AVISO: {mismatches} resultados diferentes do esperado.", file=sys.stderr)
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+# Benchmark do parsing das páginas do SAJ: compara o parser dedicado (core/saj_parser.py)
+# com a implementação anterior (BeautifulSoup + html.parser sobre a página inteira).
+#
+# Uso (a partir da raiz do projeto):
+#     python -m benchmarks.bench_saj_parser [--repeat N] [arquivo.html ...]
+import argparse
+import re
+import sys
+import timeit
+
+from bs4 import BeautifulSoup
+
+from benchmarks.saj_pages import SAMPLE_PAGES
+from core.saj_parser import parse_saj_page, HTML_PARSER
+from utils.constants import STATUS_NAO_DISPONIVEL, STATUS_DATA_NAO_ENCONTRADA, STATUS_DESCRICAO_NAO_ENCONTRADA
+
+def legacy_parse_saj_page(html):
+    """Implementação anterior do parsing do SAJ, mantida aqui apenas como referência de desempenho."""
+    date = STATUS_NAO_DISPONIVEL
+    description = STATUS_DESCRICAO_NAO_ENCONTRADA
+    executed_name = STATUS_NAO_DISPONIVEL
+    rows = []
+
+    soup = BeautifulSoup(html, 'html.parser')
+    parts_table = soup.find('table', {'id': 'tablePartesPrincipais'})
+    if parts_table:
+        for row in parts_table.find_all('tr', class_='fundoClaro'):
+            role_span = row.find('span', class_='tipoDeParticipacao')
+            if role_span:
+                role_text = role_span.get_text(strip=True).lower()
+                is_passive_party = any(term in role_text for term in ["executado", "embargante", "requerido", "réu"])
+                is_active_party = any(term in role_text for term in ["exequente", "embargado", "requerente"])
+                if is_passive_party and not is_active_party:
+                    name_td = row.find('td', class_='nomeParteEAdvogado')
+                    if name_td:
+                        full_name_text = name_td.get_text(separator=' ', strip=True)
+                        cleaned_name = re.sub(r'advogad[oa]:\s*.*', '', full_name_text, flags=re.IGNORECASE).strip()
+                        executed_name = re.sub(r"^\(parte\s+\w+\):\s*", "", cleaned_name, flags=re.IGNORECASE).strip()
+                        executed_name = re.sub(r'\s+', ' ', executed_name).strip()
+                        break
+
+    movements_table = soup.find('table', {'id': 'tabelaTodasMovimentacoes'})
+    if not movements_table:
+        movements_table = soup.find('tbody', {'id': 'tabelaUltimasMovimentacoes'})
+    if movements_table:
+        rows = movements_table.find_all('tr', class_=['fundoClaro', 'fundoEscuro'])
+        if rows:
+            date_element = rows[0].find('td', class_='dataMovimentacao')
+            description_element = rows[0].find('td', class_='descricaoMovimentacao')
+            date = date_element.text.strip() if date_element else STATUS_DATA_NAO_ENCONTRADA
+            raw_description = description_element.text.strip() if description_element else STATUS_DESCRICAO_NAO_ENCONTRADA
+            description = re.sub(r'\s+', ' ', raw_description).strip()
+            if "processo transferido para o projudi" in description.lower():
+                return date, description, executed_name, "indica transferência"
+            return date, description, executed_name, None
+
+    page_content_text = soup.get_text().lower()
+    if "processo transferido para o projudi" in page_content_text:
+        return date, description, executed_name, "indica transferência"
+    if "não há movimentações" in page_content_text:
+        return date, description, executed_name, "sem movimentações"
+    return date, description, executed_name, "não foi possível extrair movimentações"
+
+def _best_time_per_call(func, html, repeat):
+    number = max(1, repeat)
+    return min(timeit.repeat(lambda: func(html), number=number, repeat=3)) / number
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Benchmark do parsing das páginas do SAJ.")
+    arg_parser.add_argument("--repeat", type=int, default=50, help="Execuções por medição (padrão: 50).")
+    arg_parser.add_argument("files", nargs="*", help="Páginas do SAJ salvas em disco (padrão: páginas geradas).")
+    args = arg_parser.parse_args(argv)
+
+    if args.files:
+        pages = {}
+        for path in args.files:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                pages[path] = f.read()
+    else:
+        pages = {name: build() for name, build in SAMPLE_PAGES.items()}
+
+    print(f"Parser dedicado: {HTML_PARSER} + SoupStrainer")
+    print(f"{'página':<28}{'KB':>8}{'anterior (ms)':>16}{'dedicado (ms)':>16}{'ganho':>8}")
+    mismatches = 0
+    for name, html in pages.items():
+        if legacy_parse_saj_page(html) != parse_saj_page(html):
+            mismatches += 1
+            print(f"AVISO: resultados divergentes para '{name}'", file=sys.stderr)
+        legacy = _best_time_per_call(legacy_parse_saj_page, html, args.repeat)
+        fast = _best_time_per_call(parse_saj_page, html, args.repeat)
+        print(f"{name:<28}{len(html) / 1024:>8.1f}{legacy * 1000:>16.2f}{fast * 1000:>16.2f}{legacy / fast:>7.1f}x")
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+# Benchmark do tempo de inicialização da interface gráfica: mede, em interpretadores novos, quanto tempo
+# `import main` leva (com `python -X importtime`) e, se houver display, quanto tempo passa até a janela
+# ser exibida. Falha (código de saída 1) se algum tempo ultrapassar o orçamento ou se alguma dependência
+# pesada (pandas, selenium etc.) for importada antes da primeira consulta.
+#
+# Uso (a partir da raiz do projeto):
+#     python -m benchmarks.bench_startup [--repeat N] [--budget-ms MS] [--window-budget-ms MS] [--top N]
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+IMPORT_BUDGET_MS = 300 # Orçamento para `import main` (mediana das execuções)
+WINDOW_BUDGET_MS = 800 # Orçamento do início do interpretador até a janela ser exibida
+# Dependências que só devem ser importadas ao iniciar a primeira consulta
+HEAVY_MODULES = ["pandas", "openpyxl", "selenium", "webdriver_manager", "bs4", "requests", "aiohttp", "pyarrow", "keyring"]
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Linhas do -X importtime: "import time: <próprio (us)> | <acumulado (us)> | <indentação><módulo>"
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+# Abre a janela da aplicação como em `main.py` e informa o instante (time.time()) em que ela foi exibida.
+_WINDOW_SCRIPT = """
+import time
+import tkinter as tk
+import main
+from ui.interface import AppUI
+root = tk.Tk()
+AppUI(root, main.main_load_excel_action, main.main_start_consultation_action, main.main_save_credentials_action,
+      main.main_load_initial_credentials_action, main.main_get_loaded_credentials_func)
+def on_map(event):
+    if event.widget is root:
+        print(time.time(), flush=True)
+        root.after(0, root.destroy)
+root.bind("<Map>", on_map)
+root.mainloop()
+"""
+
+def measure_imports(module="main"):
+    """
+    Importa `module` em um interpretador novo com -X importtime.
+
+    Returns:
+        tuple: (tempo acumulado do módulo em ms, {módulo: tempo acumulado em ms} de todos os importados).
+    """
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=PROJECT_ROOT,
+                               capture_output=True, text=True, check=True)
+    cumulative = {}
+    for line in completed.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            cumulative[match.group(4)] = int(match.group(2)) / 1000
+    return cumulative[module], cumulative
+
+def measure_window():
+    """
+    Returns:
+        float or None: Milissegundos do início do interpretador até a janela ser exibida (None se não houver display).
+    """
+    started = time.time()
+    completed = subprocess.run([sys.executable, "-c", _WINDOW_SCRIPT], cwd=PROJECT_ROOT, capture_output=True, text=True)
+    if completed.returncode != 0:
+        print(f"AVISO: janela não pôde ser aberta ({completed.stderr.strip().splitlines()[-1]}); medição pulada.",
+              file=sys.stderr)
+        return None
+    return (float(completed.stdout.split()[0]) - started) * 1000
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark do tempo de inicialização da interface gráfica.")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="Execuções de cada medição (é usada a mediana).")
+    arg_parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS, help="Orçamento para `import main`.")
+    arg_parser.add_argument("--window-budget-ms", type=float, default=WINDOW_BUDGET_MS,
+                            help="Orçamento até a janela ser exibida.")
+    arg_parser.add_argument("--top", type=int, default=10, help="Quantos módulos mais lentos listar.")
+    args = arg_parser.parse_args()
+
+    measure_imports() # Aquecimento: compila os .pyc, que o executável empacotado já traz prontos
+    runs = [measure_imports() for _ in range(max(1, args.repeat))]
+    import_ms = statistics.median(total for total, _ in runs)
+    modules = runs[-1][1]
+    failures = []
+
+    print(f"import main: {import_ms:.1f} ms (mediana de {len(runs)}; orçamento {args.budget_ms:.0f} ms)")
+    print("Módulos mais lentos (acumulado, última execução):")
+    for name, ms in sorted(modules.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {ms:8.1f} ms  {name}")
+    if import_ms > args.budget_ms:
+        failures.append(f"import main levou {import_ms:.1f} ms (orçamento: {args.budget_ms:.0f} ms)")
+
+    heavy = sorted({name.split(".")[0] for name in modules} & set(HEAVY_MODULES))
+    if heavy:
+        failures.append(f"dependências pesadas importadas na inicialização: {', '.join(heavy)}")
+
+    window_runs = []
+    for _ in range(max(1, args.repeat)):
+        window_run = measure_window()
+        if window_run is None:
+            break
+        window_runs.append(window_run)
+    else:
+        window_ms = statistics.median(window_runs)
+        print(f"Janela exibida em: {window_ms:.1f} ms (mediana de {len(window_runs)}; orçamento {args.window_budget_ms:.0f} ms)")
+        if window_ms > args.window_budget_ms:
+            failures.append(f"a janela levou {window_ms:.1f} ms para ser exibida (orçamento: {args.window_budget_ms:.0f} ms)")
+
+    for failure in failures:
+        print(f"FALHA: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
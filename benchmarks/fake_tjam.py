@@ -0,0 +1,298 @@
+# Servidor HTTP local que imita o SAJ (cpopg/show.do) e o PROJUDI (login, menu, busca e detalhes,
+# com os mesmos frames e IDs de elementos usados pelas Page Objects e pelo cliente HTTP), com
+# latência artificial configurável. Usado pelos benchmarks de ponta a ponta, sem acessar os portais.
+#
+# O comportamento de cada processo é determinado pelo seu número sequencial (ver `SCENARIOS`),
+# de modo que o resultado esperado de cada consulta é conhecido (`expected_result`).
+import html
+import secrets
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from benchmarks.saj_pages import build_saj_page
+
+from utils.constants import (
+    STATUS_NAO_DISPONIVEL, STATUS_SEGREDO_JUSTICA, PROJUDI_PROCESS_NAO_ENCONTRADO, SOURCE_SAJ, SOURCE_PROJUDI
+)
+
+# Cenários (página do SAJ, situação no PROJUDI), atribuídos pelo número sequencial do processo.
+SAJ_COM_MOVIMENTACOES = "com_movimentacoes"
+SAJ_TRANSFERIDO = "transferido_projudi"
+SAJ_SEM_MOVIMENTACOES = "sem_movimentacoes"
+SAJ_SEM_TABELA = "sem_tabela"
+
+PROJUDI_ENCONTRADO = "encontrado"
+PROJUDI_SEGREDO = "segredo"
+PROJUDI_NAO_ENCONTRADO = "nao_encontrado"
+
+SCENARIOS = [
+    (SAJ_COM_MOVIMENTACOES, None),
+    (SAJ_COM_MOVIMENTACOES, None),
+    (SAJ_TRANSFERIDO, PROJUDI_ENCONTRADO),
+    (SAJ_SEM_MOVIMENTACOES, PROJUDI_ENCONTRADO),
+    (SAJ_SEM_TABELA, PROJUDI_SEGREDO),
+    (SAJ_TRANSFERIDO, PROJUDI_NAO_ENCONTRADO),
+]
+
+SAJ_DESCRIPTION = "Conclusos para Despacho"
+SAJ_EXECUTED_NAME = "JOSÉ DA SILVA"
+PROJUDI_DATE = "15/05/2024"
+PROJUDI_DESCRIPTION = "Juntada de Petição de Manifestação"
+PROJUDI_EXECUTED_NAME = "MARIA DE SOUZA"
+INVALID_PASSWORD = "senha-invalida" # Senha recusada pelo login do PROJUDI simulado
+
+SESSION_COOKIE = "JSESSIONID"
+
+def make_process_number(sequential, year=2020, segment="8", court="04", origin="0001"):
+    """Monta um número CNJ (NNNNNNN-DD.AAAA.J.TR.OOOO) com dígitos verificadores válidos."""
+    check_digits = 98 - int(f"{sequential:07d}{year}{segment}{court}{origin}00") % 97
+    return f"{sequential:07d}-{check_digits:02d}.{year}.{segment}.{court}.{origin}"
+
+def scenario_for(process_number):
+    """Retorna o cenário (página do SAJ, situação no PROJUDI) do processo."""
+    return SCENARIOS[int(process_number[:7]) % len(SCENARIOS)]
+
+def make_process_numbers(count, saj_page=None, projudi=None):
+    """
+    Gera `count` números de processo, opcionalmente apenas dos cenários com a página do SAJ
+    `saj_page` e/ou a situação no PROJUDI `projudi`.
+    """
+    numbers = []
+    sequential = 1
+    while len(numbers) < count:
+        page, projudi_state = SCENARIOS[sequential % len(SCENARIOS)]
+        if (saj_page is None or page == saj_page) and (projudi is None or projudi_state == projudi):
+            numbers.append(make_process_number(sequential))
+        sequential += 1
+    return numbers
+
+def expected_projudi_result(process_number):
+    """Resultado esperado de `get_projudi_process_movement` para o processo: (data, descricao, nome_executado)."""
+    projudi_state = scenario_for(process_number)[1]
+    if projudi_state == PROJUDI_ENCONTRADO:
+        return PROJUDI_DATE, PROJUDI_DESCRIPTION, PROJUDI_EXECUTED_NAME
+    if projudi_state == PROJUDI_SEGREDO:
+        return STATUS_NAO_DISPONIVEL, STATUS_SEGREDO_JUSTICA, STATUS_NAO_DISPONIVEL
+    return STATUS_NAO_DISPONIVEL, PROJUDI_PROCESS_NAO_ENCONTRADO, STATUS_NAO_DISPONIVEL
+
+def expected_result(process_number):
+    """Resultado esperado de `get_tjam_process_movement_with_source`: (data, descricao, nome_executado, sistema)."""
+    saj_page, _ = scenario_for(process_number)
+    if saj_page == SAJ_COM_MOVIMENTACOES:
+        # A descrição inclui o complemento da movimentação (ver `benchmarks.saj_pages`).
+        return "28/05/2024", f"{SAJ_DESCRIPTION} Complemento da movimentação 0", SAJ_EXECUTED_NAME, SOURCE_SAJ
+    return (*expected_projudi_result(process_number), SOURCE_PROJUDI)
+
+# Páginas do PROJUDI simulado. O login e o menu ficam no frame "mainFrame"; a busca e os
+# detalhes, no frame "userMainFrame" dentro dele, como no portal.
+_PROJUDI_ROOT = """<html><head><title>Projudi</title></head>
+<body style="margin:0"><iframe id="mainFrame" name="mainFrame" src="/projudi/main" style="width:100%;height:900px;border:0"></iframe></body></html>"""
+
+_PROJUDI_LOGIN = """<html><head><title>Projudi - Login</title></head><body>
+<form name="formLogin" action="/projudi/login" method="post">
+{error}
+<table><tr><td>Login:</td><td><input type="text" id="login" name="login"></td></tr>
+<tr><td>Senha:</td><td><input type="password" id="senha" name="senha"></td></tr></table>
+<input type="submit" id="btEntrar" name="btEntrar" value="Entrar">
+</form></body></html>"""
+
+_PROJUDI_HOME = """<html><head><title>Projudi</title></head><body>
+<div id="menu">
+<span id="Stm0p0i7eTX">Buscas</span>
+<a id="Stm0p7i0e" href="/projudi/buscas/processos" target="userMainFrame">Processos 1&ordm; Grau</a>
+</div>
+<iframe id="userMainFrame" name="userMainFrame" src="/projudi/inicio" style="width:100%;height:800px;border:0"></iframe>
+</body></html>"""
+
+_PROJUDI_WELCOME = "<html><body><h3>Bem-vindo ao Projudi</h3></body></html>"
+
+_PROJUDI_SEARCH_FORM = """<html><head><title>Busca de Processos</title></head><body>
+<form id="formBusca" name="formBusca" action="/projudi/buscas/processos" method="post">
+<input type="hidden" name="acao" value="pesquisar">
+<input type="hidden" name="instancia" value="1">
+<table class="form"><tr><td>N&uacute;mero do processo:</td>
+<td><input type="text" id="numeroProcesso" name="numeroProcesso" value=""></td></tr></table>
+<input type="submit" id="pesquisar" name="pesquisar" value="Pesquisar">
+<input type="button" id="limpar" name="limpar" value="Limpar">
+</form>
+{results}
+</body></html>"""
+
+_PROJUDI_RESULT_ROW = """<table class="resultTable"><thead><tr><th>#</th><th>Processo</th><th>Partes</th></tr></thead>
+<tr><td>1</td><td><a href="/projudi/processo?numero={number}">{number}</a></td><td>{parties}</td></tr></table>"""
+
+_PROJUDI_PARTIES = """<table class="form">
+<tr><td><font>Requerente:</font></td><td><ul><li>BANCO EXEMPLO S/A</li></ul></td></tr>
+<tr><td><font>Requerido:</font></td><td><ul><li>{executed_name}</li></ul></td></tr>
+</table>"""
+
+_PROJUDI_DETAIL = """<html><head><title>Processo {number}</title></head><body>
+<h3>Processo {number}</h3>
+<table class="resultTable"><thead><tr><th>Seq.</th><th>Usu&aacute;rio</th><th>Data</th><th>Evento</th></tr></thead>
+<tbody>{rows}</tbody></table>
+</body></html>"""
+
+_PROJUDI_MOVEMENT_ROW = "<tr><td>{seq}</td><td>SERVIDOR</td><td>{date} 10:32:00</td><td><b>{description}</b><br>Complemento {seq}</td></tr>"
+
+def _projudi_results_html(process_number):
+    projudi_state = scenario_for(process_number)[1]
+    if projudi_state not in (PROJUDI_ENCONTRADO, PROJUDI_SEGREDO):
+        return "<div class=\"mensagem\">Nenhum registro encontrado</div>"
+    if projudi_state == PROJUDI_SEGREDO:
+        parties = STATUS_SEGREDO_JUSTICA
+    else:
+        parties = _PROJUDI_PARTIES.format(executed_name=PROJUDI_EXECUTED_NAME)
+    return _PROJUDI_RESULT_ROW.format(number=html.escape(process_number), parties=parties)
+
+def _projudi_detail_html(process_number, movements=30):
+    rows = []
+    for seq in range(movements, 0, -1):
+        if seq == movements:
+            date, description = PROJUDI_DATE, PROJUDI_DESCRIPTION
+        else:
+            date, description = f"{(seq % 28) + 1:02d}/04/2024", f"Movimenta&ccedil;&atilde;o {seq}"
+        rows.append(_PROJUDI_MOVEMENT_ROW.format(seq=seq, date=date, description=description))
+    return _PROJUDI_DETAIL.format(number=html.escape(process_number), rows="".join(rows))
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # Mantém as conexões abertas (keep-alive), como os portais
+    disable_nagle_algorithm = True # Cabeçalhos e corpo são enviados separadamente; sem isso, cada resposta atrasa ~40 ms
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, body, status=200, headers=()):
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _form(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return {name: values[0] for name, values in parse_qs(self.rfile.read(length).decode("utf-8")).items()}
+
+    def _has_session(self):
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        return SESSION_COOKIE in cookie and self.server.fake.is_session(cookie[SESSION_COOKIE].value)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {name: values[0] for name, values in parse_qs(url.query).items()}
+        if url.path.startswith("/cpopg/"):
+            self.server.fake.delay(self.server.fake.saj_latency)
+            if url.path != "/cpopg/show.do":
+                return self._send("<html><body>Não encontrado</body></html>", status=404)
+            process_number = query.get("processo.numero", "")
+            saj_page, _ = scenario_for(process_number)
+            return self._send(build_saj_page(process_number=process_number, executed_name=SAJ_EXECUTED_NAME,
+                                             first_description=SAJ_DESCRIPTION,
+                                             transferred=saj_page == SAJ_TRANSFERIDO,
+                                             no_movements_message=saj_page == SAJ_SEM_MOVIMENTACOES,
+                                             with_movement_table=saj_page != SAJ_SEM_TABELA))
+
+        self.server.fake.delay(self.server.fake.projudi_latency)
+        if url.path in ("/projudi", "/projudi/"):
+            return self._send(_PROJUDI_ROOT)
+        if url.path == "/projudi/main":
+            return self._send(_PROJUDI_HOME if self._has_session() else _PROJUDI_LOGIN.format(error=""))
+        if not self._has_session():
+            return self._send(_PROJUDI_LOGIN.format(error=""))
+        if url.path == "/projudi/inicio":
+            return self._send(_PROJUDI_WELCOME)
+        if url.path == "/projudi/buscas/processos":
+            return self._send(_PROJUDI_SEARCH_FORM.format(results=""))
+        if url.path == "/projudi/processo":
+            return self._send(_projudi_detail_html(query.get("numero", "")))
+        return self._send("<html><body>Não encontrado</body></html>", status=404)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        form = self._form()
+        self.server.fake.delay(self.server.fake.projudi_latency)
+        if url.path == "/projudi/login":
+            if not form.get("login") or form.get("senha") == INVALID_PASSWORD:
+                return self._send(_PROJUDI_LOGIN.format(error='<font color="red">Usuário ou senha inválida</font>'))
+            token = self.server.fake.new_session()
+            return self._send(_PROJUDI_HOME, headers=[("Set-Cookie", f"{SESSION_COOKIE}={token}; Path=/projudi")])
+        if not self._has_session():
+            return self._send(_PROJUDI_LOGIN.format(error=""))
+        if url.path == "/projudi/buscas/processos":
+            process_number = form.get("numeroProcesso", "").strip()
+            return self._send(_PROJUDI_SEARCH_FORM.format(results=_projudi_results_html(process_number)))
+        return self._send("<html><body>Não encontrado</body></html>", status=404)
+
+class FakeTjamServer:
+    """
+    Servidor local com o SAJ e o PROJUDI simulados, executado em uma thread.
+
+    Args:
+        saj_latency (float): Atraso (s) acrescentado a cada resposta do SAJ.
+        projudi_latency (float): Atraso (s) acrescentado a cada resposta do PROJUDI.
+    """
+    def __init__(self, saj_latency=0.0, projudi_latency=0.0, host="127.0.0.1", port=0):
+        self.saj_latency = saj_latency
+        self.projudi_latency = projudi_latency
+        self._sessions = set()
+        self._sessions_lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.fake = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def saj_url_template(self):
+        """Equivalente local de `core.tjam_scraper.SAJ_URL_TEMPLATE`."""
+        return self.base_url + "/cpopg/show.do?&processo.numero={process_number}"
+
+    @property
+    def projudi_url(self):
+        """Equivalente local de `ProjudiLoginPage.URL`."""
+        return self.base_url + "/projudi/"
+
+    def delay(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def new_session(self):
+        token = secrets.token_hex(16)
+        with self._sessions_lock:
+            self._sessions.add(token)
+        return token
+
+    def is_session(self, token):
+        with self._sessions_lock:
+            return token in self._sessions
+
+    def expire_sessions(self):
+        """Invalida todas as sessões do PROJUDI (simula a expiração da sessão no portal)."""
+        with self._sessions_lock:
+            self._sessions.clear()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-tjam", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
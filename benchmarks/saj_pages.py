@@ -0,0 +1,103 @@
+# Geradores de páginas do SAJ (cpopg/show.do) com a mesma estrutura das páginas reais,
+# usados pelos benchmarks para medir o desempenho sem acessar o portal do tribunal.
+
+_PAGE_HEADER = """<!DOCTYPE html>
+<html lang="pt-br">
+<head>
+<meta charset="utf-8">
+<title>Consulta de Processos de 1&ordm; Grau</title>
+<link rel="stylesheet" href="/cpopg/css/saj.css">
+<script src="/cpopg/js/jquery.js"></script>
+<script>var contexto = '/cpopg'; function exibirMovimentacoes() {{ return false; }}</script>
+</head>
+<body>
+<div id="cabecalho">{menu}</div>
+<div class="unj-entity-header">
+<span id="numeroProcesso">{process_number}</span>
+<span id="classeProcesso">Execu&ccedil;&atilde;o de T&iacute;tulo Extrajudicial</span>
+</div>
+"""
+
+_PAGE_FOOTER = """
+<div id="rodape">{footer}</div>
+</body>
+</html>
+"""
+
+_PARTS_TABLE = """
+<table id="tablePartesPrincipais" style="margin-left:15px; margin-top:1px;">
+<tr class="fundoClaro">
+<td valign="top"><span class="mensagemExibindo tipoDeParticipacao">Exequente&nbsp;</span></td>
+<td class="nomeParteEAdvogado" style="padding-bottom: 5px;">BANCO EXEMPLO S/A
+<br><span class="mensagemExibindo">Advogado:&nbsp;</span>Fulano de Tal</td>
+</tr>
+<tr class="fundoClaro">
+<td valign="top"><span class="mensagemExibindo tipoDeParticipacao">Executado&nbsp;</span></td>
+<td class="nomeParteEAdvogado" style="padding-bottom: 5px;">{executed_name}
+<br><span class="mensagemExibindo">Advogada:&nbsp;</span>Beltrana de Souza</td>
+</tr>
+</table>
+"""
+
+_MOVEMENT_ROW = """
+<tr class="{css_class} containerMovimentacao">
+<td class="dataMovimentacao">{date}</td>
+<td class="descricaoMovimentacao">
+{description}
+<br><span style="font-style: italic;">Complemento da movimenta&ccedil;&atilde;o {seq}</span>
+</td>
+</tr>
+"""
+
+def _menu(size):
+    return "".join(f'<a href="/cpopg/menu{i}.do" class="menuItem">Item de menu {i}</a>' for i in range(size))
+
+def build_saj_page(process_number="0600000-00.2020.8.04.0001", movements=40, executed_name="JOSÉ DA SILVA",
+                   first_description="Conclusos para Despacho", transferred=False, no_movements_message=False,
+                   with_movement_table=True, filler=200):
+    """
+    Monta uma página de processo do SAJ.
+
+    Args:
+        process_number (str): Número exibido no cabeçalho.
+        movements (int): Quantidade de linhas na tabela de movimentações.
+        executed_name (str): Nome da parte passiva na tabela de partes.
+        first_description (str): Descrição da movimentação mais recente.
+        transferred (bool): Se a movimentação mais recente indica transferência para o PROJUDI.
+        no_movements_message (bool): Inclui a mensagem "Não há movimentações" no lugar da tabela.
+        with_movement_table (bool): Se a tabela de movimentações está presente.
+        filler (int): Quantidade de itens de menu/rodapé, para aproximar o tamanho das páginas reais.
+
+    Returns:
+        str: O HTML da página.
+    """
+    parts = [_PAGE_HEADER.format(menu=_menu(filler), process_number=process_number)]
+    parts.append(_PARTS_TABLE.format(executed_name=executed_name))
+
+    if no_movements_message:
+        parts.append('<div class="mensagemRetorno">N&atilde;o h&aacute; movimenta&ccedil;&otilde;es para este processo.</div>')
+    elif with_movement_table:
+        parts.append('<table id="tabelaTodasMovimentacoes" class="movimentacoes">')
+        for seq in range(movements):
+            if seq == 0:
+                description = "Processo transferido para o PROJUDI" if transferred else first_description
+            else:
+                description = f"Juntada de Peti&ccedil;&atilde;o {seq}"
+            day = 28 - (seq % 28)
+            parts.append(_MOVEMENT_ROW.format(
+                css_class="fundoClaro" if seq % 2 == 0 else "fundoEscuro",
+                date=f"{day:02d}/05/2024",
+                description=description,
+                seq=seq
+            ))
+        parts.append('</table>')
+
+    parts.append(_PAGE_FOOTER.format(footer=_menu(filler)))
+    return "".join(parts)
+
+SAMPLE_PAGES = {
+    "com_movimentacoes": lambda: build_saj_page(),
+    "transferido_projudi": lambda: build_saj_page(transferred=True),
+    "sem_movimentacoes": lambda: build_saj_page(no_movements_message=True),
+    "sem_tabela": lambda: build_saj_page(with_movement_table=False),
+}
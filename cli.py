@@ -0,0 +1,181 @@
+# Ponto de entrada de linha de comando: executa uma consulta em lote sem interface gráfica
+# (por exemplo, em um servidor Linux sem display, via cron). Não importa o Tkinter.
+#
+# Uso:
+#     python cli.py processos.xlsx -o resultados.xlsx [--workers 8] [--mode threads|asyncio] [--projudi-workers 4] [--projudi-mode selenium|hybrid] [--resume] [--full-history]
+#     python cli.py processos.xlsx --watch [--watch-interval 72] [--recheck-after 24] [--report-dir relatorios]
+#
+# As credenciais do PROJUDI são lidas das variáveis de ambiente PROJUDI_USERNAME e PROJUDI_PASSWORD
+# ou, na ausência delas, do keyring/config.ini (como na interface gráfica).
+# Ao final, um resumo em JSON é escrito na saída padrão; os logs vão para a saída de erro.
+# No modo de acompanhamento (--watch), a planilha é verificada periodicamente, cada verificação escreve
+# uma linha de resumo em JSON e apenas os processos com movimentação nova vão para o relatório de alterações.
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+
+from utils.constants import (
+    SAJ_MAX_WORKERS, SAJ_CLIENT_MODE, PROJUDI_WORKER_PROCESSES, PROJUDI_CLIENT_MODE, CLI_ENV_USERNAME, CLI_ENV_PASSWORD,
+    METRICS_JSON_PATH, METRICS_PROMETHEUS_PATH, HISTORY_DIR, OUTPUT_FORMAT_DEFAULT, OUTPUT_FORMATS, WATCH_INTERVAL_HOURS, WATCH_RECHECK_AFTER_HOURS, WATCH_REPORT_DIR
+)
+
+# Códigos de saída
+EXIT_OK = 0 # Todos os processos consultados e resultados salvos
+EXIT_FAILED = 1 # Erro inesperado ou resultados não salvos
+EXIT_INPUT_ERROR = 2 # Planilha de entrada inválida ou argumentos incorretos
+EXIT_PARTIAL = 3 # Resultados salvos, mas algumas consultas falharam
+
+def resolve_credentials():
+    """
+    Obtém as credenciais do PROJUDI das variáveis de ambiente ou, se ausentes, do keyring/config.ini.
+
+    Returns:
+        tuple: (username, password); valores vazios se não houver credenciais configuradas.
+    """
+    username = os.environ.get(CLI_ENV_USERNAME)
+    password = os.environ.get(CLI_ENV_PASSWORD)
+    if username and password:
+        return username, password
+    from utils.config_manager import load_credentials
+    return load_credentials()
+
+def default_output_path(input_path, output_format=OUTPUT_FORMAT_DEFAULT):
+    # A extensão de cada formato é o próprio nome do formato (ver `utils.result_writers`)
+    base_name = os.path.splitext(input_path)[0]
+    return f"{base_name}_resultados.{output_format}"
+
+def resolve_output_format(output_path, requested_format):
+    """
+    Formato do arquivo de resultados: o de --format ou, sem ele, o da extensão de -o (padrão: xlsx).
+
+    Raises:
+        ValueError: Se --format não corresponder à extensão de -o (por exemplo, `-o saida.xlsx --format csv`).
+    """
+    from utils.result_writers import format_for_path
+    extension_format = format_for_path(output_path, default=None) if output_path else None
+    if requested_format and extension_format and requested_format != extension_format:
+        raise ValueError(f"--format {requested_format} não corresponde à extensão do arquivo de saída {output_path} "
+                         f"(use --format {extension_format} ou um arquivo .{requested_format}).")
+    output_format = requested_format or extension_format or OUTPUT_FORMAT_DEFAULT
+    if output_path and extension_format is None:
+        logging.warning(f"Extensão de {output_path} não reconhecida; os resultados serão gravados no formato {output_format}.")
+    return output_format
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Consulta em lote da última movimentação de processos no TJAM (SAJ e PROJUDI).")
+    parser.add_argument("input", help="Planilha de entrada (.xlsx/.xls) com a coluna 'PROCESSO' ou 'processo'.")
+    parser.add_argument("-o", "--output", help="Arquivo de resultados (padrão: <entrada>_resultados.<formato>).")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default=None,
+                        help="Formato do arquivo de resultados (padrão: pela extensão de --output, ou xlsx; "
+                             "deve corresponder à extensão de --output, se informada). "
+                             "Parquet e Arrow IPC requerem o pyarrow.")
+    parser.add_argument("-w", "--workers", type=int, default=SAJ_MAX_WORKERS,
+                        help=f"Número de consultas simultâneas (padrão: {SAJ_MAX_WORKERS}).")
+    parser.add_argument("--mode", choices=["threads", "asyncio"], default=SAJ_CLIENT_MODE,
+                        help=f"Cliente HTTP do SAJ (padrão: {SAJ_CLIENT_MODE}).")
+    parser.add_argument("--projudi-workers", type=int, default=PROJUDI_WORKER_PROCESSES,
+                        help=f"Processos de consulta ao PROJUDI, cada um com seu navegador (padrão: {PROJUDI_WORKER_PROCESSES}; "
+                             f"0 consulta no próprio processo).")
+    parser.add_argument("--projudi-mode", choices=["selenium", "hybrid"], default=PROJUDI_CLIENT_MODE,
+                        help=f"Consulta ao PROJUDI: navegador em todas as etapas ou apenas no login (padrão: {PROJUDI_CLIENT_MODE}).")
+    parser.add_argument("--resume", action="store_true",
+                        help="Retoma a consulta interrompida deste arquivo a partir do diário de checkpoint.")
+    parser.add_argument("--metrics-json", default=METRICS_JSON_PATH,
+                        help=f"Arquivo com os tempos por etapa do lote, em JSON (padrão: {METRICS_JSON_PATH}; vazio para não gravar).")
+    parser.add_argument("--prometheus-textfile", default=METRICS_PROMETHEUS_PATH,
+                        help=f"Arquivo .prom para o coletor textfile do node_exporter (padrão: {METRICS_PROMETHEUS_PATH}; vazio para não gravar).")
+    parser.add_argument("--full-history", action="store_true",
+                        help="Grava também todas as movimentações de cada processo (histórico completo) em Parquet; requer pyarrow.")
+    parser.add_argument("--history-dir", default=HISTORY_DIR,
+                        help=f"Diretório do histórico completo, particionado pela data da execução (padrão: {HISTORY_DIR}).")
+    parser.add_argument("--watch", action="store_true",
+                        help="Modo de acompanhamento: verifica a planilha periodicamente e grava apenas os processos com "
+                             "movimentação nova em um relatório de alterações (ignora -o e --resume).")
+    parser.add_argument("--watch-interval", type=float, default=WATCH_INTERVAL_HOURS,
+                        help=f"Horas entre as verificações no modo de acompanhamento (padrão: {WATCH_INTERVAL_HOURS:g}; "
+                             f"0 faz uma única verificação, por exemplo via cron).")
+    parser.add_argument("--recheck-after", type=float, default=WATCH_RECHECK_AFTER_HOURS,
+                        help=f"Pula os processos verificados há menos horas que isso (padrão: {WATCH_RECHECK_AFTER_HOURS:g}).")
+    parser.add_argument("--report-dir", default=WATCH_REPORT_DIR,
+                        help=f"Diretório dos relatórios de alterações (padrão: {WATCH_REPORT_DIR}).")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Exibe os logs detalhados de cada processo.")
+    return parser
+
+def run_watch(args, username, password):
+    """Executa o modo de acompanhamento, escrevendo o resumo de cada verificação na saída padrão."""
+    from core.watch import watch_portfolio
+
+    exit_code = EXIT_OK
+    def on_cycle(summary):
+        nonlocal exit_code
+        exit_code = EXIT_PARTIAL if summary["errors"] else EXIT_OK
+        print(json.dumps(summary, ensure_ascii=False), flush=True)
+
+    try:
+        watch_portfolio(args.input, username, password, on_cycle, interval_hours=args.watch_interval,
+                        report_dir=args.report_dir, recheck_after_hours=args.recheck_after, max_workers=args.workers,
+                        mode=args.mode)
+    except KeyboardInterrupt:
+        logging.warning("Acompanhamento interrompido.")
+    return exit_code
+
+def main(argv=None):
+    arg_parser = build_arg_parser()
+    args = arg_parser.parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        stream=sys.stderr
+    )
+    try:
+        output_format = resolve_output_format(args.output, args.format)
+    except ValueError as e:
+        arg_parser.error(str(e)) # Sai com o código 2 (EXIT_INPUT_ERROR), como os demais erros de argumentos
+
+    from core.consultation import run_excel_consultation # Importado após configurar o logging
+    from core.projudi_orchestrator import configure_projudi_workers, configure_projudi_client
+    configure_projudi_workers(args.projudi_workers)
+    configure_projudi_client(args.projudi_mode)
+
+    output_path = args.output or default_output_path(args.input, output_format)
+    summary = {"input": args.input, "output": None}
+    exit_code = EXIT_OK
+
+    if not os.path.isfile(args.input):
+        summary["error"] = f"Arquivo de entrada não encontrado: {args.input}"
+        exit_code = EXIT_INPUT_ERROR
+    else:
+        username, password = resolve_credentials()
+        if not (username and password):
+            logging.warning("Credenciais do PROJUDI não configuradas; processos que dependerem do PROJUDI não serão consultados.")
+        try:
+            if args.watch:
+                return run_watch(args, username, password)
+            summary = run_excel_consultation(args.input, username, password, lambda writer: writer.finalize(output_path),
+                                             resume=args.resume, max_workers=args.workers, mode=args.mode,
+                                             metrics_json_path=args.metrics_json or None,
+                                             metrics_prometheus_path=args.prometheus_textfile or None,
+                                             history_dir=args.history_dir if args.full_history else None,
+                                             output_format=output_format)
+            if summary["total"] and not summary["output"]:
+                exit_code = EXIT_FAILED
+            elif summary["errors"]:
+                exit_code = EXIT_PARTIAL
+        except (ValueError, ImportError) as e:
+            summary["error"] = str(e)
+            exit_code = EXIT_INPUT_ERROR
+        except Exception as e:
+            logging.error(f"Ocorreu um erro inesperado durante a consulta: {e}", exc_info=True)
+            summary["error"] = str(e)
+            exit_code = EXIT_FAILED
+
+    summary["exit_code"] = exit_code
+    print(json.dumps(summary, ensure_ascii=False))
+    return exit_code
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
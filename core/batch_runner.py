@@ -0,0 +1,168 @@
+# Este módulo executa a consulta de um lote de processos de forma concorrente,
+# usando um pool limitado de threads e a sessão HTTP compartilhada do SAJ.
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from core.tjam_scraper import get_tjam_process_movement_with_source, configure_http_session
+
+from utils.constants import (
+    STATUS_NAO_DISPONIVEL, STATUS_CONSULTA_FALHOU, SOURCE_SAJ, SOURCE_CACHE,
+    SAJ_MAX_WORKERS, SAJ_CLIENT_MODE, BATCH_DUPLICATE_WINDOW
+)
+
+logger = logging.getLogger(__name__)
+
+def _consult_process(process_number, username, password, routing_index=None, fingerprints=None):
+    try:
+        return get_tjam_process_movement_with_source(process_number, username, password, routing_index, fingerprints)
+    except Exception as e:
+        logger.error(f"Erro inesperado ao consultar o processo {process_number}: {e}", exc_info=True)
+        return STATUS_NAO_DISPONIVEL, STATUS_CONSULTA_FALHOU, STATUS_NAO_DISPONIVEL, SOURCE_SAJ
+
+def _run_lookups_threaded(lookups, username, password, max_workers, on_result, routing_index=None, fingerprints=None):
+    """
+    Executa as consultas em um pool de threads, com no máximo `max_workers` em andamento e apenas
+    uma pequena janela de `lookups` lida antecipadamente.
+    """
+    configure_http_session(max_workers)
+
+    max_in_flight = max_workers * 2 # Mantém os workers ocupados sem ler toda a entrada de uma vez
+    lookups_iter = iter(lookups)
+    exhausted = False
+    pending = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="consulta") as executor:
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_in_flight:
+                try:
+                    index, process_number = next(lookups_iter)
+                except StopIteration:
+                    exhausted = True
+                    break
+                future = executor.submit(_consult_process, process_number, username, password, routing_index, fingerprints)
+                pending[future] = (index, process_number)
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, process_number = pending.pop(future)
+                *result, source = future.result()
+                on_result(index, process_number, tuple(result), source)
+
+def in_input_order(callback):
+    """
+    Adapta um callback `on_result` para ser chamado na ordem da entrada, e não na ordem de conclusão.
+    Resultados que chegam adiantados ficam retidos apenas até os anteriores ficarem prontos.
+    """
+    held = {}
+    next_index = 0
+
+    def ordered_callback(index, process_number, result, source):
+        nonlocal next_index
+        held[index] = (process_number, result, source)
+        while next_index in held:
+            callback(next_index, *held.pop(next_index))
+            next_index += 1
+
+    return ordered_callback
+
+def run_consultation_batch(process_numbers, username, password, max_workers=SAJ_MAX_WORKERS, on_result=None, mode=SAJ_CLIENT_MODE,
+                           cache=None, resolve_locally=None, collect_results=True, routing_index=None, fingerprints=None,
+                           duplicate_window=BATCH_DUPLICATE_WINDOW):
+    """
+    Consulta um lote de processos em paralelo (SAJ com fallback para o PROJUDI).
+
+    No máximo `max_workers` consultas ficam em andamento ao mesmo tempo, e apenas uma pequena janela
+    de processos é lida antecipadamente de `process_numbers`, que pode ser qualquer iterável.
+    Com `mode="asyncio"`, as consultas são feitas por `core.saj_async_client`, e `max_workers` passa a
+    ser o limite de conexões simultâneas ao SAJ. Números repetidos são consultados uma única vez, e o
+    resultado é entregue a todas as suas posições.
+
+    Para que a memória não cresça com o tamanho do lote, apenas os `duplicate_window` resultados usados
+    mais recentemente ficam guardados para as repetições. Uma repetição mais distante é resolvida como
+    um número novo: pelo cache (onde o resultado já foi gravado) ou, sem cache, por uma nova consulta.
+
+    Args:
+        process_numbers (iterable): Os números dos processos a consultar.
+        username (str): Nome de usuário do PROJUDI.
+        password (str): Senha do PROJUDI.
+        max_workers (int): Número de consultas simultâneas.
+        on_result (callable, optional): Chamado como `on_result(indice, numero, resultado, sistema_de_origem)`
+            a cada consulta concluída, na ordem de conclusão e sempre a partir da mesma thread.
+            O sistema de origem é `SOURCE_SAJ`, `SOURCE_PROJUDI` ou `SOURCE_CACHE`.
+        mode (str): "threads" (padrão) ou "asyncio".
+        cache (ResultCache, optional): Cache consultado antes de cada consulta e atualizado com os novos resultados.
+        resolve_locally (callable, optional): Chamado como `resolve_locally(numero)` antes de qualquer consulta;
+            se retornar `(data, descricao, nome_executado, sistema_de_origem)`, o resultado é entregue sem
+            consultar os portais nem o cache (por exemplo, números inválidos ou já gravados em um checkpoint).
+        routing_index (RoutingIndex, optional): Índice que envia direto ao PROJUDI os processos previstos nele.
+        fingerprints (SajFingerprintStore, optional): Registro que evita interpretar de novo páginas do SAJ sem alteração.
+        duplicate_window (int): Quantos resultados recentes são guardados para entregar números repetidos.
+        collect_results (bool): Se False, os resultados não são acumulados em memória (apenas `on_result`
+            os recebe) e a função retorna None.
+
+    Returns:
+        list or None: Os resultados `(data, descricao, nome_executado)` na mesma ordem da entrada.
+    """
+    max_workers = max(1, max_workers)
+    results = {}
+    # Números repetidos são consultados uma única vez: as repetições aguardam a primeira ocorrência
+    # (em `followers`) ou recebem diretamente o resultado já obtido (em `resolved`, limitado aos
+    # `duplicate_window` usados mais recentemente).
+    resolved = OrderedDict()
+    followers = {}
+    duplicate_window = max(0, duplicate_window)
+
+    def deliver(index, process_number, result, source):
+        if collect_results:
+            results[index] = result
+        if on_result:
+            on_result(index, process_number, result, source)
+
+    def handle_result(index, process_number, result, source, store=True):
+        if store and cache is not None and source != SOURCE_CACHE:
+            cache.put(process_number, *result, source)
+        if duplicate_window:
+            resolved[process_number] = (result, source)
+            if len(resolved) > duplicate_window:
+                resolved.popitem(last=False)
+        deliver(index, process_number, result, source)
+        for follower_index in followers.pop(process_number, ()):
+            deliver(follower_index, process_number, result, source)
+
+    def pending_lookups():
+        for index, process_number in enumerate(process_numbers):
+            if process_number in resolved:
+                resolved.move_to_end(process_number)
+                deliver(index, process_number, *resolved[process_number])
+                continue
+            if process_number in followers:
+                followers[process_number].append(index)
+                continue
+            followers[process_number] = []
+
+            # Resultados resolvidos localmente ou válidos no cache são entregues diretamente, sem consulta aos portais.
+            known = resolve_locally(process_number) if resolve_locally else None
+            if known is not None:
+                handle_result(index, process_number, tuple(known[:3]), known[3], store=False)
+                continue
+            cached = cache.get(process_number) if cache is not None else None
+            if cached is not None:
+                logger.info(f"Processo {process_number}: resultado obtido do cache local ({cached[3]}).")
+                handle_result(index, process_number, cached[:3], SOURCE_CACHE)
+                continue
+            yield index, process_number
+
+    if mode == "asyncio":
+        from core.saj_async_client import run_lookups_async # aiohttp só é necessário neste modo
+        run_lookups_async(pending_lookups(), username, password, max_workers, handle_result, routing_index, fingerprints)
+    else:
+        _run_lookups_threaded(pending_lookups(), username, password, max_workers, handle_result, routing_index,
+                              fingerprints)
+
+    if not collect_results:
+        return None
+    return [results[index] for index in range(len(results))]
@@ -0,0 +1,254 @@
+# Este módulo executa uma consulta completa a partir de uma planilha de entrada: leitura dos
+# números, consulta em lote (SAJ com fallback para o PROJUDI), checkpoint, cache e gravação
+# da planilha de resultados. Não depende do Tkinter, sendo usado tanto pela interface gráfica
+# (main.py) quanto pela linha de comando (cli.py).
+import logging
+import time
+from collections import Counter
+
+from core.batch_runner import run_consultation_batch, in_input_order
+from core.projudi_orchestrator import shutdown_session_pools
+from utils.checkpoint_journal import CheckpointJournal
+from utils.excel_handler import iter_process_numbers_from_excel, estimate_process_count
+from utils.result_writers import create_result_writer
+from utils.result_cache import ResultCache, classify_outcome, OUTCOME_ERROR
+from utils.routing_index import RoutingIndex
+from utils.saj_fingerprints import SajFingerprintStore
+from utils.movement_history import movement_history
+from utils.metrics import metrics, log_summary, write_json, write_prometheus_textfile
+
+from utils.constants import (
+    EXCEL_COL_PROCESSO, EXCEL_COL_DATA_MOVIMENTACAO, EXCEL_COL_DESCRICAO_MOVIMENTACAO,
+    EXCEL_COL_REQUERIDO_EXECUTADO, STATUS_NUMERO_INVALIDO, STATUS_DIGITO_VERIFICADOR_INVALIDO, STATUS_NAO_DISPONIVEL, STATUS_CONSULTA_FALHOU,
+    PROJUDI_ERRO_CREDENCIAIS_NAO_FORNECIDAS, PROJUDI_ERRO_CREDENCIAIS_INVALIDAS, SOURCE_VALIDACAO,
+    SAJ_MAX_WORKERS, SAJ_CLIENT_MODE, METRICS_JSON_PATH, METRICS_PROMETHEUS_PATH, OUTPUT_FORMAT_DEFAULT
+)
+
+OUTPUT_COLUMNS = [EXCEL_COL_PROCESSO, EXCEL_COL_DATA_MOVIMENTACAO, EXCEL_COL_DESCRICAO_MOVIMENTACAO, EXCEL_COL_REQUERIDO_EXECUTADO]
+
+def run_excel_consultation(excel_path, username, password, finalize_output, resume=False, max_workers=SAJ_MAX_WORKERS,
+                           mode=SAJ_CLIENT_MODE, progress=None, metrics_json_path=METRICS_JSON_PATH,
+                           metrics_prometheus_path=METRICS_PROMETHEUS_PATH, history_dir=None,
+                           output_format=OUTPUT_FORMAT_DEFAULT):
+    """
+    Consulta todos os processos de uma planilha e grava a planilha de resultados.
+
+    Args:
+        excel_path (str): Planilha de entrada (coluna 'PROCESSO' ou 'processo').
+        username (str): Nome de usuário do PROJUDI.
+        password (str): Senha do PROJUDI.
+        finalize_output (callable): Chamado como `finalize_output(writer)` ao fim do lote, com o
+            escritor de resultados preenchido (`StreamingExcelWriter` ou outro de `utils.result_writers`);
+            deve salvar o arquivo e retornar o caminho salvo (ou None).
+        resume (bool): Se True, retoma a consulta interrompida deste mesmo arquivo, pulando os processos
+                       já gravados no diário de checkpoint. Se False, o diário anterior é descartado.
+        max_workers (int): Número de consultas simultâneas.
+        mode (str): "threads" ou "asyncio" (ver `core.batch_runner`).
+        progress (ProgressChannel, optional): Canal que recebe o total estimado e cada processo concluído
+            (ver `utils.progress`); o chamador é responsável por `progress.finish()`.
+        metrics_json_path (str, optional): Arquivo em que o resumo de tempos por etapa é gravado (None para não gravar).
+        metrics_prometheus_path (str, optional): Arquivo no formato "textfile" do Prometheus com as mesmas
+            métricas (None para não gravar).
+        history_dir (str, optional): Se informado, todas as movimentações de cada processo (histórico completo)
+            são gravadas em Parquet neste diretório, na partição da data da execução (ver `utils.movement_history`).
+        output_format (str): Formato do arquivo de resultados: "xlsx", "csv", "parquet" ou "arrow"
+            (ver `utils.result_writers`).
+
+    Returns:
+        dict: Resumo da execução (contagens por sistema de origem, inválidos e, em "invalid_check_digit", quantos
+              deles têm dígito verificador incorreto, erros, arquivo salvo, duração,
+              em "saj_pages", as páginas do SAJ novas, alteradas e sem alteração desde a consulta anterior e,
+              em "metrics", os tempos por etapa; ver `utils.metrics.MetricsRegistry.summary`). Com `history_dir`,
+              "history" traz as linhas e os arquivos gravados.
+
+    Raises:
+        ValueError: Se a planilha não tiver a coluna dos processos ou o formato de resultados for desconhecido.
+        ImportError: Se `history_dir` ou o formato de resultados exigirem o pyarrow e ele não estiver instalado.
+    """
+    started_at = time.monotonic()
+    metrics.reset()
+    if history_dir:
+        movement_history.start(history_dir)
+    summary = {
+        "input": excel_path,
+        "output": None,
+        "total": 0,
+        "invalid": 0,
+        "invalid_check_digit": 0,
+        "errors": 0,
+        "by_source": {},
+        "saj_pages": {},
+        "elapsed_seconds": 0.0,
+    }
+
+    # Lê os números dos processos sob demanda (apenas a coluna dos processos): a consulta começa
+    # enquanto o restante da planilha ainda está sendo lido.
+    numbers_from_excel = iter_process_numbers_from_excel(excel_path)
+
+    # Os resultados são gravados em uma planilha temporária à medida que ficam prontos
+    # (sem acumular tudo em memória) e entregues a `finalize_output` ao final.
+    writer = create_result_writer(output_format, OUTPUT_COLUMNS)
+
+    # Cada número é consultado na forma canônica CNJ (repetições são consultadas uma única vez, ver
+    # `run_consultation_batch`), mas a planilha de resultados mantém o valor original de cada linha.
+    # Números inválidos seguem junto com os válidos (para manter a ordem da planilha), mas são
+    # resolvidos localmente, sem consulta.
+    invalid_numbers = {} # numero -> status de número inválido
+    original_values = {} # indice -> valor original, até a linha ser gravada
+
+    def process_numbers():
+        for index, (original, canonical, status) in enumerate(numbers_from_excel):
+            original_values[index] = original
+            process_number = canonical or original
+            if status is not None:
+                invalid_numbers[process_number] = status
+            yield process_number
+
+    total_processes = estimate_process_count(excel_path) # Estimativa para o progresso (None se indisponível)
+    if progress is not None:
+        progress.set_total(total_processes)
+
+    # Cada resultado é gravado no diário assim que obtido; em modo de retomada, os processos
+    # já gravados em uma execução anterior deste arquivo não são consultados novamente.
+    journal = CheckpointJournal(excel_path)
+    if resume:
+        journaled_results = journal.load()
+        if journaled_results:
+            logging.info(f"Retomando consulta: {len(journaled_results)} processos já concluídos serão reaproveitados.")
+    else:
+        journal.discard()
+        journaled_results = {}
+
+    def resolve_locally(process_number):
+        if process_number in invalid_numbers:
+            return STATUS_NAO_DISPONIVEL, invalid_numbers[process_number], STATUS_NAO_DISPONIVEL, SOURCE_VALIDACAO
+        return journaled_results.get(process_number)
+
+    # O callback é chamado a cada processo concluído, na ordem de conclusão.
+    completed = 0
+    by_source = Counter()
+    invalid_by_status = Counter() # STATUS_NUMERO_INVALIDO ou STATUS_DIGITO_VERIFICADOR_INVALIDO -> quantidade
+
+    def on_result(index, process_number, result, source):
+        nonlocal completed
+        date, description, executed_name = result
+        completed += 1
+        by_source[source] += 1
+        metrics.item_completed()
+        if source == SOURCE_VALIDACAO:
+            invalid_by_status[description] += 1
+            logging.info(f"Processo {original_values.get(index, process_number)}: {description}")
+            logging.info("----------------------------------------------------------------------")
+        else:
+            if classify_outcome(date, description) == OUTCOME_ERROR:
+                summary["errors"] += 1
+            # Consultas que falharam (por exemplo, SAJ fora do ar) não vão para o diário: a retomada as refaz.
+            if process_number not in journaled_results and description != STATUS_CONSULTA_FALHOU:
+                journal.append(process_number, result, source)
+                journaled_results[process_number] = (*result, source) # Repetições do número não são regravadas
+            logging.info(f"Consultado processo {completed}/{total_processes or '?'}: {process_number}")
+
+            date_display = str(date)
+            description_display = str(description)
+            executed_name_display = str(executed_name)
+
+            credential_error_messages = [
+                PROJUDI_ERRO_CREDENCIAIS_NAO_FORNECIDAS,
+                PROJUDI_ERRO_CREDENCIAIS_INVALIDAS
+            ]
+
+            if description_display in credential_error_messages:
+                logging.info(f"  Resultado para {process_number}: Data: {date_display}, {description_display}")
+            else:
+                logging.info(f"  Resultado para {process_number}: Data: {date_display}, Movimentação: {description_display}, Requerido/Executado: {executed_name_display}")
+            logging.info("----------------------------------------------------------------------")
+
+        if progress is not None:
+            progress.item_completed(source)
+
+    def write_row(index, process_number, result, source):
+        # Chamado na ordem da planilha de entrada (ver `in_input_order`).
+        date, description, executed_name = result
+        writer.append({
+            EXCEL_COL_PROCESSO: original_values.pop(index, process_number),
+            EXCEL_COL_DATA_MOVIMENTACAO: str(date),
+            EXCEL_COL_DESCRICAO_MOVIMENTACAO: str(description),
+            EXCEL_COL_REQUERIDO_EXECUTADO: str(executed_name)
+        })
+
+    write_in_order = in_input_order(write_row)
+
+    def handle_result(index, process_number, result, source):
+        on_result(index, process_number, result, source)
+        write_in_order(index, process_number, result, source)
+
+    # Resultados recentes ficam em um cache local (SQLite) e não são consultados novamente.
+    # O índice de roteamento envia direto ao PROJUDI os processos que já estavam (ou devem estar) nele.
+    # Páginas do SAJ sem alteração desde a consulta anterior não são interpretadas novamente.
+    # Com o histórico completo, todos os processos são consultados e interpretados novamente, para que
+    # a partição desta execução traga o histórico de cada um deles.
+    cache = ResultCache()
+    routing_index = RoutingIndex()
+    fingerprints = SajFingerprintStore()
+    try:
+        run_consultation_batch(process_numbers(), username, password, max_workers=max_workers, on_result=handle_result,
+                               mode=mode, cache=None if history_dir else cache, resolve_locally=resolve_locally,
+                               collect_results=False, routing_index=routing_index,
+                               fingerprints=None if history_dir else fingerprints)
+    finally:
+        summary["saj_pages"] = fingerprints.stats()
+        cache.close()
+        routing_index.close()
+        fingerprints.close()
+        journal.close()
+        # Encerra os navegadores do PROJUDI mantidos abertos durante o lote.
+        shutdown_session_pools()
+        if history_dir:
+            summary["history"] = movement_history.finish()
+
+    if invalid_by_status[STATUS_NUMERO_INVALIDO]:
+        logging.warning(f"Foram encontrados {invalid_by_status[STATUS_NUMERO_INVALIDO]} números de processo em formato "
+                        f"inválido. Eles foram incluídos no resultado final como '{STATUS_NUMERO_INVALIDO}'.")
+    if invalid_by_status[STATUS_DIGITO_VERIFICADOR_INVALIDO]:
+        logging.warning(f"Foram encontrados {invalid_by_status[STATUS_DIGITO_VERIFICADOR_INVALIDO]} números de processo "
+                        f"com dígito verificador incorreto (possível erro de digitação). Eles foram incluídos no "
+                        f"resultado final como '{STATUS_DIGITO_VERIFICADOR_INVALIDO}'.")
+
+    # Após o lote, conclui a planilha de resultados no destino definido pelo chamador.
+    if writer.rows_written:
+        saved_file_path = finalize_output(writer)
+        if saved_file_path:
+            logging.info(f"Resultados salvos em: {saved_file_path}")
+            journal.discard() # Lote concluído e salvo: o checkpoint não é mais necessário.
+        else:
+            writer.discard()
+            logging.warning("Salvamento do arquivo de resultados cancelado ou falhou.")
+        summary["output"] = saved_file_path
+    else:
+        writer.discard()
+        logging.info("Nenhum resultado foi encontrado para salvar.")
+
+    saj_pages = summary["saj_pages"]
+    if any(saj_pages.values()):
+        logging.info(f"Páginas do SAJ: {saj_pages['changed']} alteradas, {saj_pages['unchanged']} sem alteração "
+                     f"e {saj_pages['new']} consultadas pela primeira vez.")
+
+    summary["total"] = completed
+    summary["invalid"] = by_source[SOURCE_VALIDACAO]
+    summary["invalid_check_digit"] = invalid_by_status[STATUS_DIGITO_VERIFICADOR_INVALIDO]
+    summary["by_source"] = dict(by_source)
+    summary["elapsed_seconds"] = round(time.monotonic() - started_at, 3)
+    summary["metrics"] = metrics.summary()
+    export_metrics(summary["metrics"], metrics_json_path, metrics_prometheus_path)
+    return summary
+
+def export_metrics(metrics_summary, json_path, prometheus_path):
+    """Registra no log o resumo de tempos por etapa e o grava nos arquivos indicados (falhas apenas geram aviso)."""
+    log_summary(metrics_summary)
+    for path, write in ((json_path, write_json), (prometheus_path, write_prometheus_textfile)):
+        if not path:
+            continue
+        try:
+            write(metrics_summary, path)
+        except OSError as e:
+            logging.warning(f"Não foi possível gravar as métricas em {path}: {e}")
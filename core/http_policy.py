@@ -0,0 +1,155 @@
+# Este módulo define a política de falhas das requisições ao SAJ: quais erros são transitórios
+# (e merecem nova tentativa), o intervalo entre tentativas (backoff exponencial com jitter) e um
+# "circuit breaker" por host, que suspende as requisições enquanto o portal está fora do ar.
+import asyncio
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+from utils.constants import (
+    SAJ_RETRY_MAX_ATTEMPTS, SAJ_RETRY_BASE_DELAY, SAJ_RETRY_MAX_DELAY, SAJ_RETRY_STATUSES,
+    SAJ_CIRCUIT_FAILURE_THRESHOLD, SAJ_CIRCUIT_RESET_TIMEOUT, SAJ_CIRCUIT_MAX_WAIT
+)
+
+logger = logging.getLogger(__name__)
+
+class SajUnavailableError(Exception):
+    """O SAJ não respondeu (ou respondeu com erro transitório) após todas as tentativas."""
+
+class CircuitOpenError(SajUnavailableError):
+    """O circuito do host continuou aberto durante toda a espera permitida."""
+
+class RetryPolicy:
+    """
+    Tentativas para erros transitórios: até `max_attempts` requisições, com espera aleatória entre
+    0 e `base_delay * 2**tentativa` (limitada a `max_delay`) antes de cada nova tentativa.
+    """
+    def __init__(self, max_attempts=SAJ_RETRY_MAX_ATTEMPTS, base_delay=SAJ_RETRY_BASE_DELAY, max_delay=SAJ_RETRY_MAX_DELAY,
+                 retry_statuses=SAJ_RETRY_STATUSES):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = frozenset(retry_statuses)
+
+    def is_retryable_status(self, status):
+        return status in self.retry_statuses
+
+    def delay(self, attempt, retry_after=None):
+        """
+        Espera (s) antes da tentativa seguinte à tentativa `attempt` (contada a partir de 0).
+        Um cabeçalho Retry-After numérico, se houver, é respeitado (até `max_delay`).
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        try:
+            delay = max(delay, min(self.max_delay, float(retry_after)))
+        except (TypeError, ValueError):
+            pass
+        return delay
+
+class CircuitBreaker:
+    """
+    Circuit breaker de um host, seguro para threads e utilizável a partir de código asyncio.
+
+    Após `failure_threshold` falhas seguidas, o circuito abre e as requisições aguardam
+    `reset_timeout` segundos; então uma única requisição de teste é liberada. Se ela tiver sucesso,
+    o circuito fecha; se falhar, volta a abrir.
+    """
+    def __init__(self, host, failure_threshold=SAJ_CIRCUIT_FAILURE_THRESHOLD, reset_timeout=SAJ_CIRCUIT_RESET_TIMEOUT):
+        self.host = host
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None # Instante em que o circuito abriu (None: fechado)
+        self._probe_in_flight = False
+
+    @property
+    def is_open(self):
+        with self._lock:
+            return self._opened_at is not None
+
+    def _reserve(self):
+        """
+        Retorna 0 se a requisição pode ser enviada agora, ou quantos segundos aguardar antes de
+        verificar novamente.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            remaining = self._opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0:
+                return remaining
+            if self._probe_in_flight:
+                return min(1.0, self.reset_timeout) # Aguarda o resultado da requisição de teste
+            self._probe_in_flight = True
+            return 0.0
+
+    def record_success(self):
+        with self._lock:
+            was_open = self._opened_at is not None
+            self._failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+        if was_open:
+            logger.info(f"{self.host} voltou a responder. Requisições retomadas.")
+
+    def release_probe(self):
+        """Libera a requisição de teste sem registrar resultado (ela não chegou a ser enviada ao host)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._opened_at is None and self._failures < self.failure_threshold:
+                return
+            newly_opened = self._opened_at is None
+            self._opened_at = time.monotonic()
+        if newly_opened:
+            logger.warning(f"{self.host} não está respondendo ({self.failure_threshold} falhas seguidas). "
+                           f"Requisições suspensas por {self.reset_timeout:.0f} s.")
+
+    def wait(self, max_wait=SAJ_CIRCUIT_MAX_WAIT):
+        """
+        Bloqueia a thread atual enquanto o circuito estiver aberto.
+
+        Raises:
+            CircuitOpenError: Se o circuito continuar aberto após `max_wait` segundos.
+        """
+        deadline = time.monotonic() + max_wait
+        while True:
+            delay = self._reserve()
+            if delay <= 0:
+                return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise CircuitOpenError(f"{self.host} indisponível há mais de {max_wait:.0f} s")
+            time.sleep(min(delay, remaining))
+
+    async def wait_async(self, max_wait=SAJ_CIRCUIT_MAX_WAIT):
+        """Versão assíncrona de `wait`, que não bloqueia o event loop."""
+        deadline = time.monotonic() + max_wait
+        while True:
+            delay = self._reserve()
+            if delay <= 0:
+                return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise CircuitOpenError(f"{self.host} indisponível há mais de {max_wait:.0f} s")
+            await asyncio.sleep(min(delay, remaining))
+
+# Um circuit breaker por host, compartilhado pelos modos com threads e asyncio.
+_circuit_breakers = {}
+_circuit_breakers_lock = threading.Lock()
+
+def circuit_breaker_for(url):
+    """Retorna o circuit breaker do host da URL, criando-o na primeira chamada."""
+    host = urlsplit(url).hostname
+    with _circuit_breakers_lock:
+        breaker = _circuit_breakers.get(host)
+        if breaker is None:
+            breaker = _circuit_breakers[host] = CircuitBreaker(host)
+        return breaker
@@ -0,0 +1,144 @@
+# Este módulo implementa o modo híbrido de consulta ao PROJUDI: o Chrome (Selenium) é usado apenas
+# para fazer login e abrir a tela de busca; os cookies da sessão autenticada são copiados para uma
+# `requests.Session`, e a busca e a página de detalhes de cada processo são obtidas via HTTP e
+# interpretadas com BeautifulSoup (core/projudi_parser.py), com custo semelhante ao de uma consulta ao SAJ.
+import logging
+
+import requests
+
+from core.projudi_pages import ProjudiScraper, ProjudiSearchPage
+from core.projudi_parser import (
+    ProjudiParseError, parse_search_form, parse_search_results, parse_last_movement, parse_movements, is_login_page
+)
+
+from utils.metrics import span, STAGE_PROJUDI_SEARCH, STAGE_PROJUDI_DETAIL
+from utils.movement_history import movement_history
+
+from utils.constants import (
+    STATUS_NAO_DISPONIVEL, STATUS_SEGREDO_JUSTICA, PROJUDI_PROCESS_NAO_ENCONTRADO,
+    PROJUDI_HTTP_TIMEOUT, SOURCE_PROJUDI, STATUS_MOVIMENTACAO_NAO_ENCONTRADA,
+    PROJUDI_HYBRID_MAX_PARSE_FAILURES
+)
+
+logger = logging.getLogger(__name__)
+
+LOGIN_FIELD_ID = "login"
+
+class _SessionExpired(Exception):
+    """O PROJUDI respondeu com a página de login: os cookies copiados não são mais válidos."""
+
+class ProjudiHybridScraper(ProjudiScraper):
+    """
+    `ProjudiScraper` que consulta os processos via HTTP, reaproveitando a sessão autenticada do navegador.
+
+    Quando a sessão expira, o login é refeito pelo navegador e os cookies são copiados novamente.
+    Em caso de falha de rede ou de uma página que não pode ser interpretada (layout inesperado, link
+    acionado por JavaScript etc.), a consulta daquele processo é refeita pelo navegador. Após
+    `PROJUDI_HYBRID_MAX_PARSE_FAILURES` páginas seguidas não reconhecidas, o modo HTTP é desativado
+    para esta sessão e as consultas seguintes usam apenas o navegador.
+    """
+    def __init__(self, driver):
+        super().__init__(driver)
+        self.http_session = None
+        self.http_enabled = True
+        self.parse_failures = 0 # Páginas seguidas não reconhecidas pelo cliente HTTP
+        self._search_form = None # (url_de_envio, metodo, campos, nome_do_campo)
+
+    def _establish_http_session(self, username, password):
+        """
+        Faz login pelo navegador, abre a tela de busca e copia os cookies e o formulário de busca.
+        """
+        if not self.logged_in or not self.login_page.is_session_active():
+            self._login(username, password)
+        self._navigate_to_search()
+        self.search_page._switch_to_main_frame()
+
+        page_url = self.driver.execute_script("return document.URL;")
+        self._search_form = parse_search_form(self.driver.page_source, page_url,
+                                              ProjudiSearchPage.NUMERO_PROCESSO_FIELD_ID, ProjudiSearchPage.SEARCH_BUTTON_ID)
+
+        http_session = requests.Session()
+        http_session.headers["User-Agent"] = self.driver.execute_script("return navigator.userAgent;")
+        for cookie in self.driver.get_cookies():
+            http_session.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain"), path=cookie.get("path", "/"))
+        if self.http_session is not None:
+            self.http_session.close()
+        self.http_session = http_session
+        logger.info("PROJUDI: Sessão autenticada copiada do navegador para o cliente HTTP.")
+
+    def _fetch(self, method, url, fields=None):
+        if method == "post":
+            response = self.http_session.post(url, data=fields, timeout=PROJUDI_HTTP_TIMEOUT)
+        else:
+            response = self.http_session.get(url, params=fields, timeout=PROJUDI_HTTP_TIMEOUT)
+        response.raise_for_status()
+        if is_login_page(response.text, LOGIN_FIELD_ID):
+            raise _SessionExpired()
+        return response
+
+    def _lookup_http(self, process_number):
+        action_url, method, fields, number_field = self._search_form
+        with span(STAGE_PROJUDI_SEARCH):
+            response = self._fetch(method, action_url, fields + [(number_field, process_number)])
+            search = parse_search_results(response.text, process_number, response.url)
+
+        if not search["found"]:
+            if search["no_records"]:
+                return STATUS_NAO_DISPONIVEL, PROJUDI_PROCESS_NAO_ENCONTRADO, STATUS_NAO_DISPONIVEL
+            # Página sem o processo e sem o aviso de "nenhum registro": layout não reconhecido.
+            raise ProjudiParseError("Processo não listado na página de resultados.")
+
+        executed_name = search["executed_name"]
+        if search["segredo"]:
+            logger.info(f"Processo {process_number} em {STATUS_SEGREDO_JUSTICA}.")
+            return STATUS_NAO_DISPONIVEL, STATUS_SEGREDO_JUSTICA, executed_name
+        if not search["detail_url"]:
+            raise ProjudiParseError("Link do processo não navegável via HTTP.")
+
+        with span(STAGE_PROJUDI_DETAIL):
+            detail = self._fetch("get", search["detail_url"])
+            if not movement_history.enabled:
+                date, description = parse_last_movement(detail.text)
+                return date, description, executed_name
+            movements = parse_movements(detail.text)
+            if not movements:
+                return STATUS_NAO_DISPONIVEL, STATUS_MOVIMENTACAO_NAO_ENCONTRADA, executed_name
+            movement_history.record(process_number, SOURCE_PROJUDI, movements)
+        date, description = movements[0]
+        return date, description, executed_name
+
+    def _reset_http_session(self):
+        self._search_form = None
+        if self.http_session is not None:
+            self.http_session.close()
+            self.http_session = None
+
+    def _lookup_in_session(self, process_number, username, password):
+        if not self.http_enabled:
+            return super()._lookup_in_session(process_number, username, password)
+        try:
+            if self.http_session is None:
+                self._establish_http_session(username, password)
+            try:
+                result = self._lookup_http(process_number)
+            except _SessionExpired:
+                logger.info("PROJUDI: Sessão HTTP expirada. Refazendo login pelo navegador...")
+                self.logged_in = False
+                self._establish_http_session(username, password)
+                result = self._lookup_http(process_number)
+            self.parse_failures = 0
+            return result
+        except ProjudiParseError as e:
+            self.parse_failures += 1
+            if self.parse_failures >= PROJUDI_HYBRID_MAX_PARSE_FAILURES:
+                logger.warning(f"PROJUDI: Página não reconhecida pelo cliente HTTP ({e}) {self.parse_failures} vezes "
+                               f"seguidas; modo híbrido desativado nesta sessão.")
+                self.http_enabled = False
+                self._reset_http_session()
+            else:
+                logger.warning(f"PROJUDI: Página de {process_number} não reconhecida pelo cliente HTTP ({e}); "
+                               f"consultando pelo navegador.")
+        except (_SessionExpired, requests.RequestException) as e:
+            logger.warning(f"PROJUDI: Consulta HTTP de {process_number} não concluída ({e!r}); consultando pelo navegador.")
+            self._reset_http_session()
+        return super()._lookup_in_session(process_number, username, password)
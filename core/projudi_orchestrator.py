@@ -1,17 +1,15 @@
-import logging 
-import os # Adicionar import do módulo os
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
+import logging
+import threading
 from selenium.common.exceptions import WebDriverException
 
-# Importar o ProjudiScraper que contém as Page Objects
-from core.projudi_pages import ProjudiScraper
+# Importar o pool de sessões autenticadas do PROJUDI
+from core.projudi_session_pool import ProjudiSessionPool
+from utils.movement_history import movement_history
 
 # Importar constantes
 from utils.constants import (
     PROJUDI_ERRO_CREDENCIAIS_NAO_FORNECIDAS, STATUS_NAO_DISPONIVEL, PROJUDI_ERRO_WEBDRIVER,
-    PROJUDI_ERRO_GERAL
+    PROJUDI_ERRO_GERAL, PROJUDI_WORKER_PROCESSES, PROJUDI_CLIENT_MODE
 )
 
 # Classe de filtro para suprimir mensagens de erro de conexão específicas
@@ -32,10 +30,60 @@ logger = logging.getLogger(__name__)
 logging.getLogger("urllib3").setLevel(logging.CRITICAL)
 logging.getLogger("selenium").setLevel(logging.CRITICAL)
 
+# Pools de sessões autenticadas, um por par de credenciais, mantidos entre as consultas de um lote.
+_session_pools = {}
+_session_pools_lock = threading.Lock()
+_worker_processes = PROJUDI_WORKER_PROCESSES
+_client_mode = PROJUDI_CLIENT_MODE
+
+def configure_projudi_workers(processes):
+    """
+    Define quantos processos de consulta ao PROJUDI os próximos pools terão.
+    Com 0, as consultas usam um `ProjudiSessionPool` no próprio processo.
+    """
+    global _worker_processes
+    _worker_processes = max(0, processes)
+
+def configure_projudi_client(mode):
+    """
+    Define o modo de consulta dos próximos pools: "selenium" ou "hybrid" (ver `core.projudi_http_client`).
+    """
+    global _client_mode
+    _client_mode = mode
+
+def get_session_pool(username, password):
+    """
+    Retorna o pool de sessões do PROJUDI associado às credenciais, criando-o na primeira chamada.
+    Com workers configurados, o pool é um `ProjudiWorkerPool` (um navegador por processo).
+    """
+    with _session_pools_lock:
+        pool = _session_pools.get((username, password))
+        if pool is None:
+            if _worker_processes > 0:
+                from core.projudi_worker_pool import ProjudiWorkerPool # multiprocessing só é necessário neste modo
+                pool = ProjudiWorkerPool(username, password, processes=_worker_processes, client_mode=_client_mode,
+                                         collect_history=movement_history.enabled)
+            else:
+                pool = ProjudiSessionPool(username, password, client_mode=_client_mode)
+            _session_pools[(username, password)] = pool
+        return pool
+
+def shutdown_session_pools():
+    """
+    Encerra todos os navegadores mantidos pelos pools de sessão. Deve ser chamada ao final de um lote.
+    """
+    with _session_pools_lock:
+        pools = list(_session_pools.values())
+        _session_pools.clear()
+    for pool in pools:
+        pool.close()
+
 def get_projudi_process_movement(process_number, username, password):
     """
     Orquestra a consulta da movimentação de um processo no portal PROJUDI do TJAM,
     utilizando as classes de Page Object para interação com o navegador.
+    As sessões do navegador (já autenticadas) são reaproveitadas entre chamadas através
+    do `ProjudiWorkerPool` (ou do `ProjudiSessionPool`); chame `shutdown_session_pools` ao final do lote.
 
     Args:
         process_number (str): O número do processo a ser consultado.
@@ -50,48 +98,11 @@ def get_projudi_process_movement(process_number, username, password):
         logger.warning(PROJUDI_ERRO_CREDENCIAIS_NAO_FORNECIDAS)
         return STATUS_NAO_DISPONIVEL, PROJUDI_ERRO_CREDENCIAIS_NAO_FORNECIDAS, STATUS_NAO_DISPONIVEL
 
-    driver = None
     try:
-        # --- Configuração do WebDriver (Selenium) ---
-        options = webdriver.ChromeOptions()
-        options.add_argument("--headless") # Recomentar para execução silenciosa
-        options.add_argument("--start-maximized")
-        options.add_argument("--log-level=3")
-        options.add_experimental_option('excludeSwitches', ['enable-logging'])
-        options.add_argument("--disable-gpu")
-        options.add_argument("--window-size=1920,1080")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-extensions")
-        options.page_load_strategy = 'eager'
-        
-        log_path = os.devnull 
-        
-        service_args_list = ['--log-level=OFF']
-
-        service = ChromeService(
-            ChromeDriverManager().install(),
-            log_path=log_path, 
-            service_args=service_args_list
-        )
-        
-        driver = webdriver.Chrome(service=service, options=options)
-        driver.implicitly_wait(10) # Segundos que o driver aguardará elementos
-        
-        projudi_scraper = ProjudiScraper(driver)
-        date, description, executed_name = projudi_scraper.get_movement(process_number, username, password)
-        
-        return date, description, executed_name
-
+        return get_session_pool(username, password).lookup(process_number)
     except WebDriverException as wde:
         logger.error(f"Erro do WebDriver ao consultar PROJUDI para {process_number}: {wde}", exc_info=True)
         return STATUS_NAO_DISPONIVEL, PROJUDI_ERRO_WEBDRIVER, STATUS_NAO_DISPONIVEL
     except Exception as e:
         logger.error(f"Erro geral ao consultar PROJUDI para {process_number} com Selenium: {e}", exc_info=True)
         return STATUS_NAO_DISPONIVEL, PROJUDI_ERRO_GERAL, STATUS_NAO_DISPONIVEL
-    finally:
-        if driver:
-            try:
-                driver.quit()
-            except WebDriverException as e:
-                logger.warning(f"Aviso: Erro ao fechar o driver do Selenium para {process_number}: {e}")
@@ -17,23 +17,81 @@ from utils.constants import (
     PROJUDI_ERRO_ELEMENTO_MOV_N_E, PROJUDI_ERRO_ELEMENTO_OBSOLETO, PROJUDI_ERRO_MOVIMENTACAO,
     PROJUDI_ERRO_TIMEOUT_GERAL, PROJUDI_ERRO_ELEMENTO_GERAL_N_E, PROJUDI_ERRO_WEBDRIVER,
     PROJUDI_ERRO_GERAL,
-    SLEEP_LOGIN_PROJUDI, SLEEP_MENU_PROJUDI, SLEEP_FRAME_CHANGE_PROJUDI, SLEEP_FIELD_FILL_PROJUDI,
-    SLEEP_SEARCH_PROJUDI, SLEEP_TABLE_RETRY, SLEEP_PAGE_LOAD, SLEEP_AFTER_PROJUDI_CONSULTA
+    PROJUDI_WAIT_TIMEOUT, PROJUDI_WAIT_POLL_INTERVAL, PROJUDI_IMPLICIT_WAIT, PROJUDI_LOADING_INDICATOR_CSS,
+    SOURCE_PROJUDI
 )
 
+from utils.metrics import (
+    metrics, span, STAGE_PROJUDI_LOGIN, STAGE_PROJUDI_MENU, STAGE_PROJUDI_SEARCH, STAGE_PROJUDI_DETAIL,
+    STAGE_PROJUDI_TIME_TO_INTERACTIVE
+)
+from utils.movement_history import movement_history
+from core.projudi_parser import ProjudiParseError, parse_movements
+
 logger = logging.getLogger(__name__)
 
+# Script que indica se o documento do frame atual terminou de carregar e não exibe indicador de carregamento.
+_PAGE_READY_SCRIPT = """
+if (document.readyState !== 'complete') { return false; }
+var spinners = document.querySelectorAll(arguments[0]);
+for (var i = 0; i < spinners.length; i++) {
+    if (spinners[i].offsetParent !== null) { return false; }
+}
+return true;
+"""
+
+# Script que indica se existe algum elemento cujo texto contém o trecho informado.
+_TEXT_PRESENT_SCRIPT = """
+var result = document.evaluate("//*[contains(text(), " + JSON.stringify(arguments[0]) + ")]",
+                               document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null);
+return result.singleNodeValue !== null;
+"""
+
 class BasePage:
     def __init__(self, driver):
         self.driver = driver
-        self.wait = WebDriverWait(driver, 30) # Tempo de espera padrão para elementos
+        self.wait = WebDriverWait(driver, PROJUDI_WAIT_TIMEOUT, poll_frequency=PROJUDI_WAIT_POLL_INTERVAL) # Tempo máximo de espera para elementos
+
+    def _timed_wait(self, condition, label, timeout=PROJUDI_WAIT_TIMEOUT):
+        """
+        Aguarda `condition` (no estilo das expected_conditions do Selenium) e registra nas métricas, na
+        etapa "projudi_wait:<rótulo>", quanto tempo a espera realmente levou. A espera implícita do driver
+        é desativada durante a verificação, para que condições com elementos ausentes sejam reavaliadas sem atraso.
+        """
+        start = time.monotonic()
+        succeeded = False
+        self.driver.implicitly_wait(0)
+        try:
+            result = WebDriverWait(self.driver, timeout, poll_frequency=PROJUDI_WAIT_POLL_INTERVAL).until(condition)
+            succeeded = True
+            return result
+        finally:
+            self.driver.implicitly_wait(PROJUDI_IMPLICIT_WAIT)
+            elapsed = time.monotonic() - start
+            metrics.record(f"projudi_wait:{label}", elapsed)
+            logger.debug(f"PROJUDI: espera '{label}' levou {elapsed:.2f}s ({'ok' if succeeded else 'timeout'}).")
+
+    def _is_page_ready(self, driver):
+        try:
+            return driver.execute_script(_PAGE_READY_SCRIPT, PROJUDI_LOADING_INDICATOR_CSS)
+        except WebDriverException:
+            return False # Frame em transição; tenta novamente no próximo ciclo
+
+    def _is_text_present(self, text):
+        try:
+            return self.driver.execute_script(_TEXT_PRESENT_SCRIPT, text)
+        except WebDriverException:
+            return False
+
+    def _wait_for_page_ready(self, label, timeout=PROJUDI_WAIT_TIMEOUT):
+        """Aguarda o documento do frame atual ficar pronto e sem indicador de carregamento."""
+        return self._timed_wait(self._is_page_ready, label, timeout)
 
     def _switch_to_main_frame(self):
         self.driver.switch_to.default_content()
-        time.sleep(SLEEP_FRAME_CHANGE_PROJUDI)
-        self.wait.until(EC.frame_to_be_available_and_switch_to_it((By.ID, "mainFrame")))
+        self._timed_wait(EC.frame_to_be_available_and_switch_to_it((By.ID, "mainFrame")), "frame mainFrame")
         try:
-            self.wait.until(EC.frame_to_be_available_and_switch_to_it((By.NAME, "userMainFrame")))
+            self._timed_wait(EC.frame_to_be_available_and_switch_to_it((By.NAME, "userMainFrame")), "frame userMainFrame")
         except TimeoutException:
             logger.error(f"Timeout: Não foi possível focar no 'userMainFrame'.")
             raise TimeoutException(PROJUDI_ERRO_USERMAINFRAME)
@@ -44,9 +102,28 @@ class ProjudiLoginPage(BasePage):
     PASSWORD_FIELD_XPATH = "//input[@id='senha']"
     ENTER_BUTTON_XPATH = "//input[@id='btEntrar']"
 
+    POSSIBLE_ERROR_MESSAGES_XPATH = [
+        "//font[@color='red']",
+        "//*[contains(text(),'Usuário ou senha inválida')]",
+        "//*[contains(text(),'Login inválido')]",
+        "//*[contains(text(),'Problemas no login')]"
+    ]
+
     def goto(self):
         self.driver.get(self.URL)
-        time.sleep(SLEEP_LOGIN_PROJUDI) # Espera para carregamento inicial
+        self._wait_for_page_ready("carregamento da página de login")
+
+    def _login_settled(self, driver):
+        """Condição: o login terminou, exibindo o menu principal ou uma mensagem de erro."""
+        try:
+            if driver.find_elements(By.ID, ProjudiMenuPage.MENU_BUSCAS_ID):
+                return True
+            for error_xpath in self.POSSIBLE_ERROR_MESSAGES_XPATH:
+                if driver.find_elements(By.XPATH, error_xpath):
+                    return True
+        except WebDriverException:
+            pass # Frame recarregando
+        return False
 
     def login(self, username, password):
         self.wait.until(EC.frame_to_be_available_and_switch_to_it((By.ID, "mainFrame")))
@@ -61,17 +138,14 @@ class ProjudiLoginPage(BasePage):
 
         enter_button = self.wait.until(EC.element_to_be_clickable((By.XPATH, self.ENTER_BUTTON_XPATH)))
         enter_button.click()
-        time.sleep(SLEEP_LOGIN_PROJUDI) # Espera após o clique no login
+        try:
+            self._timed_wait(self._login_settled, "resposta do login")
+        except TimeoutException:
+            logger.warning("PROJUDI: Tempo máximo de espera pela resposta do login atingido.")
         
         # Verificação de erro de login
         try:
-            possible_error_messages = [
-                "//font[@color='red']",
-                "//*[contains(text(),'Usuário ou senha inválida')]",
-                "//*[contains(text(),'Login inválido')]",
-                "//*[contains(text(),'Problemas no login')]"
-            ]
-            for error_xpath in possible_error_messages:
+            for error_xpath in self.POSSIBLE_ERROR_MESSAGES_XPATH:
                 try:
                     error_element = self.driver.find_element(By.XPATH, error_xpath)
                     if error_element.is_displayed():
@@ -83,16 +157,31 @@ class ProjudiLoginPage(BasePage):
         except Exception as e_login_check:
             logger.warning(f"Aviso: Verificação de erro de login encontrou um problema: {e_login_check}")
 
+    def is_session_active(self):
+        """
+        Verifica se a sessão do driver ainda está autenticada, procurando o menu principal
+        dentro do 'mainFrame'. Se o PROJUDI tiver redirecionado para a tela de login, o menu não existe.
+        """
+        try:
+            self.driver.switch_to.default_content()
+            frames = self.driver.find_elements(By.ID, "mainFrame")
+            if not frames:
+                return False
+            self.driver.switch_to.frame(frames[0])
+            return bool(self.driver.find_elements(By.ID, ProjudiMenuPage.MENU_BUSCAS_ID))
+        except WebDriverException:
+            return False
+
 class ProjudiMenuPage(BasePage):
     MENU_BUSCAS_ID = "Stm0p0i7eTX"
     PROCESSOS_1_GRAU_MENU_ITEM_ID = "Stm0p7i0e"
 
     def navigate_to_search(self):
-        menu_buscas_element = self.wait.until(EC.visibility_of_element_located((By.ID, self.MENU_BUSCAS_ID)))
+        menu_buscas_element = self._timed_wait(EC.visibility_of_element_located((By.ID, self.MENU_BUSCAS_ID)), "menu Buscas")
         ActionChains(self.driver).move_to_element(menu_buscas_element).perform()
-        time.sleep(SLEEP_MENU_PROJUDI)
 
-        processos_1_grau_element = self.wait.until(EC.element_to_be_clickable((By.ID, self.PROCESSOS_1_GRAU_MENU_ITEM_ID)))
+        # O item do submenu só fica clicável depois que o menu se abre com o hover.
+        processos_1_grau_element = self._timed_wait(EC.element_to_be_clickable((By.ID, self.PROCESSOS_1_GRAU_MENU_ITEM_ID)), "submenu Processos 1º Grau")
         processos_1_grau_element.click()
 
 class ProjudiSearchPage(BasePage):
@@ -103,7 +192,7 @@ class ProjudiSearchPage(BasePage):
     def search_process(self, process_number):
         self._switch_to_main_frame() # Garante que estamos no frame correto
         
-        numero_processo_field = self.wait.until(EC.element_to_be_clickable((By.ID, self.NUMERO_PROCESSO_FIELD_ID)))
+        numero_processo_field = self._timed_wait(EC.element_to_be_clickable((By.ID, self.NUMERO_PROCESSO_FIELD_ID)), "campo numeroProcesso")
         numero_processo_field.clear()
         numero_processo_field.send_keys(process_number)
         
@@ -115,30 +204,39 @@ class ProjudiSearchPage(BasePage):
             if current_value != process_number:
                 logger.error(f"Falha ao preencher 'numeroProcesso' para o processo {process_number}.")
                 raise ValueError(PROJUDI_ERRO_PREENCHIMENTO)
-        time.sleep(SLEEP_FIELD_FILL_PROJUDI)
 
-        search_button = self.wait.until(EC.element_to_be_clickable((By.ID, self.SEARCH_BUTTON_ID)))
+        search_button = self._timed_wait(EC.element_to_be_clickable((By.ID, self.SEARCH_BUTTON_ID)), "botão pesquisar")
         try:
             search_button.click()
         except Exception: # Tenta clicar via JS se o click normal falhar
             self.driver.execute_script("arguments[0].click();", search_button)
         
-        time.sleep(SLEEP_SEARCH_PROJUDI)
-
-    def check_no_records_found(self):
+        # Aguarda o resultado da busca: a linha do processo ou a mensagem de "nenhum registro".
         try:
-            no_records_element = self.wait.until(
-                EC.visibility_of_element_located((By.XPATH, self.NO_RECORDS_XPATH))
-            )
-            return no_records_element.is_displayed()
+            self._timed_wait(lambda driver: self._search_settled(driver, process_number), "resultado da busca")
         except TimeoutException:
+            logger.warning(f"PROJUDI: Tempo máximo de espera pelo resultado da busca de {process_number} atingido.")
+
+    def _search_settled(self, driver, process_number):
+        """Condição: a página de resultados exibe o processo buscado ou a mensagem de nenhum registro."""
+        if not self._is_page_ready(driver):
+            return False
+        try:
+            return bool(driver.find_elements(By.XPATH, f"//td[normalize-space()='{process_number}']")
+                        or driver.find_elements(By.XPATH, self.NO_RECORDS_XPATH))
+        except WebDriverException:
             return False
 
+    def check_no_records_found(self):
+        # A busca já foi aguardada em `search_process`; aqui basta verificar a mensagem, sem nova espera.
+        return bool(self._is_text_present("Nenhum registro encontrado"))
+
     def get_process_link_element(self, process_number):
         # Aguarda a presença do número do processo na tabela de resultados antes de tentar clicar
         try:
-            process_link_td = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, f"//td[normalize-space()='{process_number}']"))
+            process_link_td = self._timed_wait(
+                EC.element_to_be_clickable((By.XPATH, f"//td[normalize-space()='{process_number}']")),
+                "link do processo na tabela de resultados"
             )
             # Tenta encontrar um link 'a' dentro do TD, senão usa o próprio TD para clique
             try:
@@ -150,6 +248,13 @@ class ProjudiSearchPage(BasePage):
             logger.warning(f"PROJUDI: Processo {process_number} não encontrado na tabela de resultados após busca (Timeout esperando link do processo).")
             raise TimeoutException(PROJUDI_PROCESS_NAO_LISTADO_POS_BUSCA)
 
+    def wait_for_results_to_close(self, process_link_element, process_number):
+        """Aguarda a página de resultados ser substituída pela página de detalhes do processo."""
+        try:
+            self._timed_wait(EC.staleness_of(process_link_element), "abertura dos detalhes do processo")
+        except TimeoutException:
+            logger.warning(f"PROJUDI: A página de detalhes de {process_number} demorou a abrir; tentando extrair assim mesmo.")
+
     def extract_process_info_from_row(self, linha_tr):
         """
         Extrai dados de uma linha de processo, incluindo nome do requerido/executado
@@ -226,7 +331,10 @@ class ProjudiProcessDetailPage(BasePage):
         
         self._switch_to_main_frame() # Garante que estamos no frame correto
         logger.info("Pronto para extrair dados da tabela.")
-        time.sleep(SLEEP_PAGE_LOAD) # Espera adicional para garantir carregamento completo da página de detalhes
+        try:
+            self._wait_for_page_ready("carregamento da página de detalhes")
+        except TimeoutException:
+            logger.warning("PROJUDI: Página de detalhes não sinalizou fim do carregamento; tentando extrair assim mesmo.")
 
         logger.info("Buscando tabela de movimentações...")
         max_attempts = 3
@@ -236,14 +344,15 @@ class ProjudiProcessDetailPage(BasePage):
                 attempt += 1
                 logger.info(f"Tentativa {attempt} de localizar tabela de movimentações...")
                 
-                tabela_movimentacoes_tbody = self.wait.until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, self.MOV_TABLE_TBODY_CSS))
+                tabela_movimentacoes_tbody = self._timed_wait(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, self.MOV_TABLE_TBODY_CSS)),
+                    "tabela de movimentações"
                 )
                 
                 if not tabela_movimentacoes_tbody:
                     if attempt < max_attempts:
                         logger.info(f"Tabela não encontrada. Tentando novamente ({attempt}/{max_attempts})...")
-                        time.sleep(SLEEP_TABLE_RETRY)
+                        self._wait_for_retry()
                         continue
                     else:
                         logger.error(f"Tabela de movimentações não encontrada após {max_attempts} tentativas.")
@@ -288,7 +397,7 @@ class ProjudiProcessDetailPage(BasePage):
                 if attempt < max_attempts:
                     logger.warning(f"Timeout ao buscar tabela. Tentativa {attempt}/{max_attempts}. Tentando novamente...", exc_info=True)
                     self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                    time.sleep(SLEEP_TABLE_RETRY)
+                    self._wait_for_retry()
                 else:
                     logger.error(f"Timeout final ao buscar tabela de movimentações após {max_attempts} tentativas.", exc_info=True)
                     from utils.constants import PROJUDI_ERRO_TIMEOUT_TABELA
@@ -297,19 +406,36 @@ class ProjudiProcessDetailPage(BasePage):
             except NoSuchElementException as nse:
                 logger.error(f"Elemento não encontrado ao extrair movimentação (tentativa {attempt}/{max_attempts}): {nse}", exc_info=True)
                 if attempt < max_attempts:
-                    time.sleep(SLEEP_TABLE_RETRY)
+                    self._wait_for_retry()
                 else:
                     raise NoSuchElementException(PROJUDI_ERRO_ELEMENTO_N_E) from nse
             
             except Exception as e:
                 logger.error(f"Erro ao extrair movimentação (tentativa {attempt}/{max_attempts}): {e}", exc_info=True)
                 if attempt < max_attempts:
-                    time.sleep(SLEEP_TABLE_RETRY)
+                    self._wait_for_retry()
                 else:
                     raise Exception(PROJUDI_ERRO_EXTRACAO) from e
         
         return date, description, executed_name
 
+    def extract_all_movements(self):
+        """
+        Todas as movimentações da página de detalhes já carregada (histórico completo), lidas do HTML
+        do frame atual de uma só vez, em vez de uma consulta ao navegador por linha.
+
+        Raises:
+            ProjudiParseError: Se a tabela de movimentações não for encontrada.
+        """
+        return parse_movements(self.driver.page_source)
+
+    def _wait_for_retry(self):
+        """Antes de uma nova tentativa, aguarda a página voltar a ficar pronta (em vez de uma pausa fixa)."""
+        try:
+            self._wait_for_page_ready("nova tentativa na tabela de movimentações")
+        except TimeoutException:
+            pass
+
 class ProjudiScraper:
     def __init__(self, driver):
         self.driver = driver
@@ -317,23 +443,73 @@ class ProjudiScraper:
         self.menu_page = ProjudiMenuPage(driver)
         self.search_page = ProjudiSearchPage(driver)
         self.detail_page = ProjudiProcessDetailPage(driver)
+        self.logged_in = False # Indica se há uma sessão autenticada neste driver
+        self.broken = False # Marcado quando o driver falha e não deve mais ser reutilizado
 
     def get_movement(self, process_number, username, password):
+        """
+        Faz login, consulta o processo e encerra o driver (uso avulso, sem reaproveitamento da sessão).
+        """
         try:
-            self.login_page.goto()
+            return self._run_guarded(process_number, lambda: self._login_and_lookup(process_number, username, password))
+        finally:
+            if self.driver:
+                try:
+                    self.driver.quit()
+                except WebDriverException as e:
+                    logger.warning(f"Aviso: Erro ao fechar o driver do Selenium para {process_number}: {e}")
+
+    def get_movement_in_session(self, process_number, username, password):
+        """
+        Consulta o processo reaproveitando a sessão já autenticada deste driver.
+        O login só é refeito quando não há sessão ou quando ela expirou.
+        """
+        return self._run_guarded(process_number, lambda: self._lookup_in_session(process_number, username, password))
+
+    def _login(self, username, password):
+        self.logged_in = False
+        with span(STAGE_PROJUDI_LOGIN):
+            with span(STAGE_PROJUDI_TIME_TO_INTERACTIVE):
+                self.login_page.goto()
             self.login_page.login(username, password)
+        self.logged_in = True
+
+    def _navigate_to_search(self):
+        with span(STAGE_PROJUDI_MENU):
             self.menu_page.navigate_to_search()
+
+    def _login_and_lookup(self, process_number, username, password):
+        self._login(username, password)
+        self._navigate_to_search()
+        return self._lookup(process_number)
+
+    def _lookup_in_session(self, process_number, username, password):
+        if not self.logged_in or not self.login_page.is_session_active():
+            if self.logged_in:
+                logger.info("PROJUDI: Sessão expirada. Refazendo login...")
+            self._login(username, password)
+        try:
+            self._navigate_to_search()
+        except TimeoutException:
+            # O menu não respondeu: a sessão pode ter expirado entre a verificação e a navegação.
+            logger.info("PROJUDI: Menu indisponível. Refazendo login...")
+            self._login(username, password)
+            self._navigate_to_search()
+        return self._lookup(process_number)
+
+    def _lookup(self, process_number):
+        with span(STAGE_PROJUDI_SEARCH):
             self.search_page.search_process(process_number)
 
             if self.search_page.check_no_records_found():
                 return STATUS_NAO_DISPONIVEL, PROJUDI_PROCESS_NAO_ENCONTRADO, STATUS_NAO_DISPONIVEL
 
             process_link_element = self.search_page.get_process_link_element(process_number)
-            
+
             # Extrair nome do executado e status de segredo de justiça antes de clicar no link
             process_row_element = process_link_element.find_element(By.XPATH, "./ancestor::tr[1]")
             executed_name, is_segredo_justica = self.search_page.extract_process_info_from_row(process_row_element)
-            
+
             # Verificar se é segredo de justiça diretamente na página de resultados também
             if not is_segredo_justica:
                 try:
@@ -347,13 +523,30 @@ class ProjudiScraper:
                 logger.info(f"Processo {process_number} em {STATUS_SEGREDO_JUSTICA}.")
                 return STATUS_NAO_DISPONIVEL, STATUS_SEGREDO_JUSTICA, executed_name
 
+        with span(STAGE_PROJUDI_DETAIL):
             process_link_element.click()
-            time.sleep(SLEEP_AFTER_PROJUDI_CONSULTA) # Pausa após clicar no link do processo
-
+            self.search_page.wait_for_results_to_close(process_link_element, process_number)
             date, description, _ = self.detail_page.extract_last_movement(executed_name)
-            return date, description, executed_name
+            if movement_history.enabled:
+                self._record_history(process_number)
+        return date, description, executed_name
+
+    def _record_history(self, process_number):
+        try:
+            movement_history.record(process_number, SOURCE_PROJUDI, self.detail_page.extract_all_movements())
+        except ProjudiParseError as e:
+            logger.warning(f"PROJUDI: Histórico de movimentações de {process_number} não extraído ({e}).")
 
+    def _run_guarded(self, process_number, action):
+        """
+        Executa uma etapa da consulta convertendo as exceções do Selenium nas mensagens de status
+        usadas no resultado final.
+        """
+        try:
+            return action()
         except ValueError as ve: # Captura erros de credenciais/preenchimento
+            if str(ve) == PROJUDI_ERRO_CREDENCIAIS_INVALIDAS:
+                self.logged_in = False
             logger.error(f"Erro de validação no PROJUDI para {process_number}: {ve}")
             return STATUS_NAO_DISPONIVEL, str(ve), STATUS_NAO_DISPONIVEL
         except TimeoutException as te:
@@ -363,17 +556,12 @@ class ProjudiScraper:
             logger.error(f"Elemento não encontrado no site do PROJUDI para {process_number}: {nse}", exc_info=True)
             return STATUS_NAO_DISPONIVEL, PROJUDI_ERRO_ELEMENTO_GERAL_N_E, STATUS_NAO_DISPONIVEL
         except WebDriverException as wde:
+            self.broken = True
             logger.error(f"Erro do WebDriver ao consultar PROJUDI para {process_number}: {wde}", exc_info=True)
             return STATUS_NAO_DISPONIVEL, PROJUDI_ERRO_WEBDRIVER, STATUS_NAO_DISPONIVEL
         except Exception as e:
             logger.error(f"Erro geral ao consultar PROJUDI para {process_number} com Selenium: {e}", exc_info=True)
             return STATUS_NAO_DISPONIVEL, PROJUDI_ERRO_GERAL, STATUS_NAO_DISPONIVEL
-        finally:
-            if self.driver:
-                try:
-                    self.driver.quit()
-                except WebDriverException as e:
-                    logger.warning(f"Aviso: Erro ao fechar o driver do Selenium para {process_number}: {e}")
 
 # Antiga função get_projudi_process_movement (será substituída pela classe ProjudiScraper)
 """
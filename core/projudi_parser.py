@@ -0,0 +1,199 @@
+# Este módulo extrai, do HTML das páginas do PROJUDI, os mesmos dados que as Page Objects obtêm
+# pelo navegador: o formulário de busca, a linha do processo na tabela de resultados (nome do
+# requerido/executado e segredo de justiça) e as movimentações da página de detalhes.
+# É usado pelo cliente híbrido (core/projudi_http_client.py), que busca essas páginas via HTTP.
+import re
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from core.saj_parser import HTML_PARSER, clean_party_name
+
+from utils.constants import STATUS_NAO_DISPONIVEL, STATUS_SEGREDO_JUSTICA, STATUS_MOVIMENTACAO_NAO_ENCONTRADA
+
+NO_RECORDS_TEXT = "Nenhum registro encontrado"
+EXECUTED_PARTY_LABELS = ["Requerido:", "Executado:", "Réu:", "Embargante:"]
+
+_DATE_RE = re.compile(r'\d{2}\/\d{2}\/\d{4}')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+class ProjudiParseError(Exception):
+    """A página não tem a estrutura esperada (por exemplo, sessão expirada ou layout diferente)."""
+
+def _text(element):
+    return _WHITESPACE_RE.sub(' ', element.get_text(' ', strip=True)).strip()
+
+def parse_search_form(html, page_url, field_id, submit_id=None):
+    """
+    Localiza o formulário que contém o campo `field_id` e monta os dados para enviá-lo via HTTP.
+
+    Returns:
+        tuple: (url_de_envio, metodo, campos, nome_do_campo), onde `campos` é a lista de pares
+               (nome, valor) dos campos ocultos/preenchidos e `nome_do_campo` é o nome do campo buscado.
+
+    Raises:
+        ProjudiParseError: Se o campo ou o formulário não forem encontrados.
+    """
+    soup = BeautifulSoup(html, HTML_PARSER)
+    field = soup.find(id=field_id)
+    form = field.find_parent('form') if field else None
+    if not form or not field.get('name'):
+        raise ProjudiParseError(f"Formulário com o campo '{field_id}' não encontrado.")
+
+    fields = []
+    for element in form.find_all(['input', 'select', 'textarea']):
+        name = element.get('name')
+        if not name or element is field:
+            continue
+        if element.name == 'select':
+            option = element.find('option', selected=True) or element.find('option')
+            if option is not None:
+                fields.append((name, option.get('value', option.get_text(strip=True))))
+            continue
+        input_type = (element.get('type') or 'text').lower()
+        if input_type in ('submit', 'button', 'image', 'reset'):
+            # Apenas o botão de pesquisa é enviado, como no clique feito pelo navegador.
+            if submit_id and element.get('id') == submit_id:
+                fields.append((name, element.get('value', '')))
+            continue
+        if input_type in ('checkbox', 'radio') and not element.has_attr('checked'):
+            continue
+        fields.append((name, element.get('value', '')))
+
+    action_url = urljoin(page_url, form.get('action') or page_url)
+    method = (form.get('method') or 'get').lower()
+    return action_url, method, fields, field['name']
+
+def is_login_page(html, login_field_id):
+    """Indica se a resposta é a página de login (sessão expirada)."""
+    return BeautifulSoup(html, HTML_PARSER).find(id=login_field_id) is not None
+
+def extract_party_info(row):
+    """
+    Versão HTML de `ProjudiSearchPage.extract_process_info_from_row`.
+
+    Returns:
+        tuple: (nome_executado, segredo_de_justica).
+    """
+    executed_name = STATUS_NAO_DISPONIVEL
+    all_cells = row.find_all('td')
+
+    if any(STATUS_SEGREDO_JUSTICA in _text(cell) for cell in all_cells):
+        return STATUS_NAO_DISPONIVEL, True
+
+    if len(all_cells) > 2: # Terceira coluna geralmente contém os dados das partes
+        table_form = all_cells[2].select_one('table.form')
+        if table_form:
+            requerido_font = table_form.find(lambda tag: tag.name == 'font' and 'Requerido:' in tag.get_text())
+            requerido_tr = requerido_font.parent.parent if requerido_font and requerido_font.parent else None
+            if requerido_tr is not None:
+                tds = requerido_tr.find_all('td')
+                li = tds[1].find('li') if len(tds) > 1 else None
+                if li and _text(li):
+                    executed_name = _text(li)
+
+    for i, cell in enumerate(all_cells):
+        cell_text = _text(cell)
+        for label in EXECUTED_PARTY_LABELS:
+            if label.replace(":", "") in cell_text and (i + 1) < len(all_cells):
+                ul = all_cells[i + 1].find('ul')
+                li = ul.find('li') if ul else None
+                if li and _text(li):
+                    executed_name = _text(li)
+                    break
+            if executed_name != STATUS_NAO_DISPONIVEL:
+                break
+
+    if executed_name != STATUS_NAO_DISPONIVEL:
+        executed_name = clean_party_name(executed_name)
+    return executed_name, False
+
+def parse_search_results(html, process_number, page_url):
+    """
+    Interpreta a página de resultados da busca.
+
+    Returns:
+        dict: {"no_records": bool, "found": bool, "executed_name": str, "segredo": bool,
+               "detail_url": str or None}. `detail_url` é None se o link não for navegável via HTTP.
+    """
+    soup = BeautifulSoup(html, HTML_PARSER)
+    page_text = soup.get_text(' ')
+    result = {"no_records": False, "found": False, "executed_name": STATUS_NAO_DISPONIVEL,
+              "segredo": False, "detail_url": None}
+
+    process_td = soup.find(lambda tag: tag.name == 'td' and _text(tag) == process_number)
+    if process_td is None:
+        result["no_records"] = NO_RECORDS_TEXT in page_text
+        return result
+
+    result["found"] = True
+    row = process_td.find_parent('tr')
+    if row is not None:
+        result["executed_name"], result["segredo"] = extract_party_info(row)
+    # Como na consulta pelo navegador, a menção a segredo de justiça em qualquer ponto da página também vale.
+    result["segredo"] = result["segredo"] or STATUS_SEGREDO_JUSTICA in page_text
+
+    link = process_td.find('a', href=True)
+    href = link['href'].strip() if link else ""
+    if href and not href.lower().startswith(('javascript:', '#')):
+        result["detail_url"] = urljoin(page_url, href)
+    return result
+
+def _movement_fields(row):
+    """(data, descricao) de uma linha da tabela de movimentações."""
+    date = STATUS_NAO_DISPONIVEL
+    description = STATUS_MOVIMENTACAO_NAO_ENCONTRADA
+    all_cells = row.find_all('td')
+    if len(all_cells) > 2:
+        match_date = _DATE_RE.search(_text(all_cells[2]))
+        if match_date:
+            date = match_date.group(0)
+    if len(all_cells) > 3:
+        event = all_cells[3].find('b')
+        description = _text(event) if event else _text(all_cells[3])
+    return date, description
+
+def _movement_rows(html):
+    """
+    Linhas (com células) da tabela de movimentações, da mais recente para a mais antiga.
+    Uma tabela sem linhas é válida (processo sem movimentações) se tiver o cabeçalho.
+    """
+    soup = BeautifulSoup(html, HTML_PARSER)
+    table = soup.select_one('table.resultTable')
+    if table is None:
+        raise ProjudiParseError("Tabela de movimentações não encontrada.")
+
+    # O navegador insere o <tbody> automaticamente; no HTML original ele pode não existir.
+    body = table.find('tbody') or table
+    rows = [tr for tr in body.find_all('tr') if tr.find('td')]
+    if not rows and table.find('th') is None:
+        raise ProjudiParseError("Tabela de movimentações sem linhas nem cabeçalho.")
+    return rows
+
+def parse_last_movement(html):
+    """
+    Versão HTML de `ProjudiProcessDetailPage.extract_last_movement`.
+
+    Returns:
+        tuple: (data, descricao) da primeira linha da tabela de movimentações, ou
+               (STATUS_NAO_DISPONIVEL, STATUS_MOVIMENTACAO_NAO_ENCONTRADA) se a tabela estiver vazia.
+
+    Raises:
+        ProjudiParseError: Se a tabela de movimentações (ou o cabeçalho de uma tabela vazia) não for encontrada.
+    """
+    rows = _movement_rows(html)
+    if not rows:
+        return STATUS_NAO_DISPONIVEL, STATUS_MOVIMENTACAO_NAO_ENCONTRADA
+    return _movement_fields(rows[0])
+
+def parse_movements(html):
+    """
+    Todas as movimentações da página de detalhes (histórico completo).
+
+    Returns:
+        list: Pares (data, descricao), da movimentação mais recente para a mais antiga (vazia se não houver).
+
+    Raises:
+        ProjudiParseError: Se a tabela de movimentações (ou o cabeçalho de uma tabela vazia) não for encontrada.
+    """
+    return [_movement_fields(row) for row in _movement_rows(html)]
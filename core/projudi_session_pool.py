@@ -0,0 +1,229 @@
+# Este módulo mantém um pool de sessões do PROJUDI já autenticadas, evitando que
+# cada consulta precise abrir um novo Chrome, fazer login e navegar pelos menus.
+import logging
+import os
+import threading
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service as ChromeService
+from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import WebDriverException, SessionNotCreatedException
+
+from core.projudi_pages import ProjudiScraper
+
+from utils.metrics import span, STAGE_CHROME_LAUNCH, STAGE_CHROMEDRIVER_RESOLVE
+from utils.constants import (
+    PROJUDI_SESSION_POOL_SIZE, PROJUDI_IMPLICIT_WAIT, PROJUDI_CLIENT_MODE, CHROMEDRIVER_PATH_CACHE,
+    PROJUDI_LEAN_BROWSER, PROJUDI_BLOCKED_URL_PATTERNS
+)
+
+logger = logging.getLogger(__name__)
+
+_driver_path_lock = threading.Lock()
+_driver_path = None # Caminho do chromedriver já resolvido neste processo
+
+def _read_cached_driver_path(cache_path):
+    try:
+        with open(cache_path, encoding="utf-8") as cache_file:
+            path = cache_file.read().strip()
+    except OSError:
+        return None
+    return path if path and os.path.isfile(path) else None
+
+def _write_cached_driver_path(cache_path, path):
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as cache_file:
+            cache_file.write(path)
+        os.replace(temp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Não foi possível gravar o caminho do chromedriver em {cache_path}: {e}")
+
+def resolve_chromedriver_path(refresh=False, cache_path=CHROMEDRIVER_PATH_CACHE):
+    """
+    Retorna o caminho do chromedriver. `ChromeDriverManager().install()` (resolução de versão, que pode
+    acessar a rede) só é chamado quando o caminho ainda não é conhecido: ele é guardado em memória e em
+    `cache_path`, e reutilizado pelos demais navegadores, pelos workers do PROJUDI e pelas execuções seguintes.
+
+    Args:
+        refresh (bool): Ignora o caminho guardado e o resolve novamente (por exemplo, após atualizar o Chrome).
+    """
+    global _driver_path
+    with span(STAGE_CHROMEDRIVER_RESOLVE), _driver_path_lock:
+        if not refresh:
+            if _driver_path and os.path.isfile(_driver_path):
+                return _driver_path
+            _driver_path = _read_cached_driver_path(cache_path)
+            if _driver_path:
+                return _driver_path
+        _driver_path = ChromeDriverManager().install()
+        _write_cached_driver_path(cache_path, _driver_path)
+        return _driver_path
+
+def create_projudi_driver(lean=PROJUDI_LEAN_BROWSER):
+    """
+    Cria e configura uma instância do Chrome (headless) pronta para navegar no PROJUDI.
+
+    Args:
+        lean (bool): Usa o perfil enxuto, que não baixa imagens, fontes, mídia nem CSS
+                     (frames e JavaScript, necessários ao PROJUDI, são mantidos).
+
+    Returns:
+        webdriver.Chrome: O driver do Selenium configurado.
+    """
+    with span(STAGE_CHROME_LAUNCH):
+        options = _chrome_options(lean)
+        try:
+            driver = _launch_chrome(resolve_chromedriver_path(), options)
+        except SessionNotCreatedException as e:
+            # O chromedriver guardado não é compatível com o Chrome instalado (provavelmente atualizado).
+            logger.warning(f"PROJUDI: chromedriver incompatível com o Chrome ({e.msg}); resolvendo novamente.")
+            driver = _launch_chrome(resolve_chromedriver_path(refresh=True), options)
+        if lean:
+            _block_heavy_resources(driver)
+        return driver
+
+def _block_heavy_resources(driver):
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": PROJUDI_BLOCKED_URL_PATTERNS})
+    except WebDriverException as e:
+        logger.warning(f"PROJUDI: Não foi possível bloquear recursos pesados via CDP: {e}")
+
+def _chrome_options(lean):
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless") # Recomentar para execução silenciosa
+    options.add_argument("--start-maximized")
+    options.add_argument("--log-level=3")
+    options.add_experimental_option('excludeSwitches', ['enable-logging'])
+    options.add_argument("--disable-gpu")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-extensions")
+    options.page_load_strategy = 'eager'
+    if lean:
+        # Imagens também são bloqueadas pelas preferências, antes mesmo de a regra do CDP ser aplicada.
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        options.add_argument("--mute-audio")
+    return options
+
+def _launch_chrome(driver_path, options):
+    log_path = os.devnull
+
+    service_args_list = ['--log-level=OFF']
+
+    service = ChromeService(
+        driver_path,
+        log_path=log_path,
+        service_args=service_args_list
+    )
+
+    driver = webdriver.Chrome(service=service, options=options)
+    driver.implicitly_wait(PROJUDI_IMPLICIT_WAIT) # Segundos que o driver aguardará elementos
+    return driver
+
+def create_projudi_scraper(driver, client_mode=PROJUDI_CLIENT_MODE):
+    """
+    Cria o scraper do PROJUDI para o driver: `ProjudiScraper` (modo "selenium") ou
+    `ProjudiHybridScraper` (modo "hybrid", busca via HTTP com a sessão do navegador).
+    """
+    if client_mode == "hybrid":
+        from core.projudi_http_client import ProjudiHybridScraper
+        return ProjudiHybridScraper(driver)
+    return ProjudiScraper(driver)
+
+class ProjudiSessionPool:
+    """
+    Pool de sessões autenticadas do PROJUDI.
+
+    Cada sessão é um `ProjudiScraper` com seu próprio driver. As sessões são criadas sob demanda
+    (até `size`), reutilizadas entre consultas e só fazem novo login quando a sessão expira.
+    Sessões cujo driver apresentou falha são descartadas na devolução ao pool.
+    """
+    def __init__(self, username, password, size=PROJUDI_SESSION_POOL_SIZE, driver_factory=create_projudi_driver,
+                 client_mode=PROJUDI_CLIENT_MODE):
+        self.username = username
+        self.password = password
+        self.size = max(1, size)
+        self.driver_factory = driver_factory
+        self.client_mode = client_mode
+        self._idle = [] # Pilha (LIFO): reutiliza primeiro a sessão usada mais recentemente (mais "quente")
+        self._created = 0
+        # Protege `_idle` e `_created`; é notificada quando uma sessão é devolvida ou uma vaga é liberada.
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def _checkout(self):
+        with self._condition:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if self._created < self.size:
+                    self._created += 1
+                    break
+                # Todas as sessões estão em uso: aguarda uma ser devolvida ou descartada.
+                self._condition.wait()
+
+        try:
+            logger.info("PROJUDI: Iniciando nova sessão do navegador para o pool.")
+            return create_projudi_scraper(self.driver_factory(), self.client_mode)
+        except Exception:
+            self._release_slot()
+            raise
+
+    def _release_slot(self):
+        # A vaga liberada pode ser usada por quem aguarda em `_checkout` para criar uma nova sessão.
+        with self._condition:
+            self._created -= 1
+            self._condition.notify()
+
+    def _checkin(self, scraper):
+        if scraper.broken or self._closed:
+            self._discard(scraper)
+            return
+        with self._condition:
+            self._idle.append(scraper)
+            self._condition.notify()
+
+    def _discard(self, scraper):
+        self._release_slot()
+        try:
+            scraper.driver.quit()
+        except WebDriverException as e:
+            logger.warning(f"Aviso: Erro ao fechar o driver do Selenium descartado pelo pool: {e}")
+
+    @contextmanager
+    def session(self):
+        """
+        Empresta uma sessão do pool durante o bloco `with` e a devolve ao final.
+        """
+        scraper = self._checkout()
+        try:
+            yield scraper
+        except WebDriverException:
+            scraper.broken = True
+            raise
+        finally:
+            self._checkin(scraper)
+
+    def lookup(self, process_number):
+        """
+        Consulta a última movimentação de um processo usando uma sessão do pool.
+
+        Returns:
+            tuple: (data_da_movimentacao, descricao_da_movimentacao, nome_executado).
+        """
+        with self.session() as scraper:
+            return scraper.get_movement_in_session(process_number, self.username, self.password)
+
+    def close(self):
+        """
+        Encerra todas as sessões ociosas do pool. Sessões em uso são encerradas ao serem devolvidas.
+        """
+        self._closed = True
+        with self._condition:
+            idle, self._idle = self._idle, []
+        for scraper in idle:
+            self._discard(scraper)
@@ -0,0 +1,287 @@
+# Este módulo mantém um pool de processos de consulta ao PROJUDI. Cada processo (worker) tem seu
+# próprio Chrome e `ProjudiScraper`, autenticado uma única vez, e retira os números de processo de
+# uma fila compartilhada. Os resultados (e os logs dos workers) voltam ao processo principal por filas,
+# permitindo várias consultas ao PROJUDI em andamento ao mesmo tempo.
+import itertools
+import logging
+import logging.handlers
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from utils.metrics import metrics
+from utils.movement_history import movement_history
+
+from utils.constants import (
+    STATUS_NAO_DISPONIVEL, PROJUDI_ERRO_WEBDRIVER, PROJUDI_ERRO_GERAL, PROJUDI_WORKER_PROCESSES, PROJUDI_CLIENT_MODE,
+    PROJUDI_WORKER_LOOKUP_TIMEOUT
+)
+
+logger = logging.getLogger(__name__)
+
+# Mensagens enviadas pelos workers ao processo principal
+_MSG_STARTED = "started" # (tipo, id_do_worker, id_da_tarefa): o worker começou uma consulta
+_MSG_RESULT = "result" # (tipo, id_do_worker, id_da_tarefa, resultado, amostras_de_metricas, linhas_do_historico)
+
+_DISPATCHER_POLL_INTERVAL = 1.0 # Intervalo (s) para verificar se algum worker terminou inesperadamente
+
+class _ForwardToLogger(logging.Handler):
+    """Reemite, no processo principal, os registros de log recebidos dos workers."""
+    def emit(self, record):
+        target = logging.getLogger(record.name)
+        if target.isEnabledFor(record.levelno):
+            target.handle(record)
+
+def _worker_main(worker_id, username, password, client_mode, collect_history, driver_factory, task_queue, result_queue,
+                 log_queue):
+    """
+    Laço de um worker: consulta os processos da fila até receber o sentinela `None`.
+    O Chrome é iniciado na primeira consulta (com `driver_factory`, por padrão `create_projudi_driver`)
+    e recriado se o driver falhar.
+    """
+    root_logger = logging.getLogger()
+    root_logger.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    root_logger.setLevel(logging.INFO)
+    if collect_history:
+        movement_history.enable()
+
+    from selenium.common.exceptions import WebDriverException
+    from core.projudi_session_pool import create_projudi_driver, create_projudi_scraper
+    driver_factory = driver_factory or create_projudi_driver
+
+    scraper = None
+    try:
+        for task_id, process_number in iter(task_queue.get, None):
+            result_queue.put((_MSG_STARTED, worker_id, task_id))
+            try:
+                if scraper is None:
+                    logger.info(f"PROJUDI: Worker {worker_id} iniciando sessão do navegador.")
+                    scraper = create_projudi_scraper(driver_factory(), client_mode)
+                result = scraper.get_movement_in_session(process_number, username, password)
+            except WebDriverException as wde:
+                logger.error(f"Erro do WebDriver ao consultar PROJUDI para {process_number}: {wde}", exc_info=True)
+                result = (STATUS_NAO_DISPONIVEL, PROJUDI_ERRO_WEBDRIVER, STATUS_NAO_DISPONIVEL)
+                if scraper is not None:
+                    scraper.broken = True
+            except Exception as e:
+                logger.error(f"Erro geral ao consultar PROJUDI para {process_number} com Selenium: {e}", exc_info=True)
+                result = (STATUS_NAO_DISPONIVEL, PROJUDI_ERRO_GERAL, STATUS_NAO_DISPONIVEL)
+
+            if scraper is not None and scraper.broken:
+                # Driver com falha: será recriado na próxima consulta.
+                try:
+                    scraper.driver.quit()
+                except Exception:
+                    pass
+                scraper = None
+            # As durações medidas no worker (Chrome, login, busca...) e o histórico seguem junto com o resultado.
+            result_queue.put((_MSG_RESULT, worker_id, task_id, result, metrics.drain(), movement_history.drain()))
+    finally:
+        if scraper is not None:
+            try:
+                scraper.driver.quit()
+            except Exception as e:
+                logger.warning(f"Aviso: Erro ao fechar o driver do worker {worker_id}: {e}")
+
+class ProjudiWorkerPool:
+    """
+    Pool de processos de consulta ao PROJUDI, com a mesma interface de `ProjudiSessionPool`
+    (`lookup` e `close`).
+
+    `lookup` pode ser chamada de várias threads ao mesmo tempo: cada chamada enfileira o processo e
+    aguarda o resultado, que é entregue por uma thread despachante. Se um worker terminar
+    inesperadamente, a consulta em andamento recebe `PROJUDI_ERRO_WEBDRIVER` e o worker é substituído.
+    Uma consulta sem resultado após `lookup_timeout` segundos (por exemplo, perdida por um worker que
+    terminou antes de informar o início) também recebe `PROJUDI_ERRO_WEBDRIVER`; o worker que a estiver
+    executando é encerrado e substituído, para não ocupar a vaga indefinidamente.
+
+    `driver_factory` deve ser uma função de nível de módulo (é enviada aos workers por referência).
+    """
+    def __init__(self, username, password, processes=PROJUDI_WORKER_PROCESSES, client_mode=PROJUDI_CLIENT_MODE,
+                 collect_history=False, driver_factory=None, lookup_timeout=PROJUDI_WORKER_LOOKUP_TIMEOUT):
+        self.username = username
+        self.password = password
+        self.processes = max(1, processes)
+        self.client_mode = client_mode
+        self.collect_history = collect_history
+        self.driver_factory = driver_factory
+        self.lookup_timeout = lookup_timeout
+        # "spawn": os workers não herdam threads nem conexões abertas do processo principal.
+        self._context = multiprocessing.get_context("spawn")
+        self._task_queue = self._context.Queue()
+        self._result_queue = self._context.Queue()
+        self._log_queue = self._context.Queue()
+        self._log_listener = logging.handlers.QueueListener(self._log_queue, _ForwardToLogger())
+        self._log_listener.start()
+
+        self._task_ids = itertools.count()
+        self._futures = {}
+        self._in_progress = {} # id_do_worker -> id_da_tarefa
+        self._abandoned = set() # Tarefas cujo `lookup` desistiu por tempo esgotado (protegido por `_lock`)
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self._workers = {}
+        for worker_id in range(self.processes):
+            self._start_worker(worker_id)
+
+        self._dispatcher = threading.Thread(target=self._dispatch_results, name="projudi-workers", daemon=True)
+        self._dispatcher.start()
+
+    def _start_worker(self, worker_id):
+        process = self._context.Process(
+            target=_worker_main,
+            args=(worker_id, self.username, self.password, self.client_mode, self.collect_history, self.driver_factory,
+                  self._task_queue, self._result_queue, self._log_queue),
+            name=f"projudi-worker-{worker_id}",
+            daemon=True
+        )
+        process.start()
+        self._workers[worker_id] = process
+
+    def _resolve(self, task_id, result):
+        with self._lock:
+            future = self._futures.pop(task_id, None)
+            self._abandoned.discard(task_id)
+        if future is not None:
+            future.set_result(result)
+
+    def _handle_message(self, message):
+        kind, worker_id, task_id = message[:3]
+        if kind == _MSG_STARTED:
+            self._in_progress[worker_id] = task_id
+        else:
+            self._in_progress.pop(worker_id, None)
+            metrics.merge(message[4])
+            movement_history.merge(message[5])
+            self._resolve(task_id, message[3])
+
+    def _drain_messages(self):
+        """Processa todas as mensagens já recebidas. Retorna False se a fila de resultados foi fechada."""
+        while True:
+            try:
+                message = self._result_queue.get_nowait()
+            except queue.Empty:
+                return True
+            except (EOFError, OSError):
+                return False
+            self._handle_message(message)
+
+    def _dispatch_results(self):
+        last_health_check = time.monotonic()
+        while True:
+            if not self._closed and time.monotonic() - last_health_check >= _DISPATCHER_POLL_INTERVAL:
+                if not self._replace_dead_workers():
+                    return
+                last_health_check = time.monotonic()
+            try:
+                message = self._result_queue.get(timeout=_DISPATCHER_POLL_INTERVAL)
+            except queue.Empty:
+                if self._closed:
+                    return
+                continue
+            except (EOFError, OSError):
+                return
+            self._handle_message(message)
+
+    def _terminate_hung_workers(self):
+        """Encerra os workers presos em uma consulta cujo `lookup` já desistiu por tempo esgotado."""
+        with self._lock:
+            hung_workers = [worker_id for worker_id, task_id in self._in_progress.items() if task_id in self._abandoned]
+        for worker_id in hung_workers:
+            logger.error(f"PROJUDI: Worker {worker_id} excedeu o tempo limite da consulta. Encerrando...")
+            process = self._workers[worker_id]
+            process.terminate()
+            process.join(timeout=10)
+            if process.is_alive():
+                process.kill()
+                process.join()
+
+    def _replace_dead_workers(self):
+        """
+        Substitui os workers que terminaram inesperadamente (ou que foram encerrados por estarem presos em
+        uma consulta abandonada), falhando a consulta que cada um tinha em andamento.
+        Retorna False se a fila de resultados foi fechada.
+        """
+        # As mensagens pendentes são lidas antes e depois da verificação: o "started" de um worker que
+        # terminou pode ainda estar na fila, e sem ele a consulta em andamento não seria identificada.
+        if not self._drain_messages():
+            return False
+        self._terminate_hung_workers()
+        dead_workers = [worker_id for worker_id, process in self._workers.items() if not process.is_alive()]
+        if not dead_workers:
+            return True
+        if not self._drain_messages():
+            return False
+        for worker_id in dead_workers:
+            process = self._workers[worker_id]
+            logger.error(f"PROJUDI: Worker {worker_id} terminou inesperadamente (código {process.exitcode}). Reiniciando...")
+            task_id = self._in_progress.pop(worker_id, None)
+            if task_id is not None:
+                self._resolve(task_id, (STATUS_NAO_DISPONIVEL, PROJUDI_ERRO_WEBDRIVER, STATUS_NAO_DISPONIVEL))
+            self._start_worker(worker_id)
+        return True
+
+    def submit(self, process_number):
+        """
+        Enfileira a consulta de um processo.
+
+        Returns:
+            concurrent.futures.Future: Resolvido com (data_da_movimentacao, descricao_da_movimentacao, nome_executado).
+        """
+        if self._closed:
+            raise RuntimeError("O pool de workers do PROJUDI já foi encerrado.")
+        future = Future()
+        task_id = next(self._task_ids)
+        with self._lock:
+            self._futures[task_id] = future
+        self._task_queue.put((task_id, process_number))
+        return future
+
+    def lookup(self, process_number):
+        """
+        Consulta a última movimentação de um processo em um dos workers, aguardando no máximo `lookup_timeout` segundos.
+
+        Returns:
+            tuple: (data_da_movimentacao, descricao_da_movimentacao, nome_executado).
+        """
+        future = self.submit(process_number)
+        try:
+            return future.result(timeout=self.lookup_timeout)
+        except FutureTimeoutError:
+            pass
+        with self._lock:
+            abandoned = [task_id for task_id, pending in self._futures.items() if pending is future]
+            for task_id in abandoned:
+                del self._futures[task_id]
+            # O worker que estiver com a tarefa é encerrado e substituído pela thread despachante.
+            self._abandoned.update(abandoned)
+        if not abandoned:
+            return future.result() # O resultado chegou durante o tempo esgotado e já está sendo entregue
+        logger.error(f"PROJUDI: Sem resultado dos workers para {process_number} após {self.lookup_timeout}s.")
+        return (STATUS_NAO_DISPONIVEL, PROJUDI_ERRO_WEBDRIVER, STATUS_NAO_DISPONIVEL)
+
+    def close(self):
+        """
+        Encerra os workers (após concluírem as consultas já enfileiradas) e seus navegadores.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._workers:
+            self._task_queue.put(None)
+        for process in self._workers.values():
+            process.join(timeout=30)
+            if process.is_alive():
+                process.terminate()
+        self._dispatcher.join()
+        self._log_listener.stop()
+
+        # Consultas que não chegaram a ser concluídas (por exemplo, worker encerrado à força).
+        with self._lock:
+            pending = list(self._futures.values())
+            self._futures.clear()
+        for future in pending:
+            future.set_result((STATUS_NAO_DISPONIVEL, PROJUDI_ERRO_GERAL, STATUS_NAO_DISPONIVEL))
@@ -0,0 +1,48 @@
+# Este módulo implementa um limitador de taxa do tipo "token bucket", usado para controlar
+# o ritmo das requisições aos portais do tribunal sem pausas fixas entre as consultas.
+import asyncio
+import threading
+import time
+
+class TokenBucket:
+    """
+    Limitador de taxa "token bucket" seguro para threads e utilizável a partir de código asyncio.
+
+    O balde acumula até `capacity` fichas, repostas à taxa de `rate` fichas por segundo.
+    Cada requisição consome uma ficha; quando o balde está vazio, a chamada aguarda apenas
+    o tempo necessário até a próxima ficha ficar disponível.
+    """
+    def __init__(self, rate, capacity=1):
+        if rate <= 0:
+            raise ValueError("A taxa do limitador deve ser maior que zero.")
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(capacity))
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """
+        Reserva uma ficha e retorna quantos segundos o chamador deve aguardar antes de usá-la.
+        O saldo pode ficar negativo, o que enfileira os chamadores de forma justa.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        """Bloqueia a thread atual até que uma ficha esteja disponível."""
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        """Versão assíncrona de `acquire`, que não bloqueia o event loop."""
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
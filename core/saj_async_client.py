@@ -0,0 +1,180 @@
+# Este módulo implementa o modo asyncio de consulta ao SAJ: as requisições HTTP são feitas
+# com aiohttp, com limite de conexões simultâneas por host e controle de taxa por token bucket.
+# O parsing e o eventual fallback para o PROJUDI (Selenium) rodam em threads auxiliares,
+# para não bloquear o event loop.
+import asyncio
+import logging
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from core.tjam_scraper import (
+    build_saj_url, parse_saj_page_if_changed, conditional_headers, resolve_with_projudi_fallback, route_to_projudi_first,
+    record_route, saj_rate_limiter, saj_retry_policy, SajPage
+)
+from core.http_policy import SajUnavailableError, circuit_breaker_for
+
+from utils.metrics import span, STAGE_SAJ_RATE_LIMIT, STAGE_SAJ_FETCH, STAGE_SAJ_PARSE
+
+from utils.constants import (
+    STATUS_NAO_DISPONIVEL, STATUS_DESCRICAO_NAO_ENCONTRADA, STATUS_CONSULTA_FALHOU, SOURCE_SAJ,
+    SAJ_MAX_CONCURRENCY_PER_HOST, SAJ_CONNECT_TIMEOUT, SAJ_READ_TIMEOUT
+)
+
+# Erros de rede tratados como transitórios (a requisição é repetida).
+RETRYABLE_CLIENT_ERRORS = (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError)
+
+logger = logging.getLogger(__name__)
+
+class AsyncSajClient:
+    """
+    Cliente asyncio do SAJ.
+
+    Cada host recebe um semáforo próprio (`max_concurrency_per_host`), e todas as requisições
+    passam pelo limitador de taxa compartilhado antes de serem enviadas. Erros transitórios seguem
+    a mesma política do modo com threads (ver `core.tjam_scraper.fetch_saj_page`).
+    """
+    def __init__(self, username, password, max_concurrency_per_host=SAJ_MAX_CONCURRENCY_PER_HOST, rate_limiter=saj_rate_limiter,
+                 routing_index=None, fingerprints=None):
+        self.username = username
+        self.password = password
+        self.routing_index = routing_index
+        self.fingerprints = fingerprints
+        self.max_concurrency_per_host = max(1, max_concurrency_per_host)
+        self.rate_limiter = rate_limiter
+        self._host_semaphores = {}
+
+    def _semaphore_for(self, url):
+        host = urlsplit(url).hostname
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency_per_host)
+            self._host_semaphores[host] = semaphore
+        return semaphore
+
+    async def fetch_page(self, http_session, url, headers=None):
+        """
+        Equivalente assíncrono de `fetch_saj_page`.
+
+        Returns:
+            SajPage: O HTML da página e os validadores da resposta.
+
+        Raises:
+            SajUnavailableError: Se o SAJ não respondeu após todas as tentativas (ou ficou fora do ar).
+            aiohttp.ClientResponseError: Para respostas de erro não transitórias (por exemplo, 404).
+        """
+        breaker = circuit_breaker_for(url)
+        last_error = retry_after = None
+        for attempt in range(saj_retry_policy.max_attempts):
+            if attempt:
+                await asyncio.sleep(saj_retry_policy.delay(attempt - 1, retry_after))
+                retry_after = None
+            await breaker.wait_async()
+            try:
+                async with self._semaphore_for(url):
+                    with span(STAGE_SAJ_RATE_LIMIT):
+                        await self.rate_limiter.acquire_async()
+                    with span(STAGE_SAJ_FETCH):
+                        async with http_session.get(url, headers=headers) as response:
+                            if not saj_retry_policy.is_retryable_status(response.status):
+                                breaker.record_success() # O portal respondeu, mesmo que com erro
+                                response.raise_for_status()
+                                not_modified = response.status == 304
+                                return SajPage("" if not_modified else await response.text(), response.headers.get("ETag"),
+                                               response.headers.get("Last-Modified"), not_modified)
+                            last_error = f"HTTP {response.status}"
+                            retry_after = response.headers.get("Retry-After")
+            except RETRYABLE_CLIENT_ERRORS as e:
+                last_error = e.__class__.__name__ if isinstance(e, asyncio.TimeoutError) else e
+            except aiohttp.ClientResponseError:
+                raise
+            except BaseException:
+                breaker.release_probe()
+                raise
+            breaker.record_failure()
+            logger.info(f"SAJ: tentativa {attempt + 1}/{saj_retry_policy.max_attempts} falhou para {url} ({last_error}).")
+        raise SajUnavailableError(f"{saj_retry_policy.max_attempts} tentativas sem resposta ({last_error})")
+
+    async def get_process_movement(self, http_session, process_number):
+        """
+        Equivalente assíncrono de `get_tjam_process_movement_with_source`.
+
+        Returns:
+            tuple: (data_da_movimentacao, descricao_da_movimentacao, nome_executado, sistema_de_origem).
+        """
+        routed_result = projudi_result = None
+        if self.routing_index is not None:
+            routed_result, projudi_result = await asyncio.to_thread(route_to_projudi_first, process_number, self.username,
+                                                                    self.password, self.routing_index)
+        if routed_result is not None:
+            record_route(self.routing_index, process_number, routed_result)
+            return routed_result
+
+        url = build_saj_url(process_number)
+        saj_result = (STATUS_NAO_DISPONIVEL, STATUS_DESCRICAO_NAO_ENCONTRADA, STATUS_NAO_DISPONIVEL)
+
+        try:
+            logger.info(f"Consultando SAJ/TJAM (asyncio) para o processo: {process_number}")
+            stored_page = None
+            if self.fingerprints is not None:
+                stored_page = await asyncio.to_thread(self.fingerprints.get, process_number)
+            page = await self.fetch_page(http_session, url, conditional_headers(stored_page))
+
+            with span(STAGE_SAJ_PARSE):
+                date, description, executed_name, fallback_reason = await asyncio.to_thread(
+                    parse_saj_page_if_changed, process_number, page, self.fingerprints, stored_page
+                )
+            saj_result = (date, description, executed_name)
+
+        except SajUnavailableError as e:
+            # SAJ fora do ar: não há indicação de que o processo esteja no PROJUDI.
+            logger.warning(f"SAJ indisponível para o processo {process_number}: {e}. O processo não foi consultado.")
+            return STATUS_NAO_DISPONIVEL, STATUS_CONSULTA_FALHOU, STATUS_NAO_DISPONIVEL, SOURCE_SAJ
+        except aiohttp.ClientError as e:
+            fallback_reason = f"erro na resposta do SAJ ({e})"
+            logger.warning(f"Erro na resposta do TJAM para o processo {process_number}: {e}. Tentando PROJUDI...")
+        except Exception as e:
+            fallback_reason = f"erro inesperado ({e})"
+            logger.error(f"Erro ao processar o processo {process_number} no TJAM: {e}. Tentando PROJUDI...", exc_info=True)
+
+        if not fallback_reason:
+            result = (*saj_result, SOURCE_SAJ)
+        else:
+            result = await asyncio.to_thread(resolve_with_projudi_fallback, process_number, saj_result,
+                                             fallback_reason, self.username, self.password, projudi_result)
+        record_route(self.routing_index, process_number, result)
+        return result
+
+    async def run(self, lookups, on_result):
+        """
+        Consulta os processos, com no máximo `max_concurrency_per_host` consultas em andamento.
+
+        Args:
+            lookups (iterable): Pares `(indice, numero)` a consultar; são lidos sob demanda.
+            on_result (callable): Chamado como `on_result(indice, numero, resultado, sistema_de_origem)`
+                a cada consulta concluída, sempre a partir da thread do event loop.
+        """
+        lookups_iter = iter(lookups)
+        connector = aiohttp.TCPConnector(limit_per_host=self.max_concurrency_per_host)
+        timeout = aiohttp.ClientTimeout(sock_connect=SAJ_CONNECT_TIMEOUT, sock_read=SAJ_READ_TIMEOUT)
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as http_session:
+            async def worker():
+                for index, process_number in lookups_iter:
+                    try:
+                        *result, source = await self.get_process_movement(http_session, process_number)
+                    except Exception as e:
+                        logger.error(f"Erro inesperado ao consultar o processo {process_number}: {e}", exc_info=True)
+                        result, source = (STATUS_NAO_DISPONIVEL, STATUS_CONSULTA_FALHOU, STATUS_NAO_DISPONIVEL), SOURCE_SAJ
+                    on_result(index, process_number, tuple(result), source)
+
+            await asyncio.gather(*(worker() for _ in range(self.max_concurrency_per_host)))
+
+def run_lookups_async(lookups, username, password, max_concurrency_per_host, on_result, routing_index=None,
+                      fingerprints=None):
+    """
+    Executa as consultas no modo asyncio. Bloqueia a thread chamadora até o fim do lote.
+    """
+    client = AsyncSajClient(username, password, max_concurrency_per_host, routing_index=routing_index,
+                            fingerprints=fingerprints)
+    asyncio.run(client.run(lookups, on_result))
@@ -0,0 +1,168 @@
+# Este módulo extrai os dados de uma página de processo do SAJ (TJAM).
+# Apenas as tabelas relevantes (partes e movimentações) são parseadas, usando o parser lxml
+# quando disponível, e as expressões regulares de limpeza são pré-compiladas.
+import hashlib
+import html as html_lib
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from utils.constants import (
+    STATUS_NAO_DISPONIVEL, STATUS_DATA_NAO_ENCONTRADA, STATUS_DESCRICAO_NAO_ENCONTRADA
+)
+
+try:
+    import lxml # noqa: F401 - apenas verifica a disponibilidade do parser
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+# IDs das únicas tabelas da página que interessam à extração.
+PARTS_TABLE_ID = "tablePartesPrincipais"
+ALL_MOVEMENTS_TABLE_ID = "tabelaTodasMovimentacoes"
+LAST_MOVEMENTS_TBODY_ID = "tabelaUltimasMovimentacoes"
+
+_RELEVANT_TABLES = SoupStrainer(id=[PARTS_TABLE_ID, ALL_MOVEMENTS_TABLE_ID, LAST_MOVEMENTS_TBODY_ID])
+
+_ADVOGADO_RE = re.compile(r'advogad[oa]:\s*.*', re.IGNORECASE)
+_PARTE_PREFIX_RE = re.compile(r"^\(parte\s+\w+\):\s*", re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r'\s+')
+_TAG_RE = re.compile(r'<[^>]*>')
+
+# Abertura do elemento com cada um dos IDs relevantes (o nome da tag fica no grupo 1).
+_ELEMENT_START_RES = {
+    element_id: re.compile(r'<(\w+)\b[^>]*\bid=["\']?' + element_id + r'["\'\s/>]', re.IGNORECASE)
+    for element_id in (PARTS_TABLE_ID, ALL_MOVEMENTS_TABLE_ID, LAST_MOVEMENTS_TBODY_ID)
+}
+_MOVEMENT_ROW_RE = re.compile(r'\bfundo(?:Claro|Escuro)\b')
+
+PASSIVE_PARTY_TERMS = ("executado", "embargante", "requerido", "réu")
+ACTIVE_PARTY_TERMS = ("exequente", "embargado", "requerente")
+
+TRANSFERIDO_PROJUDI_TEXT = "processo transferido para o projudi"
+SEM_MOVIMENTACOES_TEXT = "não há movimentações"
+
+def clean_party_name(full_name_text):
+    """
+    Remove do texto da parte os advogados, o prefixo "(parte ...):" e os espaços repetidos.
+    """
+    cleaned_name = _ADVOGADO_RE.sub('', full_name_text).strip()
+    cleaned_name = _PARTE_PREFIX_RE.sub('', cleaned_name).strip()
+    return _WHITESPACE_RE.sub(' ', cleaned_name).strip()
+
+def _page_text_lower(html):
+    """
+    Texto da página inteira em minúsculas, sem as tags, equivalente a `soup.get_text().lower()`
+    mas sem construir a árvore do documento. Só é usado quando as tabelas não foram conclusivas.
+    """
+    return html_lib.unescape(_TAG_RE.sub('', html)).lower()
+
+def _element_bounds(html, element_id):
+    """
+    Posições de início e fim do elemento com o ID indicado, contando as tags de mesmo nome aninhadas.
+
+    Returns:
+        tuple or None: (inicio, fim), ou None se o elemento não estiver na página.
+    """
+    start_match = _ELEMENT_START_RES[element_id].search(html)
+    if not start_match:
+        return None
+    tag_re = re.compile(r'<(/?)' + start_match.group(1) + r'\b[^>]*>', re.IGNORECASE)
+    depth = 0
+    for tag in tag_re.finditer(html, start_match.start()):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            return start_match.start(), tag.end()
+    return start_match.start(), len(html)
+
+def relevant_section(html):
+    """
+    Trecho do HTML que determina o resultado de `parse_saj_page`: da primeira à última tabela relevante.
+
+    Se não houver linhas de movimentação, o resultado depende do texto da página inteira
+    (motivo do fallback), e a página inteira é retornada.
+    """
+    bounds = {element_id: _element_bounds(html, element_id) for element_id in _ELEMENT_START_RES}
+    movements = bounds[ALL_MOVEMENTS_TABLE_ID] or bounds[LAST_MOVEMENTS_TBODY_ID]
+    if movements is None or not _MOVEMENT_ROW_RE.search(html, *movements):
+        return html
+    found = [element_bounds for element_bounds in bounds.values() if element_bounds]
+    return html[min(start for start, _ in found):max(end for _, end in found)]
+
+def saj_page_fingerprint(html):
+    """Hash do trecho relevante da página (ver `relevant_section`), para detectar páginas sem alteração."""
+    return hashlib.blake2b(relevant_section(html).encode("utf-8"), digest_size=16).hexdigest()
+
+def _extract_executed_name(parts_table):
+    for row in parts_table.find_all('tr', class_='fundoClaro'):
+        role_span = row.find('span', class_='tipoDeParticipacao')
+        if not role_span:
+            continue
+        role_text = role_span.get_text(strip=True).lower()
+
+        is_passive_party = any(term in role_text for term in PASSIVE_PARTY_TERMS)
+        is_active_party = any(term in role_text for term in ACTIVE_PARTY_TERMS)
+
+        if is_passive_party and not is_active_party:
+            name_td = row.find('td', class_='nomeParteEAdvogado')
+            if name_td:
+                return clean_party_name(name_td.get_text(separator=' ', strip=True))
+    return STATUS_NAO_DISPONIVEL
+
+def _movement_fields(row):
+    """(data, descricao) de uma linha da tabela de movimentações."""
+    date_element = row.find('td', class_='dataMovimentacao')
+    description_element = row.find('td', class_='descricaoMovimentacao')
+
+    date = date_element.text.strip() if date_element else STATUS_DATA_NAO_ENCONTRADA
+    raw_description = description_element.text.strip() if description_element else STATUS_DESCRICAO_NAO_ENCONTRADA
+    return date, _WHITESPACE_RE.sub(' ', raw_description).strip()
+
+def parse_saj_page(html, movements=None):
+    """
+    Extrai do HTML de uma página de processo do SAJ a última movimentação e o nome da parte passiva.
+
+    Args:
+        html (str): O conteúdo HTML da página de consulta.
+        movements (list, optional): Se informada, recebe `(data, descricao)` de todas as linhas da tabela
+            de movimentações, da mais recente para a mais antiga (histórico completo).
+
+    Returns:
+        tuple: (data, descricao, nome_executado, motivo_fallback). `motivo_fallback` é None quando
+               o SAJ trouxe uma movimentação conclusiva; caso contrário, descreve por que o
+               processo deve ser consultado no PROJUDI.
+    """
+    date = STATUS_NAO_DISPONIVEL
+    description = STATUS_DESCRICAO_NAO_ENCONTRADA
+
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=_RELEVANT_TABLES)
+
+    parts_table = soup.find('table', {'id': PARTS_TABLE_ID})
+    executed_name = _extract_executed_name(parts_table) if parts_table else STATUS_NAO_DISPONIVEL
+
+    # Tenta a tabela com todas as movimentações; senão, a de últimas movimentações.
+    movements_table = soup.find('table', {'id': ALL_MOVEMENTS_TABLE_ID})
+    if not movements_table:
+        movements_table = soup.find('tbody', {'id': LAST_MOVEMENTS_TBODY_ID})
+
+    if movements_table:
+        rows = movements_table.find_all('tr', class_=['fundoClaro', 'fundoEscuro'])
+        if movements is not None:
+            movements.extend(_movement_fields(row) for row in rows)
+        if rows:
+            date, description = _movement_fields(rows[0])
+
+            if TRANSFERIDO_PROJUDI_TEXT in description.lower():
+                return date, description, executed_name, "indica transferência"
+            # Movimentação encontrada e sem indicação de transferência: o SAJ é conclusivo
+            return date, description, executed_name, None
+
+    # As tabelas não foram conclusivas: identifica o motivo do fallback ao PROJUDI pelo texto da página.
+    page_content_text = _page_text_lower(html)
+    if TRANSFERIDO_PROJUDI_TEXT in page_content_text:
+        fallback_reason = "indica transferência"
+    elif SEM_MOVIMENTACOES_TEXT in page_content_text:
+        fallback_reason = "sem movimentações"
+    else:
+        fallback_reason = "não foi possível extrair movimentações"
+    return date, description, executed_name, fallback_reason
@@ -1,18 +1,255 @@
 import requests
-from bs4 import BeautifulSoup
-import re 
+from requests.adapters import HTTPAdapter
+import collections
 import logging 
+import threading
 from .projudi_orchestrator import get_projudi_process_movement
+from .saj_parser import parse_saj_page, saj_page_fingerprint
 import time
 
 # Importar constantes
 from utils.constants import (
-    STATUS_NAO_DISPONIVEL, STATUS_DATA_NAO_ENCONTRADA, STATUS_DESCRICAO_NAO_ENCONTRADA,
-    SLEEP_AFTER_PROJUDI_CONSULTA
+    STATUS_NAO_DISPONIVEL, STATUS_DESCRICAO_NAO_ENCONTRADA, STATUS_CONSULTA_FALHOU, SOURCE_SAJ, SOURCE_PROJUDI,
+    SAJ_MAX_WORKERS, SAJ_RATE_LIMIT_RPS, SAJ_RATE_LIMIT_BURST, PROJUDI_RATE_LIMIT_RPS, PROJUDI_RATE_LIMIT_BURST,
+    SAJ_CONNECT_TIMEOUT, SAJ_READ_TIMEOUT
 )
+from core.rate_limiter import TokenBucket
+from core.http_policy import RetryPolicy, SajUnavailableError, circuit_breaker_for
+from utils.result_cache import classify_outcome, OUTCOME_FRESH, OUTCOME_SEGREDO
+from utils.saj_fingerprints import PAGE_NEW, PAGE_CHANGED, PAGE_UNCHANGED
+from utils.movement_history import movement_history
+from utils.metrics import span, STAGE_SAJ_RATE_LIMIT, STAGE_SAJ_FETCH, STAGE_SAJ_PARSE, STAGE_PROJUDI_RATE_LIMIT
+
+# Resultados que confirmam em qual sistema o processo está (usados pelo índice de roteamento).
+CONCLUSIVE_OUTCOMES = (OUTCOME_FRESH, OUTCOME_SEGREDO)
+
+SAJ_HOST = "consultasaj.tjam.jus.br"
+SAJ_URL_TEMPLATE = "https://" + SAJ_HOST + "/cpopg/show.do?&processo.numero={process_number}"
+
+# Limitador de taxa compartilhado por todas as requisições ao SAJ (modo com threads e modo asyncio).
+saj_rate_limiter = TokenBucket(SAJ_RATE_LIMIT_RPS, SAJ_RATE_LIMIT_BURST)
+
+# Limitador de taxa compartilhado por todas as consultas ao PROJUDI (sessões do pool e workers).
+projudi_rate_limiter = TokenBucket(PROJUDI_RATE_LIMIT_RPS, PROJUDI_RATE_LIMIT_BURST)
+
+# Novas tentativas para erros transitórios do SAJ (modo com threads e modo asyncio).
+saj_retry_policy = RetryPolicy()
+
+# Erros de rede tratados como transitórios (a requisição é repetida).
+RETRYABLE_REQUEST_ERRORS = (
+    requests.exceptions.ConnectionError, requests.exceptions.Timeout, requests.exceptions.ChunkedEncodingError
+)
+
+# Resposta do SAJ: HTML da página, validadores enviados pelo servidor (ETag/Last-Modified, ou None) e
+# se o servidor respondeu 304 (página não modificada desde a consulta anterior; o HTML vem vazio).
+SajPage = collections.namedtuple("SajPage", ["html", "etag", "last_modified", "not_modified"])
+
+# Sessão HTTP compartilhada por todas as consultas ao SAJ (keep-alive e pool de conexões).
+_http_session = None
+_http_session_lock = threading.Lock()
+
+def configure_http_session(pool_size=SAJ_MAX_WORKERS):
+    """
+    (Re)cria a sessão HTTP compartilhada com um pool de conexões do tamanho indicado.
+    Deve ser chamada antes de iniciar um lote com `pool_size` consultas simultâneas.
+
+    Args:
+        pool_size (int): Número máximo de conexões simultâneas mantidas com o SAJ.
+
+    Returns:
+        requests.Session: A nova sessão compartilhada.
+    """
+    global _http_session
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size), pool_block=True)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    with _http_session_lock:
+        old_session, _http_session = _http_session, session
+    if old_session is not None:
+        old_session.close()
+    return session
+
+def get_http_session():
+    """
+    Retorna a sessão HTTP compartilhada do SAJ, criando-a com o tamanho padrão se necessário.
+    """
+    with _http_session_lock:
+        session = _http_session
+    return session if session is not None else configure_http_session()
+
+def build_saj_url(process_number):
+    """Monta a URL de consulta do processo no portal SAJ do TJAM."""
+    return SAJ_URL_TEMPLATE.format(process_number=process_number)
+
+def conditional_headers(stored_page):
+    """Cabeçalhos de requisição condicional a partir dos validadores da página anterior (`StoredPage` ou None)."""
+    headers = {}
+    if stored_page is not None:
+        if stored_page.etag:
+            headers["If-None-Match"] = stored_page.etag
+        if stored_page.last_modified:
+            headers["If-Modified-Since"] = stored_page.last_modified
+    return headers
+
+def fetch_saj_page(url, headers=None):
+    """
+    Obtém uma página do SAJ, respeitando o limite de taxa, o circuit breaker do host e a política de
+    novas tentativas (`saj_retry_policy`) para erros transitórios.
+
+    Args:
+        url (str): A URL da página.
+        headers (dict, optional): Cabeçalhos adicionais (por exemplo, os de `conditional_headers`).
+
+    Returns:
+        SajPage: O HTML da página e os validadores da resposta.
+
+    Raises:
+        SajUnavailableError: Se o SAJ não respondeu após todas as tentativas (ou ficou fora do ar).
+        requests.exceptions.RequestException: Para respostas de erro não transitórias (por exemplo, 404).
+    """
+    breaker = circuit_breaker_for(url)
+    last_error = retry_after = None
+    for attempt in range(saj_retry_policy.max_attempts):
+        if attempt:
+            time.sleep(saj_retry_policy.delay(attempt - 1, retry_after))
+            retry_after = None
+        breaker.wait()
+        with span(STAGE_SAJ_RATE_LIMIT):
+            saj_rate_limiter.acquire()
+        try:
+            with span(STAGE_SAJ_FETCH):
+                response = get_http_session().get(url, headers=headers, timeout=(SAJ_CONNECT_TIMEOUT, SAJ_READ_TIMEOUT))
+        except RETRYABLE_REQUEST_ERRORS as e:
+            last_error = e
+        except Exception:
+            breaker.release_probe()
+            raise
+        else:
+            if not saj_retry_policy.is_retryable_status(response.status_code):
+                breaker.record_success() # O portal respondeu, mesmo que com erro
+                response.raise_for_status()
+                not_modified = response.status_code == 304
+                return SajPage("" if not_modified else response.text, response.headers.get("ETag"),
+                               response.headers.get("Last-Modified"), not_modified)
+            last_error = f"HTTP {response.status_code}"
+            retry_after = response.headers.get("Retry-After")
+        breaker.record_failure()
+        logging.info(f"SAJ: tentativa {attempt + 1}/{saj_retry_policy.max_attempts} falhou para {url} ({last_error}).")
+    raise SajUnavailableError(f"{saj_retry_policy.max_attempts} tentativas sem resposta ({last_error})")
+
+def _parse_saj_page(process_number, html):
+    """`parse_saj_page`, registrando todas as movimentações quando o histórico completo está ativo."""
+    if not movement_history.enabled:
+        return parse_saj_page(html)
+    movements = []
+    parsed = parse_saj_page(html, movements)
+    movement_history.record(process_number, SOURCE_SAJ, movements)
+    return parsed
+
+def parse_saj_page_if_changed(process_number, page, fingerprints=None, stored_page=None):
+    """
+    Interpreta a página do SAJ, reaproveitando o resultado da consulta anterior quando o servidor
+    respondeu 304 ou o trecho relevante da página tem o mesmo hash.
+
+    Args:
+        process_number (str): O número do processo.
+        page (SajPage): A resposta do SAJ.
+        fingerprints (SajFingerprintStore, optional): Registro das páginas já interpretadas (None: sempre interpreta).
+        stored_page (StoredPage, optional): A página registrada para o processo antes da requisição.
+
+    Returns:
+        tuple: (data, descricao, nome_executado, motivo_fallback), como `parse_saj_page`.
+    """
+    if fingerprints is None:
+        return _parse_saj_page(process_number, page.html)
+
+    if page.not_modified and stored_page is not None:
+        fingerprints.count(PAGE_UNCHANGED)
+        logging.info(f"Processo {process_number}: página do SAJ não modificada (304). Resultado anterior reaproveitado.")
+        return stored_page.parsed
+
+    content_hash = saj_page_fingerprint(page.html)
+    if stored_page is not None and stored_page.content_hash == content_hash:
+        fingerprints.count(PAGE_UNCHANGED)
+        logging.info(f"Processo {process_number}: página do SAJ sem alteração. Resultado anterior reaproveitado.")
+        if (page.etag, page.last_modified) != (stored_page.etag, stored_page.last_modified):
+            fingerprints.put(process_number, content_hash, page.etag, page.last_modified, stored_page.parsed)
+        return stored_page.parsed
+
+    parsed = _parse_saj_page(process_number, page.html)
+    fingerprints.put(process_number, content_hash, page.etag, page.last_modified, parsed)
+    fingerprints.count(PAGE_NEW if stored_page is None else PAGE_CHANGED)
+    return parsed
+
+def _consult_projudi(process_number, projudi_username, projudi_password):
+    with span(STAGE_PROJUDI_RATE_LIMIT):
+        projudi_rate_limiter.acquire()
+    return get_projudi_process_movement(process_number, projudi_username, projudi_password)
+
+def resolve_with_projudi_fallback(process_number, saj_result, fallback_reason, projudi_username, projudi_password,
+                                  projudi_result=None):
+    """
+    Retorna o resultado do SAJ ou, se houver `fallback_reason`, consulta o processo no PROJUDI.
+
+    Args:
+        process_number (str): O número do processo.
+        saj_result (tuple): (data, descricao, nome_executado) extraídos do SAJ.
+        fallback_reason (str or None): Motivo para consultar o PROJUDI, ou None se o SAJ foi conclusivo.
+        projudi_username (str): Nome de usuário para login no PROJUDI.
+        projudi_password (str): Senha para login no PROJUDI.
+        projudi_result (tuple, optional): Resultado de uma consulta ao PROJUDI já feita para este processo
+            (roteamento direto ao PROJUDI); se informado, é reutilizado em vez de uma nova consulta.
+
+    Returns:
+        tuple: (data_da_movimentacao, descricao_da_movimentacao, nome_executado, sistema_de_origem),
+               onde o sistema de origem é `SOURCE_SAJ` ou `SOURCE_PROJUDI`.
+    """
+    if not fallback_reason:
+        return (*saj_result, SOURCE_SAJ)
+
+    if projudi_result is None:
+        logging.info(f"Processo {process_number} (TJAM) {fallback_reason}. Consultando PROJUDI...")
+        projudi_result = _consult_projudi(process_number, projudi_username, projudi_password)
+    return (*projudi_result, SOURCE_PROJUDI)
+
+def route_to_projudi_first(process_number, projudi_username, projudi_password, routing_index):
+    """
+    Consulta direto o PROJUDI quando o índice de roteamento prevê que o processo está nele.
+
+    Returns:
+        tuple: (resultado, resultado_projudi). `resultado` é a tupla final (com o sistema de origem) se o
+               PROJUDI foi conclusivo, ou None se a consulta deve seguir pelo SAJ; nesse caso,
+               `resultado_projudi` traz a consulta ao PROJUDI já feita (ou None), para não repeti-la no fallback.
+    """
+    if routing_index is None or routing_index.predict(process_number) != SOURCE_PROJUDI:
+        return None, None
+
+    logging.info(f"Processo {process_number}: previsto no PROJUDI pelo índice de roteamento. Consultando PROJUDI...")
+    projudi_result = _consult_projudi(process_number, projudi_username, projudi_password)
+    if classify_outcome(projudi_result[0], projudi_result[1]) in CONCLUSIVE_OUTCOMES:
+        return (*projudi_result, SOURCE_PROJUDI), None
+    logging.info(f"Processo {process_number}: PROJUDI não foi conclusivo ({projudi_result[1]}). Consultando SAJ...")
+    return None, projudi_result
+
+def record_route(routing_index, process_number, result):
+    """Registra no índice de roteamento o sistema de um resultado conclusivo."""
+    if routing_index is not None and classify_outcome(result[0], result[1]) in CONCLUSIVE_OUTCOMES:
+        routing_index.record(process_number, result[3])
 
 def get_tjam_process_movement(process_number, projudi_username, projudi_password):
     """
+    Consulta a última movimentação do processo (SAJ com fallback para o PROJUDI).
+    Veja `get_tjam_process_movement_with_source`, que também informa o sistema de origem.
+
+    Returns:
+        tuple: (data_da_movimentacao, descricao_da_movimentacao, nome_executado).
+    """
+    return get_tjam_process_movement_with_source(process_number, projudi_username, projudi_password)[:3]
+
+def get_tjam_process_movement_with_source(process_number, projudi_username, projudi_password, routing_index=None,
+                                          fingerprints=None):
+    """
     Consulta a movimentação de um processo no portal SAJ (Sistema de Automação da Justiça) do TJAM.
     Tenta extrair a data e a descrição da última movimentação processual.
 
@@ -21,119 +258,62 @@ def get_tjam_process_movement(process_number, projudi_username, projudi_password
     registradas no SAJ, a função automaticamente tentará consultar o mesmo número de processo
     no PROJUDI.
 
+    O ritmo das requisições ao SAJ é controlado por `saj_rate_limiter` (token bucket), em vez
+    de uma pausa fixa após cada consulta. Erros transitórios (conexão, timeout, 429/5xx) são repetidos
+    com backoff; se o SAJ continuar sem responder, o resultado é `STATUS_CONSULTA_FALHOU`, sem
+    consulta ao PROJUDI (ver `fetch_saj_page`).
+
+    Com um índice de roteamento, processos previstos no PROJUDI são consultados direto nele; se o
+    PROJUDI não for conclusivo, a consulta segue pelo SAJ normalmente.
+
+    Com um registro de páginas (`fingerprints`), a requisição ao SAJ é condicional (ETag/Last-Modified)
+    e páginas sem alteração desde a consulta anterior não são interpretadas novamente
+    (ver `parse_saj_page_if_changed`).
+
     Args:
         process_number (str): O número do processo a ser consultado.
         projudi_username (str): Nome de usuário para login no PROJUDI (caso necessário).
         projudi_password (str): Senha para login no PROJUDI (caso necessário).
+        routing_index (RoutingIndex, optional): Índice de roteamento consultado e atualizado a cada processo.
+        fingerprints (SajFingerprintStore, optional): Registro das páginas do SAJ já interpretadas.
 
     Returns:
-        tuple: Uma tupla contendo (data_da_movimentacao, descricao_da_movimentacao, nome_executado).
-               Em caso de erro ou se o processo não for encontrado em nenhum dos sistemas,
+        tuple: Uma tupla contendo (data_da_movimentacao, descricao_da_movimentacao, nome_executado,
+               sistema_de_origem). Em caso de erro ou se o processo não for encontrado em nenhum dos sistemas,
                pode retornar strings indicativas de erro ou "N/A" para os respectivos campos.
     """
-    # Monta a URL de consulta do processo no portal SAJ do TJAM.
-    url = f"https://consultasaj.tjam.jus.br/cpopg/show.do?&processo.numero={process_number}"
-    
-    date = STATUS_NAO_DISPONIVEL
-    description = STATUS_DESCRICAO_NAO_ENCONTRADA
-    executed_name = STATUS_NAO_DISPONIVEL
-    should_fallback_to_projudi = False
-    fallback_reason = ""
+    routed_result, projudi_result = route_to_projudi_first(process_number, projudi_username, projudi_password, routing_index)
+    if routed_result is not None:
+        record_route(routing_index, process_number, routed_result)
+        return routed_result
+
+    url = build_saj_url(process_number)
+    saj_result = (STATUS_NAO_DISPONIVEL, STATUS_DESCRICAO_NAO_ENCONTRADA, STATUS_NAO_DISPONIVEL)
 
     try:
-        # Realiza a requisição HTTP GET para a URL do processo.
+        # Realiza a requisição HTTP GET para a URL do processo (com novas tentativas para erros transitórios).
         logging.info(f"Consultando SAJ/TJAM para o processo: {process_number}")
-        response = requests.get(url)
-        response.raise_for_status() # Levanta uma exceção para códigos de status HTTP 4xx ou 5xx.
-        
-        # Parseia o conteúdo HTML da página de resposta.
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Tenta encontrar a tabela principal de partes
-        parts_table = soup.find('table', {'id': 'tablePartesPrincipais'})
-        
-        if parts_table:
-            rows = parts_table.find_all('tr', class_='fundoClaro') 
-            for row in rows:
-                role_span = row.find('span', class_='tipoDeParticipacao')
-                if role_span:
-                    role_text = role_span.get_text(strip=True).lower()
-                    
-                    passive_party_terms = ["executado", "embargante", "requerido", "réu"]
-                    active_party_terms = ["exequente", "embargado", "requerente"]
-                    
-                    is_passive_party = any(term in role_text for term in passive_party_terms)
-                    is_active_party = any(term in role_text for term in active_party_terms)
-                    
-                    if is_passive_party and not is_active_party:
-                        name_td = row.find('td', class_='nomeParteEAdvogado')
-                        if name_td:
-                            full_name_text = name_td.get_text(separator=' ', strip=True)
-                            cleaned_name = re.sub(r'advogad[oa]:\s*.*', '', full_name_text, flags=re.IGNORECASE).strip()
-                            executed_name = re.sub(r"^\(parte\s+\w+\):\s*", "", cleaned_name, flags=re.IGNORECASE).strip()
-                            executed_name = re.sub(r'\s+', ' ', executed_name).strip() 
-                            break 
-
-        # Tenta encontrar a tabela de movimentações pelo ID 'tabelaTodasMovimentacoes'.
-        movements_table = soup.find('table', {'id': 'tabelaTodasMovimentacoes'})
-        if not movements_table:
-            # Se não encontrar, tenta encontrar a tabela de últimas movimentações (alternativa).
-            movements_table = soup.find('tbody', {'id': 'tabelaUltimasMovimentacoes'})
-
-        if movements_table:
-            rows = movements_table.find_all('tr', class_=['fundoClaro', 'fundoEscuro'])
-            if rows:
-                last_movement_row = rows[0]
-                date_element = last_movement_row.find('td', class_='dataMovimentacao')
-                description_element = last_movement_row.find('td', class_='descricaoMovimentacao')
-                
-                date = date_element.text.strip() if date_element else STATUS_DATA_NAO_ENCONTRADA
-                raw_description = description_element.text.strip() if description_element else STATUS_DESCRICAO_NAO_ENCONTRADA
-                description = re.sub(r'\s+', ' ', raw_description).strip()
-                
-                if "processo transferido para o projudi" in description.lower():
-                    should_fallback_to_projudi = True
-                    fallback_reason = "indica transferência"
-                else:
-                    # Se encontrou movimentação e não indica transferência, retorna os dados do SAJ
-                    time.sleep(SLEEP_AFTER_PROJUDI_CONSULTA)
-                    return date, description, executed_name
-        
-        # Se chegou aqui e não retornou, significa que a extração direta do SAJ não foi suficiente
-        # e é preciso verificar as condições para fallback ao PROJUDI.
-        if not should_fallback_to_projudi: # Só verifica se ainda não foi marcado para fallback
-            page_content_text = soup.get_text().lower()
-            if "processo transferido para o projudi" in page_content_text:
-                should_fallback_to_projudi = True
-                fallback_reason = "indica transferência"
-            elif "não há movimentações" in page_content_text:
-                should_fallback_to_projudi = True
-                fallback_reason = "sem movimentações"
-            elif not movements_table or not rows:
-                should_fallback_to_projudi = True
-                fallback_reason = "não foi possível extrair movimentações"
-            else: # Caso em que movements_table e rows existem, mas o conteúdo não foi útil para um retorno SAJ
-                should_fallback_to_projudi = True
-                fallback_reason = "o conteúdo do SAJ não foi conclusivo"
+        stored_page = fingerprints.get(process_number) if fingerprints is not None else None
+        page = fetch_saj_page(url, conditional_headers(stored_page))
 
+        with span(STAGE_SAJ_PARSE):
+            date, description, executed_name, fallback_reason = parse_saj_page_if_changed(
+                process_number, page, fingerprints, stored_page
+            )
+        saj_result = (date, description, executed_name)
+
+    except SajUnavailableError as e:
+        # SAJ fora do ar: não há indicação de que o processo esteja no PROJUDI.
+        logging.warning(f"SAJ indisponível para o processo {process_number}: {e}. O processo não foi consultado.")
+        return STATUS_NAO_DISPONIVEL, STATUS_CONSULTA_FALHOU, STATUS_NAO_DISPONIVEL, SOURCE_SAJ
     except requests.exceptions.RequestException as e:
-        should_fallback_to_projudi = True
-        fallback_reason = f"erro de conexão ({e})"
-        logging.warning(f"Erro de conexão ao TJAM para o processo {process_number}: {e}. Tentando PROJUDI...", exc_info=True)
+        fallback_reason = f"erro na resposta do SAJ ({e})"
+        logging.warning(f"Erro na resposta do TJAM para o processo {process_number}: {e}. Tentando PROJUDI...")
     except Exception as e:
-        should_fallback_to_projudi = True
         fallback_reason = f"erro inesperado ({e})"
         logging.error(f"Erro ao processar o processo {process_number} no TJAM: {e}. Tentando PROJUDI...", exc_info=True)
 
-    # Lógica de fallback para PROJUDI, executada apenas se should_fallback_to_projudi for True
-    if should_fallback_to_projudi:
-        logging.info(f"Processo {process_number} (TJAM) {fallback_reason}. Consultando PROJUDI...")
-        projudi_date, projudi_description, projudi_executed_name = get_projudi_process_movement(process_number, projudi_username, projudi_password)
-        time.sleep(SLEEP_AFTER_PROJUDI_CONSULTA)
-        return projudi_date, projudi_description, projudi_executed_name
-    else:
-        # Este else só será alcançado se nenhum fallback foi acionado E não houve retorno antes.
-        # Teoricamente, o retorno deveria ter acontecido dentro do if movements_table.
-        # Isso atua como um `catch-all` para situações onde o SAJ não foi conclusivo e o fallback não foi disparado.
-        logging.warning(f"Fluxo SAJ não conclusivo para {process_number} e sem fallback explícito acionado. Retornando dados SAJ parciais ou N/A.")
-        return date, description, executed_name
+    result = resolve_with_projudi_fallback(process_number, saj_result, fallback_reason, projudi_username, projudi_password,
+                                           projudi_result)
+    record_route(routing_index, process_number, result)
+    return result
@@ -0,0 +1,173 @@
+# Este módulo implementa o modo de acompanhamento de uma carteira de processos: a planilha é verificada
+# periodicamente e apenas os processos cuja última movimentação mudou desde a verificação anterior vão
+# para um relatório de alterações. Processos verificados recentemente são pulados. Usado por cli.py --watch.
+import logging
+import os
+import time
+from collections import Counter
+from datetime import datetime
+
+from core.batch_runner import run_consultation_batch, in_input_order
+from core.projudi_orchestrator import shutdown_session_pools
+from utils.excel_handler import iter_process_numbers_from_excel, StreamingExcelWriter
+from utils.result_cache import classify_outcome, OUTCOME_ERROR
+from utils.routing_index import RoutingIndex
+from utils.saj_fingerprints import SajFingerprintStore
+from utils.watch_state import WatchState
+
+from utils.constants import (
+    EXCEL_COL_PROCESSO, EXCEL_COL_DATA_ANTERIOR, EXCEL_COL_DESCRICAO_ANTERIOR, EXCEL_COL_DATA_MOVIMENTACAO,
+    EXCEL_COL_DESCRICAO_MOVIMENTACAO, EXCEL_COL_REQUERIDO_EXECUTADO, EXCEL_COL_SISTEMA,
+    SAJ_MAX_WORKERS, SAJ_CLIENT_MODE, WATCH_INTERVAL_HOURS, WATCH_RECHECK_AFTER_HOURS, WATCH_REPORT_DIR
+)
+
+REPORT_COLUMNS = [
+    EXCEL_COL_PROCESSO, EXCEL_COL_DATA_ANTERIOR, EXCEL_COL_DESCRICAO_ANTERIOR, EXCEL_COL_DATA_MOVIMENTACAO,
+    EXCEL_COL_DESCRICAO_MOVIMENTACAO, EXCEL_COL_REQUERIDO_EXECUTADO, EXCEL_COL_SISTEMA
+]
+
+def report_path_for(excel_path, report_dir, now=None):
+    """Caminho do relatório de alterações de uma verificação: <dir>/alteracoes_<planilha>_<AAAAMMDD_HHMMSS>.xlsx."""
+    base_name = os.path.splitext(os.path.basename(excel_path))[0]
+    stamp = (now or datetime.now()).strftime("%Y%m%d_%H%M%S")
+    return os.path.join(report_dir, f"alteracoes_{base_name}_{stamp}.xlsx")
+
+def run_watch_cycle(excel_path, username, password, report_dir=WATCH_REPORT_DIR, recheck_after_hours=WATCH_RECHECK_AFTER_HOURS,
+                    max_workers=SAJ_MAX_WORKERS, mode=SAJ_CLIENT_MODE):
+    """
+    Verifica uma vez os processos da planilha e grava o relatório das movimentações alteradas.
+
+    A consulta não usa o cache de resultados (que esconderia movimentações novas), mas páginas do SAJ
+    sem alteração não são interpretadas novamente (ver `utils.saj_fingerprints`). Processos vistos pela
+    primeira vez apenas registram a situação de referência; consultas que falharam não alteram a
+    situação conhecida e são refeitas na verificação seguinte.
+
+    Args:
+        excel_path (str): Planilha com a coluna 'PROCESSO' ou 'processo'.
+        username (str): Nome de usuário do PROJUDI.
+        password (str): Senha do PROJUDI.
+        report_dir (str): Diretório do relatório de alterações.
+        recheck_after_hours (float): Processos verificados há menos horas que isso são pulados.
+        max_workers (int): Número de consultas simultâneas.
+        mode (str): "threads" ou "asyncio" (ver `core.batch_runner`).
+
+    Returns:
+        dict: Resumo da verificação: processos consultados, alterados, sem alteração, novos (sem verificação
+              anterior), pulados por terem sido verificados recentemente, inválidos, erros, relatório
+              gravado (ou None, se nada mudou), páginas do SAJ reaproveitadas e duração.
+
+    Raises:
+        ValueError: Se a planilha não tiver a coluna dos processos.
+    """
+    started_at = time.monotonic()
+    recheck_cutoff = time.time() - recheck_after_hours * 3600
+    counts = Counter()
+    summary = {"input": excel_path, "report": None}
+
+    state = WatchState()
+    numbers_from_excel = iter_process_numbers_from_excel(excel_path)
+    writer = None # Criado na primeira alteração: sem alterações, nenhum relatório é gravado
+    previous_results = {} # numero -> situação anterior (WatchedProcess ou None), até o resultado chegar
+
+    def process_numbers():
+        seen = set()
+        for _, canonical, status in numbers_from_excel:
+            if status is not None:
+                counts["invalid"] += 1
+                continue
+            if canonical in seen:
+                continue
+            seen.add(canonical)
+            previous = state.get(canonical)
+            if previous is not None and previous.checked_at >= recheck_cutoff:
+                counts["skipped_recent"] += 1
+                continue
+            previous_results[canonical] = previous
+            yield canonical
+
+    def write_change(index, process_number, result, source):
+        # Chamado na ordem da planilha (ver `in_input_order`); apenas os processos alterados são gravados.
+        nonlocal writer
+        previous = previous_results.pop(process_number)
+        date, description, executed_name = result
+        if previous is None or classify_outcome(date, description) == OUTCOME_ERROR:
+            return
+        if (str(date), str(description)) == (previous.date, previous.description):
+            return
+        if writer is None:
+            writer = StreamingExcelWriter(REPORT_COLUMNS)
+        writer.append({
+            EXCEL_COL_PROCESSO: process_number,
+            EXCEL_COL_DATA_ANTERIOR: previous.date,
+            EXCEL_COL_DESCRICAO_ANTERIOR: previous.description,
+            EXCEL_COL_DATA_MOVIMENTACAO: str(date),
+            EXCEL_COL_DESCRICAO_MOVIMENTACAO: str(description),
+            EXCEL_COL_REQUERIDO_EXECUTADO: str(executed_name),
+            EXCEL_COL_SISTEMA: source,
+        })
+
+    write_in_order = in_input_order(write_change)
+
+    def on_result(index, process_number, result, source):
+        date, description, executed_name = result
+        counts["checked"] += 1
+        previous = previous_results[process_number]
+        if classify_outcome(date, description) == OUTCOME_ERROR:
+            counts["errors"] += 1
+        else:
+            if previous is None:
+                counts["new"] += 1
+            elif (str(date), str(description)) == (previous.date, previous.description):
+                counts["unchanged"] += 1
+            else:
+                counts["changed"] += 1
+                logging.info(f"Processo {process_number}: nova movimentação em {date}: {description}")
+            state.record(process_number, date, description, executed_name, source)
+        write_in_order(index, process_number, result, source)
+
+    routing_index = RoutingIndex()
+    fingerprints = SajFingerprintStore()
+    try:
+        run_consultation_batch(process_numbers(), username, password, max_workers=max_workers, on_result=on_result,
+                               mode=mode, collect_results=False, routing_index=routing_index, fingerprints=fingerprints)
+    finally:
+        summary["saj_pages"] = fingerprints.stats()
+        state.close()
+        routing_index.close()
+        fingerprints.close()
+        shutdown_session_pools()
+
+    if writer is not None:
+        report_path = report_path_for(excel_path, report_dir)
+        os.makedirs(report_dir, exist_ok=True)
+        summary["report"] = writer.finalize(report_path)
+
+    for key in ("checked", "changed", "unchanged", "new", "skipped_recent", "invalid", "errors"):
+        summary[key] = counts[key]
+    summary["elapsed_seconds"] = round(time.monotonic() - started_at, 3)
+    logging.info(f"Verificação concluída: {counts['changed']} processos com movimentação nova, {counts['unchanged']} sem "
+                 f"alteração, {counts['new']} novos e {counts['skipped_recent']} verificados recentemente (pulados).")
+    return summary
+
+def watch_portfolio(excel_path, username, password, on_cycle, interval_hours=WATCH_INTERVAL_HOURS, max_cycles=None,
+                    **cycle_options):
+    """
+    Verifica a planilha a cada `interval_hours` horas (ver `run_watch_cycle`) até ser interrompido.
+
+    Args:
+        on_cycle (callable): Chamado com o resumo de cada verificação.
+        interval_hours (float): Intervalo entre o início de duas verificações; 0 faz uma única verificação.
+        max_cycles (int, optional): Número máximo de verificações (None: sem limite).
+        **cycle_options: Repassados a `run_watch_cycle` (report_dir, recheck_after_hours, max_workers, mode).
+    """
+    cycles = 0
+    while True:
+        cycle_started = time.monotonic()
+        on_cycle(run_watch_cycle(excel_path, username, password, **cycle_options))
+        cycles += 1
+        if interval_hours <= 0 or (max_cycles is not None and cycles >= max_cycles):
+            return
+        remaining = interval_hours * 3600 - (time.monotonic() - cycle_started)
+        if remaining > 0:
+            logging.info(f"Próxima verificação em {remaining / 3600:.1f} h.")
+            time.sleep(remaining)
@@ -1,3 +1,4 @@
+import multiprocessing
 import threading
 from tkinter import filedialog
 import logging
@@ -6,19 +7,13 @@ import logging
 from utils.config_manager import load_credentials, save_credentials
 from utils.config_manager import projudi_username as cfg_projudi_username # Para obter as credenciais carregadas
 from utils.config_manager import projudi_password as cfg_projudi_password
-from utils.excel_handler import read_process_numbers_from_excel, save_results_to_excel
-from core.tjam_scraper import get_tjam_process_movement # Esta função orquestra as chamadas para PROJUDI se necessário
+from utils.constants import OUTPUT_FORMAT_DEFAULT
+# pandas, selenium, requests e bs4 (via core.consultation e utils.excel_handler) só são importados
+# ao iniciar a primeira consulta, para que a janela abra rapidamente (ver benchmarks/bench_startup.py).
 
 # Importa a função para lançar a UI
 from ui.interface import launch_ui
 
-# Importar constantes
-from utils.constants import (
-    EXCEL_COL_PROCESSO, EXCEL_COL_DATA_MOVIMENTACAO, EXCEL_COL_DESCRICAO_MOVIMENTACAO,
-    EXCEL_COL_REQUERIDO_EXECUTADO, STATUS_NUMERO_INVALIDO, STATUS_NAO_DISPONIVEL,
-    PROJUDI_ERRO_CREDENCIAIS_NAO_FORNECIDAS, PROJUDI_ERRO_CREDENCIAIS_INVALIDAS
-)
-
 # Variável global para armazenar o caminho do arquivo Excel selecionado.
 # Esta variável é atualizada pela UI através de um callback (`path_callback_func`)
 # quando um novo arquivo é selecionado pelo usuário.
@@ -49,116 +44,47 @@ def main_load_excel_action(file_label_widget, start_button_widget, reset_button_
     # A lógica de atualizar os widgets file_label, start_button, reset_button e status_text
     # agora é feita pela UI através do path_callback_func.
 
-def main_start_consultation_action(excel_path, progress_bar_widget, button_widgets_map, credentials_tuple):
+def main_start_consultation_action(excel_path, progress_channel, credentials_tuple, resume=False,
+                                   output_format=OUTPUT_FORMAT_DEFAULT):
     """
     Ação para iniciar a consulta dos processos.
-    Lê os números dos processos do arquivo Excel, realiza o scraping para cada um,
-    e atualiza a UI com o progresso e os resultados.
+    Lê os números dos processos do arquivo Excel, realiza o scraping de forma concorrente
+    (ver `core.consultation`) e informa o progresso à UI pelo canal de progresso.
+
+    Executada fora da thread da interface: nenhum widget é acessado aqui. A UI lê os eventos de
+    `progress_channel` e reabilita os botões ao receber o evento de término.
 
     Args:
         excel_path (str): O caminho para o arquivo Excel contendo os números dos processos.
-        progress_bar_widget: Widget de barra de progresso da UI.
-        button_widgets_map (dict): Um dicionário contendo os botões da UI para gerenciamento de estado.
+        progress_channel (ProgressChannel): Canal de progresso lido pela UI (ver `utils.progress`).
         credentials_tuple (tuple): Uma tupla contendo (username, password) para o PROJUDI.
+        resume (bool): Se True, retoma a consulta interrompida deste mesmo arquivo, pulando os processos
+                       já gravados no diário de checkpoint. Se False, o diário anterior é descartado.
+        output_format (str): Formato do arquivo de resultados ("xlsx", "csv", "parquet" ou "arrow").
     """
-    if not excel_path: # Verificação de segurança, embora a UI deva impedir isso.
-        logging.warning("Caminho do arquivo Excel não fornecido.")
-        # Reabilitar botões na UI se necessário (a UI deve lidar com isso idealmente)
-        button_widgets_map['start'].config(state="normal")
-        button_widgets_map['load'].config(state="normal")
-        button_widgets_map['reset'].config(state="normal")
-        return
-
-    logging.info("Iniciando consulta...")
-    progress_bar_widget["value"] = 0
-
+    summary = None
     try:
-        # Lê os números dos processos do arquivo Excel fornecido.
-        valid_numbers, invalid_numbers = read_process_numbers_from_excel(excel_path)
-        if valid_numbers is None:
-            # Se a leitura falhar, read_process_numbers_from_excel já exibiu um um log de erro.
-            # Apenas reabilita os botões na UI e retorna.
-            button_widgets_map['load'].config(state="normal")
-            button_widgets_map['reset'].config(state="normal")
+        if not excel_path: # Verificação de segurança, embora a UI deva impedir isso.
+            logging.warning("Caminho do arquivo Excel não fornecido.")
             return
 
-        results = []
-        
-        # Adiciona os números inválidos direto aos resultados sem consultar
-        for invalid_num in invalid_numbers:
-            results.append({
-                EXCEL_COL_PROCESSO: invalid_num,
-                EXCEL_COL_DATA_MOVIMENTACAO: STATUS_NAO_DISPONIVEL,
-                EXCEL_COL_DESCRICAO_MOVIMENTACAO: STATUS_NUMERO_INVALIDO,
-                EXCEL_COL_REQUERIDO_EXECUTADO: STATUS_NAO_DISPONIVEL
-            })
-            logging.info(f"Processo {invalid_num}: {STATUS_NUMERO_INVALIDO}")
-            logging.info("----------------------------------------------------------------------")
-
-        # Processa apenas os números válidos
-        process_numbers = valid_numbers
-        total_processes = len(process_numbers) + len(invalid_numbers)
+        logging.info("Iniciando consulta...")
+        from core.consultation import run_excel_consultation # Leitura, consulta em lote e gravação dos resultados
+        from utils.excel_handler import save_streamed_results_to_excel
         username, password = credentials_tuple # Desempacota as credenciais do PROJUDI.
-
-        # Itera sobre cada número de processo para realizar a consulta.
-        for i, process_number in enumerate(process_numbers):
-            logging.info(f"Consultando processo {i+1}/{total_processes}: {process_number}")
-
-            # Realiza a consulta da movimentação do processo.
-            # Esta função tentará o TJAM primeiro e, se necessário, o PROJUDI.
-            date, description, executed_name = get_tjam_process_movement(process_number, username, password)
-
-            # Prepara os dados para o DataFrame do Excel.
-            date_display = str(date)
-            description_display = str(description)
-            executed_name_display = str(executed_name)
-
-            # Usar as constantes PROJUDI_ERRO_CREDENCIAIS_...
-            credential_error_messages = [
-                PROJUDI_ERRO_CREDENCIAIS_NAO_FORNECIDAS,
-                PROJUDI_ERRO_CREDENCIAIS_INVALIDAS
-            ]
-
-            if description_display in credential_error_messages:
-                logging.info(f"  Resultado para {process_number}: Data: {date_display}, {description_display}")
-            else:
-                logging.info(f"  Resultado para {process_number}: Data: {date_display}, Movimentação: {description_display}, Requerido/Executado: {executed_name_display}")
-            logging.info("----------------------------------------------------------------------")
-
-            results.append({
-                EXCEL_COL_PROCESSO: process_number,
-                EXCEL_COL_DATA_MOVIMENTACAO: date_display,
-                EXCEL_COL_DESCRICAO_MOVIMENTACAO: description_display,
-                EXCEL_COL_REQUERIDO_EXECUTADO: executed_name_display
-            })
-            
-            # Ajusta o cálculo da barra de progresso para considerar processos inválidos já processados
-            progresso_atual = len(invalid_numbers) + (i + 1)
-            progress_bar_widget["value"] = progresso_atual / total_processes * 100
-
-        # Após o loop, se houver resultados, salva-os em um arquivo Excel.
-        if results:
-            # O save_results_to_excel agora usará o sistema de logging
-            saved_file_path = save_results_to_excel(results)
-            if saved_file_path:
-                logging.info(f"Resultados salvos em: {saved_file_path}")
-            else:
-                logging.warning("Salvamento do arquivo de resultados cancelado ou falhou.")
-        else:
-            logging.info("Nenhum resultado foi encontrado para salvar.")
-            # A messagebox de "Concluído" agora será um log, para manter o desacoplamento.
-            logging.info("Consulta finalizada, mas nenhum resultado foi gerado para salvar.")
-
-
+        # Lê a planilha, consulta os processos em paralelo (SAJ concorrente, com fallback para o PROJUDI)
+        # e, ao final, pergunta ao usuário onde salvar a planilha de resultados.
+        summary = run_excel_consultation(excel_path, username, password, save_streamed_results_to_excel,
+                                         resume=resume, progress=progress_channel, output_format=output_format)
+    except (ValueError, ImportError) as e:
+        # Planilha sem a coluna dos processos, ou formato de resultados que requer o pyarrow ausente.
+        logging.error(str(e))
     except Exception as e:
         # Captura qualquer exceção não tratada durante o processo de consulta.
         logging.error(f"Ocorreu um erro inesperado durante a consulta: {e}", exc_info=True)
     finally:
-        # Reabilita os botões na UI
-        button_widgets_map['start'].config(state="normal")
-        button_widgets_map['load'].config(state="normal")
-        button_widgets_map['reset'].config(state="normal")
         logging.info("Consulta finalizada.")
+        progress_channel.finish(summary=summary)
 
 def main_save_credentials_action(username, password):
     """Ação para salvar credenciais."""
@@ -187,11 +113,11 @@ def main_get_loaded_credentials_func():
 if __name__ == "__main__":
     # Ponto de entrada principal da aplicação.
 
-    # Carrega as credenciais do PROJUDI do arquivo de configuração (config.ini) uma vez no início.
-    # Isso garante que as variáveis cfg_projudi_username e cfg_projudi_password no módulo config_manager
-    # sejam populadas, para que main_get_loaded_credentials_func possa retorná-las corretamente
-    # e main_load_initial_credentials_action possa preencher a UI.
-    load_credentials()
+    # Necessário para os workers do PROJUDI (multiprocessing) quando empacotado como executável.
+    multiprocessing.freeze_support()
+
+    # As credenciais do PROJUDI são carregadas pela própria UI (main_load_initial_credentials_action),
+    # logo após a janela ser exibida; isso também popula as variáveis do módulo config_manager.
 
     # Inicializa e executa a interface gráfica do usuário.
     # As funções de ação definidas neste arquivo são passadas para a UI,
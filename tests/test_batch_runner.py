@@ -0,0 +1,46 @@
+import logging
+
+import pandas as pd
+
+from core.batch_runner import run_consultation_batch
+from core.consultation import run_excel_consultation
+from utils.constants import STATUS_NUMERO_INVALIDO, STATUS_DIGITO_VERIFICADOR_INVALIDO
+
+def _local_resolver(calls):
+    def resolve_locally(process_number):
+        calls.append(process_number)
+        return ("01/01/2024", f"movimentação de {process_number}", "FULANO", "teste")
+    return resolve_locally
+
+def test_duplicates_receive_the_first_result():
+    calls = []
+    numbers = ["A", "B", "A", "C", "B", "A"]
+    results = run_consultation_batch(numbers, "usuario", "senha", resolve_locally=_local_resolver(calls))
+    assert [result[1] for result in results] == [f"movimentação de {number}" for number in numbers]
+    assert calls == ["A", "B", "C"]
+
+def test_duplicate_window_bounds_memory_and_far_duplicates_are_resolved_again():
+    calls = []
+    numbers = ["A", "B", "C", "D", "A", "D"]
+    results = run_consultation_batch(numbers, "usuario", "senha", resolve_locally=_local_resolver(calls),
+                                     duplicate_window=2)
+    assert [result[1] for result in results] == [f"movimentação de {number}" for number in numbers]
+    # "A" saiu da janela (apenas C e D ficaram guardados) e é resolvido de novo; "D" ainda estava guardado.
+    assert calls == ["A", "B", "C", "D", "A"]
+
+def test_invalid_number_warnings_distinguish_check_digit_errors(tmp_path, monkeypatch, caplog):
+    monkeypatch.chdir(tmp_path) # Cache, checkpoints e métricas são criados no diretório de execução
+    excel_path = tmp_path / "entrada.xlsx"
+    # Um número em formato inválido e um número CNJ com o dígito verificador alterado.
+    pd.DataFrame({"PROCESSO": ["123", "0000001-00.2024.8.04.0001"]}).to_excel(excel_path, index=False)
+    output_path = tmp_path / "saida.xlsx"
+
+    with caplog.at_level(logging.WARNING):
+        summary = run_excel_consultation(str(excel_path), "", "", lambda writer: writer.finalize(str(output_path)),
+                                         metrics_json_path=None, metrics_prometheus_path=None)
+
+    assert summary["invalid"] == 2
+    assert summary["invalid_check_digit"] == 1
+    warnings = [record.getMessage() for record in caplog.records if record.levelno == logging.WARNING]
+    assert any(STATUS_DIGITO_VERIFICADOR_INVALIDO in message for message in warnings)
+    assert any(f"'{STATUS_NUMERO_INVALIDO}'" in message for message in warnings)
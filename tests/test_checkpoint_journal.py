@@ -0,0 +1,18 @@
+from utils.checkpoint_journal import CheckpointJournal
+
+def test_append_after_interrupted_write_starts_on_a_new_line(tmp_path):
+    journal = CheckpointJournal(str(tmp_path / "processos.xlsx"), journal_dir=str(tmp_path))
+    journal.append("0000001-00.2024.8.04.0001", ("10/05/2024", "JUNTADA", "FULANO"), "SAJ")
+    journal.close()
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"process_number": "0000002-00.2024') # Gravação interrompida no meio da linha
+
+    resumed = CheckpointJournal(str(tmp_path / "processos.xlsx"), journal_dir=str(tmp_path))
+    assert list(resumed.load()) == ["0000001-00.2024.8.04.0001"]
+    resumed.append("0000003-00.2024.8.04.0001", ("11/05/2024", "DESPACHO", "BELTRANO"), "PROJUDI")
+    resumed.close()
+
+    assert resumed.load() == {
+        "0000001-00.2024.8.04.0001": ("10/05/2024", "JUNTADA", "FULANO", "SAJ"),
+        "0000003-00.2024.8.04.0001": ("11/05/2024", "DESPACHO", "BELTRANO", "PROJUDI"),
+    }
@@ -0,0 +1,28 @@
+import pytest
+
+import cli
+
+def test_format_is_inferred_from_output_extension():
+    assert cli.resolve_output_format("saida.parquet", None) == "parquet"
+    assert cli.resolve_output_format("saida.CSV", None) == "csv"
+
+def test_default_format_without_output_or_format():
+    assert cli.resolve_output_format(None, None) == "xlsx"
+    assert cli.resolve_output_format(None, "arrow") == "arrow"
+
+def test_matching_format_and_extension_are_accepted():
+    assert cli.resolve_output_format("saida.csv", "csv") == "csv"
+
+def test_mismatched_format_and_extension_are_rejected():
+    with pytest.raises(ValueError):
+        cli.resolve_output_format("saida.xlsx", "csv")
+
+def test_unknown_extension_uses_requested_format_with_warning(caplog):
+    assert cli.resolve_output_format("saida.dat", "csv") == "csv"
+    assert "não reconhecida" in caplog.text
+
+def test_cli_exits_with_input_error_on_mismatch(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main([str(tmp_path / "entrada.xlsx"), "-o", str(tmp_path / "saida.xlsx"), "--format", "csv"])
+    assert exit_info.value.code == cli.EXIT_INPUT_ERROR
+    assert "--format csv" in capsys.readouterr().err
@@ -0,0 +1,86 @@
+import pytest
+
+from core.projudi_http_client import ProjudiHybridScraper
+from core.projudi_pages import ProjudiScraper
+from core.projudi_parser import ProjudiParseError, parse_last_movement, parse_movements
+from utils.constants import STATUS_NAO_DISPONIVEL, STATUS_MOVIMENTACAO_NAO_ENCONTRADA, PROJUDI_HYBRID_MAX_PARSE_FAILURES
+
+_HEADER = "<thead><tr><th>Seq.</th><th>Usuário</th><th>Data</th><th>Evento</th></tr></thead>"
+_ROW = "<tr><td>{seq}</td><td>SERVIDOR</td><td>{date} 10:32:00</td><td><b>{description}</b><br>Complemento</td></tr>"
+
+def _detail_page(rows, header=_HEADER):
+    return f'<html><body><table class="resultTable">{header}<tbody>{"".join(rows)}</tbody></table></body></html>'
+
+def test_last_movement_is_first_row():
+    html = _detail_page([_ROW.format(seq=2, date="10/05/2024", description="JUNTADA"),
+                         _ROW.format(seq=1, date="02/01/2024", description="DISTRIBUIÇÃO")])
+    assert parse_last_movement(html) == ("10/05/2024", "JUNTADA")
+    assert parse_movements(html) == [("10/05/2024", "JUNTADA"), ("02/01/2024", "DISTRIBUIÇÃO")]
+
+def test_empty_movement_table_is_not_a_parse_error():
+    html = _detail_page([])
+    assert parse_last_movement(html) == (STATUS_NAO_DISPONIVEL, STATUS_MOVIMENTACAO_NAO_ENCONTRADA)
+    assert parse_movements(html) == []
+
+def test_missing_table_is_a_parse_error():
+    with pytest.raises(ProjudiParseError):
+        parse_last_movement("<html><body><p>Layout diferente</p></body></html>")
+
+def test_empty_table_without_header_is_a_parse_error():
+    with pytest.raises(ProjudiParseError):
+        parse_movements(_detail_page([], header=""))
+
+class _FakeDriver:
+    pass
+
+class _FakeHttpSession:
+    def close(self):
+        pass
+
+def test_hybrid_mode_falls_back_per_lookup_and_disables_after_repeated_failures(monkeypatch):
+    browser_lookups = []
+    monkeypatch.setattr(ProjudiScraper, "_lookup_in_session",
+                        lambda self, number, username, password: browser_lookups.append(number) or ("navegador",))
+
+    def unrecognized_page(number):
+        raise ProjudiParseError("layout inesperado")
+
+    scraper = ProjudiHybridScraper(_FakeDriver())
+    scraper.http_session = _FakeHttpSession() # Sessão HTTP já estabelecida
+    scraper._lookup_http = unrecognized_page
+
+    for attempt in range(1, PROJUDI_HYBRID_MAX_PARSE_FAILURES):
+        assert scraper._lookup_in_session(f"processo-{attempt}", "usuario", "senha") == ("navegador",)
+        assert scraper.http_enabled
+
+    scraper._lookup_in_session("processo-final", "usuario", "senha")
+    assert not scraper.http_enabled
+    assert len(browser_lookups) == PROJUDI_HYBRID_MAX_PARSE_FAILURES
+
+def test_successful_http_lookup_resets_failure_count(monkeypatch):
+    monkeypatch.setattr(ProjudiScraper, "_lookup_in_session", lambda self, number, username, password: ("navegador",))
+    scraper = ProjudiHybridScraper(_FakeDriver())
+    scraper.http_session = _FakeHttpSession()
+    scraper.parse_failures = PROJUDI_HYBRID_MAX_PARSE_FAILURES - 1
+    scraper._lookup_http = lambda number: ("10/05/2024", "JUNTADA", "FULANO")
+
+    assert scraper._lookup_in_session("processo", "usuario", "senha") == ("10/05/2024", "JUNTADA", "FULANO")
+    assert scraper.parse_failures == 0
+    assert scraper.http_enabled
+
+class _FakeResponse:
+    def __init__(self, text, url):
+        self.text = text
+        self.url = url
+
+def test_unrecognized_results_page_falls_back_to_browser(monkeypatch):
+    monkeypatch.setattr(ProjudiScraper, "_lookup_in_session", lambda self, number, username, password: ("navegador",))
+    scraper = ProjudiHybridScraper(_FakeDriver())
+    scraper.http_session = _FakeHttpSession()
+    scraper._search_form = ("http://projudi/buscar", "post", [], "numeroProcesso")
+    # Página sem a linha do processo e sem o aviso "Nenhum registro encontrado"
+    scraper._fetch = lambda method, url, fields=None: _FakeResponse("<html><body><p>Aguarde...</p></body></html>", url)
+
+    assert scraper._lookup_in_session("0000001-00.2024.8.04.0001", "usuario", "senha") == ("navegador",)
+    assert scraper.parse_failures == 1
+    assert scraper.http_enabled
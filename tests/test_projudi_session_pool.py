@@ -0,0 +1,72 @@
+import threading
+import time
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from core.projudi_session_pool import ProjudiSessionPool
+
+class FakeDriver:
+    def quit(self):
+        pass
+
+def _run_threads(target, count, timeout=10):
+    threads = [threading.Thread(target=target, daemon=True) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout)
+    return [thread for thread in threads if thread.is_alive()]
+
+def test_broken_sessions_free_slots_for_waiting_threads():
+    pool = ProjudiSessionPool("usuario", "senha", size=2, driver_factory=FakeDriver)
+    all_waiting = threading.Barrier(4)
+    completed = []
+
+    def use_broken_session():
+        all_waiting.wait() # As 4 threads disputam as 2 vagas ao mesmo tempo
+        try:
+            with pool.session():
+                time.sleep(0.2) # Mantém a sessão até as demais threads aguardarem uma vaga
+                raise WebDriverException("driver caiu")
+        except WebDriverException:
+            completed.append(True)
+
+    alive = _run_threads(use_broken_session, 4)
+    assert not alive
+    assert len(completed) == 4
+    assert pool._created == 0
+
+def test_failed_driver_creation_frees_slot():
+    attempts = []
+
+    def failing_factory():
+        attempts.append(True)
+        raise WebDriverException("Chrome não iniciou")
+
+    pool = ProjudiSessionPool("usuario", "senha", size=1, driver_factory=failing_factory)
+    for _ in range(3):
+        with pytest.raises(WebDriverException):
+            with pool.session():
+                pass
+    assert len(attempts) == 3
+    assert pool._created == 0
+
+def test_healthy_sessions_are_reused():
+    created = []
+
+    def factory():
+        created.append(FakeDriver())
+        return created[-1]
+
+    pool = ProjudiSessionPool("usuario", "senha", size=2, driver_factory=factory)
+
+    def use_session():
+        for _ in range(5):
+            with pool.session():
+                pass
+
+    assert not _run_threads(use_session, 4)
+    assert len(created) <= 2
+    pool.close()
+    assert pool._created == 0
@@ -0,0 +1,54 @@
+import time
+
+from core.projudi_worker_pool import ProjudiWorkerPool
+from utils.constants import STATUS_NAO_DISPONIVEL, PROJUDI_ERRO_WEBDRIVER
+
+WEBDRIVER_ERROR = (STATUS_NAO_DISPONIVEL, PROJUDI_ERRO_WEBDRIVER, STATUS_NAO_DISPONIVEL)
+
+def hanging_driver_factory():
+    # Simula um Chrome que não responde: o worker fica preso no meio da consulta.
+    time.sleep(600)
+
+def _wait_until(condition, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+def _kill_workers(pool):
+    for process in list(pool._workers.values()):
+        process.kill()
+        process.join()
+
+def test_worker_killed_mid_task_fails_the_lookup_and_is_replaced():
+    pool = ProjudiWorkerPool("usuario", "senha", processes=1, driver_factory=hanging_driver_factory)
+    try:
+        future = pool.submit("0000001-00.2024.8.04.0001")
+        assert _wait_until(lambda: 0 in pool._in_progress)
+        crashed = pool._workers[0]
+        crashed.kill()
+
+        assert future.result(timeout=30) == WEBDRIVER_ERROR
+        assert _wait_until(lambda: pool._workers[0] is not crashed and pool._workers[0].is_alive())
+    finally:
+        _kill_workers(pool)
+        pool.close()
+
+def test_lookup_gives_up_after_timeout():
+    pool = ProjudiWorkerPool("usuario", "senha", processes=1, driver_factory=hanging_driver_factory, lookup_timeout=1)
+    try:
+        hung = pool._workers[0]
+        started = time.monotonic()
+        assert pool.lookup("0000001-00.2024.8.04.0001") == WEBDRIVER_ERROR
+        assert time.monotonic() - started < 10
+        assert not pool._futures
+
+        # O worker preso na consulta abandonada é encerrado e substituído.
+        assert _wait_until(lambda: pool._workers[0] is not hung and pool._workers[0].is_alive())
+        assert not hung.is_alive()
+        assert not pool._abandoned
+    finally:
+        _kill_workers(pool)
+        pool.close()
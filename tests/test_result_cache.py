@@ -0,0 +1,29 @@
+from utils.constants import (
+    PROJUDI_PROCESS_NAO_ENCONTRADO, PROJUDI_PROCESS_NAO_LISTADO_POS_BUSCA, STATUS_NAO_DISPONIVEL
+)
+from utils.result_cache import ResultCache, classify_outcome, OUTCOME_ERROR, OUTCOME_NOT_FOUND
+
+def test_process_not_listed_after_search_is_an_error_and_never_cached(tmp_path):
+    assert classify_outcome(STATUS_NAO_DISPONIVEL, PROJUDI_PROCESS_NAO_ENCONTRADO) == OUTCOME_NOT_FOUND
+    assert classify_outcome(STATUS_NAO_DISPONIVEL, PROJUDI_PROCESS_NAO_LISTADO_POS_BUSCA) == OUTCOME_ERROR
+
+    cache = ResultCache(str(tmp_path / "cache.db"))
+    try:
+        assert not cache.put("0000001-00.2024.8.04.0001", STATUS_NAO_DISPONIVEL, PROJUDI_PROCESS_NAO_LISTADO_POS_BUSCA,
+                             STATUS_NAO_DISPONIVEL, "PROJUDI")
+        assert cache.get("0000001-00.2024.8.04.0001") is None
+    finally:
+        cache.close()
+
+def test_entries_stored_with_a_stale_classification_are_ignored(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.db"))
+    try:
+        # Simula uma entrada gravada quando "não listado após busca" ainda era tratado como "não encontrado".
+        cache._conn.execute(
+            "INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, strftime('%s', 'now'))",
+            ("00000010020248040001", STATUS_NAO_DISPONIVEL, PROJUDI_PROCESS_NAO_LISTADO_POS_BUSCA,
+             STATUS_NAO_DISPONIVEL, "PROJUDI", OUTCOME_NOT_FOUND)
+        )
+        assert cache.get("0000001-00.2024.8.04.0001") is None
+    finally:
+        cache.close()
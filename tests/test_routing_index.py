@@ -0,0 +1,26 @@
+from utils.constants import SOURCE_SAJ, SOURCE_PROJUDI
+from utils.routing_index import RoutingIndex, segment_key
+
+PROCESS = "0000001-00.2024.8.04.0001"
+
+def _segment_counts(index, process_number):
+    return index._conn.execute(
+        "SELECT saj_count, projudi_count FROM segment_routes WHERE segment_key = ?", (segment_key(process_number),)
+    ).fetchone()
+
+def test_rechecks_count_once_and_system_changes_move_the_count(tmp_path):
+    index = RoutingIndex(str(tmp_path / "routing.db"))
+    try:
+        index.record(PROCESS, SOURCE_SAJ)
+        index.record(PROCESS, SOURCE_SAJ)
+        index.record(PROCESS, SOURCE_SAJ)
+        assert _segment_counts(index, PROCESS) == (1, 0)
+
+        index.record(PROCESS, SOURCE_PROJUDI)
+        assert _segment_counts(index, PROCESS) == (0, 1)
+        assert index.predict(PROCESS) == SOURCE_PROJUDI
+
+        index.record("0000002-00.2024.8.04.0001", SOURCE_PROJUDI)
+        assert _segment_counts(index, PROCESS) == (0, 2)
+    finally:
+        index.close()
@@ -2,38 +2,86 @@ import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import threading
 import logging # Adicionar import de logging
+import logging.handlers
+import os
+import queue
+from collections import deque
 
 # Importar constantes
 from utils.constants import (
     EXCEL_COL_PROCESSO, EXCEL_COL_DATA_MOVIMENTACAO, EXCEL_COL_DESCRICAO_MOVIMENTACAO,
-    EXCEL_COL_REQUERIDO_EXECUTADO
+    EXCEL_COL_REQUERIDO_EXECUTADO, UI_LOG_FLUSH_INTERVAL_MS, UI_LOG_MAX_LINES,
+    LOG_FILE_PATH, LOG_FILE_MAX_BYTES, LOG_FILE_BACKUP_COUNT, PROGRESS_POLL_INTERVAL_MS,
+    OUTPUT_FORMATS, OUTPUT_FORMAT_DEFAULT
 )
+from utils.progress import ProgressChannel, format_progress
 
 # As funções de placeholder que existiam aqui foram removidas,
 # pois a UI agora é funcional e recebe as implementações reais de callbacks do main.py.
 
 # Nova classe para redirecionar logs do Python para um widget Text do Tkinter
 class TkinterTextHandler(logging.Handler):
-    def __init__(self, text_widget):
+    """
+    Exibe os registros de log em um widget Text.
+
+    Os registros (que podem vir de qualquer thread) são enfileirados em `emit` e inseridos no widget
+    em lote, pela thread da interface, a cada `flush_interval_ms`. O widget mantém apenas as últimas
+    `max_lines` linhas; o log completo fica no arquivo (ver `AppUI._setup_logging`).
+    """
+    def __init__(self, text_widget, flush_interval_ms=UI_LOG_FLUSH_INTERVAL_MS, max_lines=UI_LOG_MAX_LINES):
         super().__init__()
         self.text_widget = text_widget
+        self.flush_interval_ms = flush_interval_ms
+        self.max_lines = max_lines
+        self._pending = queue.SimpleQueue()
         # Configurar tags para cores dos níveis de log
         self.text_widget.tag_config("INFO", foreground="black")
         self.text_widget.tag_config("WARNING", foreground="orange")
         self.text_widget.tag_config("ERROR", foreground="red")
         self.text_widget.tag_config("CRITICAL", foreground="red", background="yellow")
+        self._flush_job = self.text_widget.after(self.flush_interval_ms, self._flush)
 
     def emit(self, record):
-        msg = self.format(record)
-        # Usar root.after para garantir que a atualização ocorra na thread principal da UI
-        def _insert_msg():
-            self.text_widget.config(state=tk.NORMAL) # Habilita para edição
-            self.text_widget.insert(tk.END, msg + "\n", record.levelname)
-            self.text_widget.see(tk.END)
-            self.text_widget.config(state=tk.DISABLED) # Desabilita novamente
-        # Use self.text_widget.winfo_exists() para evitar erros se o widget for destruído
-        if self.text_widget.winfo_exists():
-            self.text_widget.after_idle(_insert_msg) # Usa after_idle para chamadas na thread principal
+        try:
+            self._pending.put((self.format(record) + "\n", record.levelname))
+        except Exception:
+            self.handleError(record)
+
+    def _drain(self):
+        # Registros além de `max_lines` seriam descartados logo após a inserção: nem chegam ao widget.
+        batch = deque(maxlen=self.max_lines)
+        while True:
+            try:
+                batch.append(self._pending.get_nowait())
+            except queue.Empty:
+                return batch
+
+    def _flush(self):
+        """Insere no widget os registros pendentes (na thread da interface) e agenda a próxima atualização."""
+        try:
+            batch = self._drain()
+            if batch:
+                self.text_widget.config(state=tk.NORMAL) # Habilita para edição
+                # Uma única inserção para o lote: pares (texto, tag) em sequência.
+                self.text_widget.insert(tk.END, *[item for message in batch for item in message])
+                # Cada registro termina em "\n": o índice "end-1c" fica no início da linha após a última.
+                excess_lines = int(self.text_widget.index("end-1c").split(".")[0]) - 1 - self.max_lines
+                if excess_lines > 0:
+                    self.text_widget.delete("1.0", f"{excess_lines + 1}.0")
+                self.text_widget.see(tk.END)
+                self.text_widget.config(state=tk.DISABLED) # Desabilita novamente
+            self._flush_job = self.text_widget.after(self.flush_interval_ms, self._flush)
+        except tk.TclError:
+            self._flush_job = None # Widget destruído (janela fechada)
+
+    def close(self):
+        if self._flush_job is not None:
+            try:
+                self.text_widget.after_cancel(self._flush_job)
+            except tk.TclError:
+                pass
+            self._flush_job = None
+        super().close()
 
 class AppUI:
     """
@@ -78,7 +126,9 @@ class AppUI:
 
         self._setup_ui() # Chama o método para configurar os widgets da interface.
         self._setup_logging() # Novo método para configurar o logging
-        self._load_and_fill_credentials() # Carrega e preenche as credenciais salvas nos campos da UI.
+        # Carrega e preenche as credenciais salvas nos campos da UI depois que a janela é exibida
+        # (o acesso ao keyring pode ser lento).
+        self.root.after_idle(self._load_and_fill_credentials)
 
     def _setup_ui(self):
         """
@@ -144,9 +194,25 @@ class AppUI:
         self.reset_button = ttk.Button(action_frame, text="Nova Consulta", command=self._trigger_reset_gui, state="disabled")
         self.reset_button.pack(side="left", padx=5, pady=5)
 
+        # Checkbox para retomar uma consulta interrompida do mesmo arquivo (usa o diário de checkpoint).
+        self.resume_var = tk.BooleanVar()
+        self.resume_check = ttk.Checkbutton(action_frame, text="Retomar consulta interrompida", variable=self.resume_var)
+        self.resume_check.pack(side="left", padx=5, pady=5)
+
+        # Formato do arquivo de resultados (Excel, CSV, Parquet ou Arrow IPC).
+        ttk.Label(action_frame, text="Formato:").pack(side="left", padx=(15, 2), pady=5)
+        self.output_format_var = tk.StringVar(value=OUTPUT_FORMAT_DEFAULT)
+        self.output_format_combo = ttk.Combobox(action_frame, textvariable=self.output_format_var, values=OUTPUT_FORMATS,
+                                                state="readonly", width=8)
+        self.output_format_combo.pack(side="left", padx=2, pady=5)
+
         # --- Barra de Progresso ---
         self.progress_bar = ttk.Progressbar(self.root, orient="horizontal", length=580, mode="determinate")
-        self.progress_bar.pack(pady=10, padx=10, fill="x")
+        self.progress_bar.pack(pady=(10, 0), padx=10, fill="x")
+
+        # Resumo do progresso: concluídos/total, vazão, divisão por sistema de origem e tempo restante.
+        self.progress_label = ttk.Label(self.root, text="")
+        self.progress_label.pack(pady=(2, 5), padx=10, fill="x")
 
         # --- Área de Texto para Status e Logs ---
         self.status_text = tk.Text(self.root, height=10, wrap="word") # Widget para exibir logs e mensagens de status.
@@ -174,7 +240,21 @@ class AppUI:
         text_handler.setFormatter(formatter)
         root_logger.addHandler(text_handler)
 
+        # A área de logs guarda apenas as linhas mais recentes; o log completo vai para um arquivo rotativo.
+        file_handler_error = None
+        try:
+            os.makedirs(os.path.dirname(LOG_FILE_PATH) or ".", exist_ok=True)
+            file_handler = logging.handlers.RotatingFileHandler(
+                LOG_FILE_PATH, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUP_COUNT, encoding="utf-8"
+            )
+            file_handler.setFormatter(formatter)
+            root_logger.addHandler(file_handler)
+        except OSError as e:
+            file_handler_error = e
+
         logging.info("Sistema de logging configurado.")
+        if file_handler_error:
+            logging.warning(f"Não foi possível gravar o log em {LOG_FILE_PATH}: {file_handler_error}")
 
     def _load_and_fill_credentials(self):
         """
@@ -260,12 +340,37 @@ class AppUI:
             current_username, current_password = self.get_loaded_credentials_func()
 
         # Executa a consulta em uma thread separada para manter a UI responsiva.
-        # Agora, a função de ação em main.py não precisa do status_text_widget diretamente.
+        # A thread não acessa os widgets: o progresso chega pelo canal, lido periodicamente por `_poll_progress`.
+        progress_channel = ProgressChannel()
+        self.progress_bar["value"] = 0
+        self.progress_label.config(text="")
         threading.Thread(target=self.start_consultation_action,
-                         args=(self.excel_file_path, self.progress_bar,
-                                 {'start': self.start_button, 'load': self.load_button, 'reset': self.reset_button}, # Mapa de botões para main.py controlar o estado.
-                                 (current_username, current_password)) # Credenciais a serem usadas na consulta.
+                         args=(self.excel_file_path, progress_channel,
+                                 (current_username, current_password)), # Credenciais a serem usadas na consulta.
+                         kwargs={'resume': self.resume_var.get(), # Retoma a partir do diário de checkpoint, se marcado.
+                                 'output_format': self.output_format_var.get()}
                         ).start()
+        self.root.after(PROGRESS_POLL_INTERVAL_MS, self._poll_progress, progress_channel)
+
+    def _poll_progress(self, progress_channel):
+        """
+        Lê os eventos do canal de progresso (na thread da interface), atualiza a barra e o resumo e,
+        ao término da consulta, reabilita os botões.
+        """
+        snapshot, finished = progress_channel.poll()
+        if snapshot is not None:
+            if snapshot.total:
+                self.progress_bar["value"] = min(snapshot.completed / snapshot.total, 1) * 100
+            self.progress_label.config(text=format_progress(snapshot))
+        if finished is None:
+            self.root.after(PROGRESS_POLL_INTERVAL_MS, self._poll_progress, progress_channel)
+            return
+
+        if finished.get("summary") is not None:
+            self.progress_bar["value"] = 100
+        self.start_button.config(state="normal")
+        self.load_button.config(state="normal")
+        self.reset_button.config(state="normal")
 
     def _trigger_save_credentials(self):
         """
@@ -291,6 +396,7 @@ class AppUI:
         self.reset_button.config(state="disabled")
         self.load_button.config(state="normal") # Habilita o botão de carregar para nova seleção.
         self.progress_bar["value"] = 0 # Reseta a barra de progresso.
+        self.progress_label.config(text="")
         self.status_text.config(state=tk.NORMAL) # Habilita para limpar
         self.status_text.delete(1.0, tk.END) # Limpa todo o texto da área de status.
         self.status_text.config(state=tk.DISABLED) # Desabilita novamente
@@ -337,21 +443,16 @@ if __name__ == '__main__':
             path_callback(None)
 
 
-    def test_start_consultation(excel_path, progress_widget, buttons, credentials):
-        logging.info(f"Test: Iniciando consulta para {excel_path} com user: {credentials[0]}")
-        for i in range(101): # Simula o progresso da consulta.
+    def test_start_consultation(excel_path, progress_channel, credentials, resume=False, output_format=OUTPUT_FORMAT_DEFAULT):
+        logging.info(f"Test: Iniciando consulta para {excel_path} com user: {credentials[0]} (retomar: {resume}, formato: {output_format})")
+        progress_channel.set_total(100)
+        for i in range(100): # Simula o progresso da consulta.
             time.sleep(0.05) # Pequena pausa para simular trabalho.
-            progress_widget["value"] = i
-            logging.info(f"Progresso: {i}%")
-            # A linha abaixo não é mais necessária aqui, pois o TkinterTextHandler lida com isso
-            # status_widget.see(tk.END)
-            if root_for_test: # Necessário para atualizar a UI durante o loop de teste.
-                 root_for_test.update_idletasks()
+            progress_channel.item_completed("SAJ" if i % 4 else "PROJUDI")
+            logging.info(f"Progresso: {i + 1}%")
         logging.info("Test: Consulta Concluída!")
-        # Reabilita os botões após a simulação da consulta.
-        buttons['start'].config(state="normal")
-        buttons['load'].config(state="normal")
-        buttons['reset'].config(state="normal")
+        # A UI reabilita os botões ao receber o evento de término.
+        progress_channel.finish(summary={})
 
 
     def test_save_credentials(username, password):
@@ -368,11 +469,6 @@ if __name__ == '__main__':
 
     import time # Necessário para time.sleep no test_start_consultation.
     
-    # Cria uma instância da root do Tkinter especificamente para este teste.
-    # Esta variável root_for_test é usada por test_start_consultation para chamar update_idletasks,
-    # o que é necessário para que as atualizações da UI sejam processadas durante a simulação.
-    root_for_test = tk.Tk() 
-    
     # Chama launch_ui com as funções de teste para rodar a UI em modo de teste.
     launch_ui(load_excel_action_func=test_load_excel,
               start_consultation_action_func=test_start_consultation,
@@ -0,0 +1,87 @@
+# Este módulo mantém um diário (journal) em disco dos resultados de uma consulta em lote.
+# Cada resultado é gravado assim que é obtido, permitindo retomar o lote após uma falha
+# sem repetir os processos já consultados.
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from utils.constants import CHECKPOINT_DIR
+
+class CheckpointJournal:
+    """
+    Diário somente-anexação (JSON Lines) dos resultados de um arquivo de entrada.
+
+    O arquivo do diário é derivado do caminho absoluto da planilha de entrada, de forma que
+    executar novamente o mesmo arquivo encontra o diário da execução anterior.
+    """
+    def __init__(self, input_path, journal_dir=CHECKPOINT_DIR):
+        abs_path = os.path.abspath(input_path)
+        digest = hashlib.sha1(abs_path.encode("utf-8")).hexdigest()[:12]
+        base_name = os.path.splitext(os.path.basename(abs_path))[0]
+        self.path = os.path.join(journal_dir, f"{base_name}_{digest}.jsonl")
+        self._file = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """
+        Lê os resultados já gravados no diário.
+
+        Returns:
+            dict: {numero_do_processo: (data, descricao, nome_executado, sistema_de_origem)}. Uma última linha
+                  incompleta (gravação interrompida) é descartada do arquivo, para que as próximas gravações
+                  comecem em uma linha nova.
+        """
+        completed = {}
+        if not os.path.exists(self.path):
+            return completed
+        with open(self.path, "r+b") as f:
+            data = f.read()
+            complete_end = data.rfind(b"\n") + 1 # Fim da última linha completa
+            if complete_end < len(data):
+                logging.warning(f"Última linha do diário '{self.path}' descartada (gravação incompleta).")
+                f.truncate(complete_end)
+        for line_number, line in enumerate(data[:complete_end].splitlines(), start=1):
+            try:
+                entry = json.loads(line)
+                completed[entry["process_number"]] = (entry["date"], entry["description"], entry["executed_name"], entry["source"])
+            except (ValueError, KeyError):
+                logging.warning(f"Linha {line_number} do diário '{self.path}' ignorada (conteúdo inválido).")
+        return completed
+
+    def append(self, process_number, result, source):
+        """
+        Grava um resultado no diário e força a escrita em disco antes de retornar.
+        """
+        date, description, executed_name = result
+        line = json.dumps({
+            "process_number": process_number,
+            "date": str(date),
+            "description": str(description),
+            "executed_name": str(executed_name),
+            "source": source,
+            "recorded_at": time.time(),
+        }, ensure_ascii=False)
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def discard(self):
+        """Remove o diário (ao iniciar uma consulta nova ou após salvar os resultados)."""
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,70 @@
+# Este módulo trata a numeração única dos processos (padrão CNJ, Resolução 65/2008):
+# normalização para a forma canônica NNNNNNN-DD.AAAA.J.TR.OOOO e validação dos dígitos
+# verificadores (módulo 97, ISO 7064), de forma vetorizada sobre colunas do pandas.
+import pandas as pd
+
+from utils.constants import STATUS_NUMERO_INVALIDO, STATUS_DIGITO_VERIFICADOR_INVALIDO
+
+CNJ_DIGITS = 20
+# Células numéricas perdem os zeros à esquerda do número sequencial (NNNNNNN); eles são
+# recompostos quando restarem ao menos estes dígitos.
+MIN_DIGITS_TO_PAD = 14
+
+def format_cnj(digits):
+    """Formata 20 dígitos como NNNNNNN-DD.AAAA.J.TR.OOOO."""
+    return f"{digits[0:7]}-{digits[7:9]}.{digits[9:13]}.{digits[13]}.{digits[14:16]}.{digits[16:20]}"
+
+def cnj_check_digits_ok(digits):
+    """
+    Verifica os dígitos verificadores (DD) de um número CNJ com 20 dígitos.
+
+    O número completo (NNNNNNN AAAA J TR OOOO DD) deve deixar resto 1 na divisão por 97. Como ele não
+    cabe em um inteiro de 64 bits, o resto é calculado em três partes, como na resolução do CNJ.
+    """
+    return _mod97_remainder(int(digits[0:7]), int(digits[9:16]), int(digits[16:20] + digits[7:9])) == 1
+
+def _mod97_remainder(sequential, year_segment_court, origin_check):
+    # Funciona tanto com inteiros quanto com Series do pandas (int64): nenhum resultado intermediário
+    # ultrapassa 11 dígitos.
+    remainder = sequential % 97
+    remainder = (remainder * 10**7 + year_segment_court) % 97
+    return (remainder * 10**6 + origin_check) % 97
+
+def normalize_cnj_numbers(values):
+    """
+    Normaliza e valida um bloco de números de processo de uma só vez.
+
+    Args:
+        values (iterable): Números como lidos da planilha (texto, número ou vazio).
+
+    Returns:
+        pandas.DataFrame: Colunas `original` (texto como na planilha; vazios viram "nan"),
+            `canonical` (forma NNNNNNN-DD.AAAA.J.TR.OOOO, ou None se não houver 20 dígitos) e
+            `status` (None se válido, `STATUS_NUMERO_INVALIDO` ou `STATUS_DIGITO_VERIFICADOR_INVALIDO`).
+    """
+    series = pd.Series(list(values), dtype=object)
+    original = series.where(series.notna(), "nan").astype(str)
+    digits = original.str.replace(r"\D", "", regex=True)
+    is_numeric_cell = series.map(lambda value: isinstance(value, int) and not isinstance(value, bool))
+    pad = is_numeric_cell & digits.str.len().between(MIN_DIGITS_TO_PAD, CNJ_DIGITS - 1)
+    digits = digits.where(~pad, digits.str.zfill(CNJ_DIGITS))
+    has_cnj_length = digits.str.len() == CNJ_DIGITS
+
+    result = pd.DataFrame({"original": original, "canonical": None, "status": STATUS_NUMERO_INVALIDO}, dtype=object)
+    if not has_cnj_length.any():
+        return result
+
+    cnj = digits[has_cnj_length]
+    check_ok = _mod97_remainder(
+        cnj.str.slice(0, 7).astype("int64"),
+        cnj.str.slice(9, 16).astype("int64"),
+        (cnj.str.slice(16, 20) + cnj.str.slice(7, 9)).astype("int64"),
+    ) == 1
+
+    result.loc[has_cnj_length, "canonical"] = (
+        cnj.str.slice(0, 7) + "-" + cnj.str.slice(7, 9) + "." + cnj.str.slice(9, 13) + "."
+        + cnj.str.slice(13, 14) + "." + cnj.str.slice(14, 16) + "." + cnj.str.slice(16, 20)
+    )
+    result.loc[check_ok[check_ok].index, "status"] = None
+    result.loc[check_ok[~check_ok].index, "status"] = STATUS_DIGITO_VERIFICADOR_INVALIDO
+    return result
@@ -2,12 +2,22 @@
 # lendo-as e salvando-as em um arquivo de configuração (config.ini).
 import configparser # Para manipulação de arquivos .ini.
 import logging # Importar o módulo logging
-import keyring # Para gerenciamento seguro de credenciais
 import os # Para verificar o ambiente local
 
 # Nome do serviço para o keyring
 KEYRING_SERVICE_NAME = "RPA_TJAM_PROJUDI"
 
+def _load_keyring():
+    """
+    Importa o keyring apenas quando as credenciais são lidas ou salvas (a importação é lenta e não deve
+    atrasar a abertura da janela). Retorna None se o módulo não estiver disponível.
+    """
+    try:
+        import keyring # Para gerenciamento seguro de credenciais
+        return keyring
+    except ImportError:
+        return None
+
 # Variáveis globais para armazenar em memória as credenciais carregadas.
 projudi_username = ""
 projudi_password = ""
@@ -20,6 +30,7 @@ def load_credentials():
     global projudi_username, projudi_password
     
     # Tenta carregar do keyring primeiro
+    keyring = _load_keyring()
     if keyring:
         try:
             stored_username = keyring.get_password(KEYRING_SERVICE_NAME, "username")
@@ -63,6 +74,7 @@ def save_credentials(username, password):
     projudi_username = username
     projudi_password = password
 
+    keyring = _load_keyring()
     if keyring:
         try:
             keyring.set_password(KEYRING_SERVICE_NAME, "username", username)
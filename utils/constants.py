@@ -6,10 +6,14 @@ EXCEL_COL_DATA_MOVIMENTACAO = "DATA_ULTIMA_MOVIMENTACAO"
 EXCEL_COL_DESCRICAO_MOVIMENTACAO = "DESCRICAO_ULTIMA_MOVIMENTACAO"
 EXCEL_COL_REQUERIDO_EXECUTADO = "REQUERIDO/EXECUTADO"
 EXCEL_COL_PROCESSO_LOWER = "processo" # Para compatibilidade
+EXCEL_COL_DATA_ANTERIOR = "DATA_MOVIMENTACAO_ANTERIOR" # Relatório de alterações do modo de acompanhamento
+EXCEL_COL_DESCRICAO_ANTERIOR = "DESCRICAO_MOVIMENTACAO_ANTERIOR" # Relatório de alterações do modo de acompanhamento
+EXCEL_COL_SISTEMA = "SISTEMA" # Sistema de origem (SAJ/PROJUDI) no relatório de alterações
 
 # Mensagens/Status Comuns
 STATUS_NAO_DISPONIVEL = "N/A"
 STATUS_NUMERO_INVALIDO = "NÚMERO DE PROCESSO INVÁLIDO"
+STATUS_DIGITO_VERIFICADOR_INVALIDO = "NÚMERO DE PROCESSO INVÁLIDO (DÍGITO VERIFICADOR)"
 STATUS_SEGREDO_JUSTICA = "SEGREDO DE JUSTIÇA"
 STATUS_MOVIMENTACAO_NAO_ENCONTRADA = "MOVIMENTAÇÃO NÃO ENCONTRADA"
 STATUS_DADOS_NAO_ENCONTRADOS = "DADOS NÃO ENCONTRADOS"
@@ -18,6 +22,12 @@ STATUS_DESCRICAO_NAO_ENCONTRADA = "DESCRIÇÃO NÃO ENCONTRADA"
 STATUS_ERRO_GENERICO = "ERRO GERAL"
 STATUS_CONSULTA_FALHOU = "CONSULTA FALHOU"
 
+# Sistemas de origem de um resultado
+SOURCE_SAJ = "SAJ"
+SOURCE_PROJUDI = "PROJUDI"
+SOURCE_CACHE = "CACHE"
+SOURCE_VALIDACAO = "VALIDACAO" # Número de processo rejeitado na leitura da planilha, sem consulta
+
 # Mensagens de Erro PROJUDI
 PROJUDI_ERRO_CREDENCIAIS_NAO_FORNECIDAS = "Credenciais do PROJUDI não fornecidas para a consulta."
 PROJUDI_ERRO_CREDENCIAIS_INVALIDAS = "Credenciais inválidas ou problema no login."
@@ -39,15 +49,103 @@ PROJUDI_ERRO_ELEMENTO_N_E = "Erro PROJUDI (Elemento N/E)"
 PROJUDI_ERRO_EXTRACAO = "Erro PROJUDI (Extração)"
 PROJUDI_ERRO_ELEMENTO_OBSOLETO = "Erro PROJUDI (Elemento Obsoleto)"
 
-# Tempos de espera (time.sleep) - Podem ser ajustados no futuro, mas são mantidos como constantes
-SLEEP_LOGIN_PROJUDI = 5
-SLEEP_MENU_PROJUDI = 3
-SLEEP_FRAME_CHANGE_PROJUDI = 4
-SLEEP_FIELD_FILL_PROJUDI = 2
-SLEEP_SEARCH_PROJUDI = 4
-SLEEP_AFTER_PROJUDI_CONSULTA = 3
-SLEEP_TABLE_RETRY = 3
-SLEEP_PAGE_LOAD = 5
+# Esperas por condição no PROJUDI (substituem as pausas fixas entre as etapas)
+PROJUDI_WAIT_TIMEOUT = 30 # Tempo máximo (s) de espera por cada condição de prontidão
+PROJUDI_WAIT_POLL_INTERVAL = 0.2 # Intervalo (s) entre as verificações de cada condição
+PROJUDI_IMPLICIT_WAIT = 10 # Espera implícita (s) do driver fora das esperas por condição
+PROJUDI_LOADING_INDICATOR_CSS = "#divCarregando, .carregando, .loading, .spinner" # Indicadores de carregamento
+
+# Pool de sessões do PROJUDI
+PROJUDI_SESSION_POOL_SIZE = 2 # Número máximo de navegadores autenticados mantidos abertos
+PROJUDI_CLIENT_MODE = "selenium" # "selenium" (navegador em todas as etapas) ou "hybrid" (navegador só no login; busca via HTTP)
+PROJUDI_HTTP_TIMEOUT = 30 # Tempo máximo (s) de cada requisição HTTP do modo híbrido
+PROJUDI_HYBRID_MAX_PARSE_FAILURES = 3 # Páginas seguidas não reconhecidas pelo cliente HTTP antes de desativar o modo híbrido
+PROJUDI_WORKER_PROCESSES = 4 # Processos de consulta ao PROJUDI, cada um com seu navegador (0 = pool de sessões no próprio processo)
+PROJUDI_WORKER_LOOKUP_TIMEOUT = 300 # Tempo máximo (s) de espera pelo resultado de um worker (inclui abrir o Chrome e fazer login)
+
+# Inicialização do Chrome do PROJUDI
+CHROMEDRIVER_PATH_CACHE = "chromedriver_path.txt" # Caminho do chromedriver resolvido pelo webdriver-manager (reutilizado entre execuções)
+PROJUDI_LEAN_BROWSER = True # Bloqueia imagens, fontes, mídia e CSS no Chrome do PROJUDI (frames e JavaScript são mantidos)
+PROJUDI_BLOCKED_URL_PATTERNS = [ # Recursos bloqueados via CDP (Network.setBlockedURLs) no perfil enxuto
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.bmp", "*.ico", "*.svg", "*.webp",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp3", "*.mp4", "*.ogg", "*.wav", "*.webm", "*.avi",
+    "*.css",
+]
+
+# Concorrência das consultas ao SAJ
+SAJ_MAX_WORKERS = 8 # Número de consultas simultâneas (e de conexões HTTP mantidas abertas)
+SAJ_CLIENT_MODE = "threads" # "threads" (requests + pool de threads) ou "asyncio" (aiohttp)
+BATCH_DUPLICATE_WINDOW = 10000 # Resultados recentes guardados para entregar números repetidos do lote sem nova consulta
+SAJ_MAX_CONCURRENCY_PER_HOST = 8 # Limite de conexões simultâneas ao SAJ no modo asyncio
+SAJ_RATE_LIMIT_RPS = 2.0 # Requisições por segundo toleradas pelo SAJ (substitui a pausa fixa)
+SAJ_RATE_LIMIT_BURST = 4 # Rajada máxima de requisições permitida pelo limitador
+PROJUDI_RATE_LIMIT_RPS = 1.0 # Consultas por segundo ao PROJUDI, somando todas as sessões (substitui a pausa fixa de 3 s)
+PROJUDI_RATE_LIMIT_BURST = 2 # Rajada máxima de consultas ao PROJUDI permitida pelo limitador
+SAJ_CONNECT_TIMEOUT = 10 # Tempo máximo (s) para conectar ao SAJ
+SAJ_READ_TIMEOUT = 30 # Tempo máximo (s) sem receber dados do SAJ durante uma resposta
+SAJ_RETRY_MAX_ATTEMPTS = 4 # Requisições por processo em caso de erro transitório (conexão, timeout, 429/5xx)
+SAJ_RETRY_BASE_DELAY = 1.0 # Espera base (s) do backoff exponencial entre tentativas (com jitter)
+SAJ_RETRY_MAX_DELAY = 30.0 # Espera máxima (s) entre tentativas
+SAJ_RETRY_STATUSES = (429, 500, 502, 503, 504) # Códigos HTTP tratados como erro transitório
+SAJ_CIRCUIT_FAILURE_THRESHOLD = 5 # Falhas seguidas que suspendem as requisições ao SAJ
+SAJ_CIRCUIT_RESET_TIMEOUT = 30 # Tempo (s) de suspensão antes de testar o SAJ novamente
+SAJ_CIRCUIT_MAX_WAIT = 300 # Espera máxima (s) de uma consulta pelo retorno do SAJ antes de desistir
+
+# Cache local de resultados (SQLite)
+RESULT_CACHE_DB_PATH = "consultas_cache.sqlite3" # Criado no diretório de execução, como o config.ini
+RESULT_CACHE_TTL_FRESH = 24 * 3600 # Validade (s) de uma movimentação encontrada
+RESULT_CACHE_TTL_SEGREDO = 30 * 24 * 3600 # Validade (s) de um resultado "SEGREDO DE JUSTIÇA"
+RESULT_CACHE_TTL_NOT_FOUND = 7 * 24 * 3600 # Validade (s) de um processo não encontrado
+
+# Roteamento entre SAJ e PROJUDI (índice no mesmo arquivo SQLite do cache)
+ROUTING_INDEX_DB_PATH = RESULT_CACHE_DB_PATH
+ROUTING_MIN_SEGMENT_SAMPLES = 5 # Processos resolvidos no segmento/ano antes de prever o sistema de um processo novo
+ROUTING_PROJUDI_SHARE = 0.9 # Fração mínima de processos do segmento/ano no PROJUDI para consultá-lo primeiro
+
+# Detecção de páginas do SAJ sem alteração (no mesmo arquivo SQLite do cache)
+SAJ_FINGERPRINTS_DB_PATH = RESULT_CACHE_DB_PATH
+
+# Modo de acompanhamento (cli.py --watch; registro no mesmo arquivo SQLite do cache)
+WATCH_STATE_DB_PATH = RESULT_CACHE_DB_PATH
+WATCH_INTERVAL_HOURS = 72.0 # Intervalo (h) entre as verificações da carteira
+WATCH_RECHECK_AFTER_HOURS = 24.0 # Processos verificados há menos tempo (h) são pulados
+WATCH_REPORT_DIR = "relatorios" # Diretório (relativo ao de execução) dos relatórios de alterações
+
+# Histórico completo de movimentações (cli.py --full-history; requer pyarrow)
+HISTORY_DIR = "historico" # Diretório (relativo ao de execução) do histórico em Parquet, particionado por data
+HISTORY_FLUSH_ROWS = 50000 # Linhas acumuladas em memória antes de gravar um novo arquivo Parquet
+
+# Formatos do arquivo de resultados (ver utils/result_writers.py)
+OUTPUT_FORMAT_DEFAULT = "xlsx" # "xlsx", "csv", "parquet" (requer pyarrow) ou "arrow" (Arrow IPC, requer pyarrow)
+OUTPUT_FORMATS = ["xlsx", "csv", "parquet", "arrow"] # Formatos do arquivo de resultados (ver utils/result_writers.py)
+RESULT_WRITER_BATCH_ROWS = 10000 # Linhas acumuladas antes de gravar um bloco nos formatos Parquet e Arrow
+
+# Leitura da planilha de entrada
+EXCEL_READ_CHUNK_SIZE = 5000 # Linhas validadas por vez ao ler a coluna dos processos
+
+# Diário de checkpoint das consultas em lote
+CHECKPOINT_DIR = "checkpoints" # Diretório (relativo ao de execução) dos diários de cada planilha
+
+# Linha de comando (cli.py)
+CLI_ENV_USERNAME = "PROJUDI_USERNAME" # Variável de ambiente com o usuário do PROJUDI
+CLI_ENV_PASSWORD = "PROJUDI_PASSWORD" # Variável de ambiente com a senha do PROJUDI
+
+# Logs da interface gráfica
+UI_LOG_FLUSH_INTERVAL_MS = 100 # Intervalo (ms) entre as atualizações da área de logs
+UI_LOG_MAX_LINES = 2000 # Linhas mantidas na área de logs (as mais antigas são descartadas)
+LOG_FILE_PATH = "logs/consulta.log" # Log completo (relativo ao diretório de execução)
+LOG_FILE_MAX_BYTES = 5 * 1024 * 1024 # Tamanho máximo de cada arquivo de log antes da rotação
+LOG_FILE_BACKUP_COUNT = 5 # Arquivos de log antigos mantidos
+
+# Progresso da consulta (utils/progress.py)
+PROGRESS_PUBLISH_INTERVAL = 0.5 # Intervalo mínimo (s) entre eventos de progresso publicados pelas consultas
+PROGRESS_POLL_INTERVAL_MS = 250 # Intervalo (ms) em que a interface lê os eventos de progresso
+PROGRESS_RATE_WINDOW = 60 # Janela (s) usada para calcular a vazão recente e a estimativa de término
+
+# Métricas de tempo por etapa (utils/metrics.py), regravadas ao fim de cada lote
+METRICS_JSON_PATH = "metrics/ultima_consulta.json" # Resumo em JSON (relativo ao diretório de execução)
+METRICS_PROMETHEUS_PATH = "metrics/tjam_consulta.prom" # Arquivo para o coletor "textfile" do node_exporter
 
 
 # Configurações do Keyring
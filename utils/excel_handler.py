@@ -2,12 +2,20 @@
 # como ler números de processo de uma planilha e salvar os resultados da consulta
 # em uma nova planilha.
 import pandas as pd # Biblioteca para manipulação e análise de dados, usada para ler/escrever Excel.
-from tkinter import filedialog # Para caixas de diálogo de seleção/salvamento de arquivo. MessageBox será substituído por logging.
+from openpyxl import Workbook, load_workbook # Leitura "read-only" e escrita "write-only" (streaming) de planilhas grandes.
 import logging # Adicionar import de logging
+import os
+import shutil
+import tempfile
+
+from utils.cnj import normalize_cnj_numbers, cnj_check_digits_ok
+from utils.metrics import span, STAGE_EXCEL_WRITE, STAGE_EXCEL_SAVE
+from utils.constants import EXCEL_COL_PROCESSO, EXCEL_COL_PROCESSO_LOWER, EXCEL_READ_CHUNK_SIZE
 
 def is_valid_process_number(process_number):
     """
-    Valida se um número de processo tem exatamente 20 caracteres numéricos após remover caracteres especiais.
+    Valida se um número de processo tem exatamente 20 caracteres numéricos após remover caracteres especiais
+    e se os seus dígitos verificadores conferem (padrão CNJ, módulo 97).
     
     Args:
         process_number (str): O número do processo a ser validado.
@@ -18,13 +26,125 @@ def is_valid_process_number(process_number):
     # Remove caracteres não numéricos (pontos, hífens, espaços, etc.)
     digits_only = ''.join(filter(str.isdigit, str(process_number)))
     
-    # Verifica se restaram exatamente 20 dígitos
-    return len(digits_only) == 20
+    # Verifica se restaram exatamente 20 dígitos e se o dígito verificador confere
+    return len(digits_only) == 20 and cnj_check_digits_ok(digits_only)
+
+PROCESS_COLUMN_NAMES = (EXCEL_COL_PROCESSO, EXCEL_COL_PROCESSO_LOWER) # Nomes aceitos para a coluna dos números de processo, em ordem de preferência
+
+def _find_process_column(column_names):
+    for name in PROCESS_COLUMN_NAMES:
+        if name in column_names:
+            return name
+    raise ValueError("O arquivo Excel deve conter uma coluna chamada 'PROCESSO' ou 'processo'.")
+
+def _validate_chunk(values):
+    """
+    Normaliza e valida um bloco de números de processo de uma só vez (vetorizado com pandas, ver `utils.cnj`).
+
+    Returns:
+        list: Triplas (numero_como_na_planilha, numero_cnj_ou_None, status_ou_None), na mesma ordem de `values`.
+    """
+    normalized = normalize_cnj_numbers(values)
+    return list(zip(normalized["original"].tolist(), normalized["canonical"].tolist(), normalized["status"].tolist()))
+
+def _iter_column_xlsx(file_path):
+    """
+    Lê apenas a coluna dos processos de um .xlsx em modo somente-leitura (linha a linha, sem carregar
+    a planilha inteira). Retorna um gerador dos valores das células.
+    """
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, ())
+        column_index = list(header).index(_find_process_column(header))
+    except Exception:
+        workbook.close()
+        raise
+
+    def values():
+        try:
+            blank_run = 0 # Linhas totalmente vazias só são emitidas se houver dados depois delas (como no pandas)
+            for row in rows:
+                if all(cell is None for cell in row):
+                    blank_run += 1
+                    continue
+                value = row[column_index] if column_index < len(row) else None
+                for _ in range(blank_run):
+                    yield None
+                blank_run = 0
+                yield value
+        finally:
+            workbook.close()
+
+    return values()
+
+def _iter_column_pandas(file_path):
+    """Leitura para formatos sem suporte a modo somente-leitura (.xls): apenas a coluna dos processos."""
+    header = pd.read_excel(file_path, nrows=0).columns
+    process_column = _find_process_column(header)
+    column = pd.read_excel(file_path, usecols=[process_column])[process_column]
+    return iter(column.tolist())
+
+def iter_process_numbers_from_excel(file_path, chunk_size=EXCEL_READ_CHUNK_SIZE):
+    """
+    Lê os números dos processos de um arquivo Excel sob demanda, carregando apenas a coluna
+    'PROCESSO'/'processo'. A normalização para o formato CNJ e a validação (inclusive dos dígitos
+    verificadores) são feitas em blocos de `chunk_size` linhas.
+
+    A coluna é localizada (e o arquivo aberto) já na chamada, de forma que um arquivo inválido
+    gera a exceção imediatamente; os números são produzidos à medida que as linhas são lidas, o que
+    permite iniciar a consulta antes de ler a planilha inteira.
+
+    Returns:
+        generator: Triplas (numero_como_na_planilha, numero_cnj, status), na ordem da planilha. `numero_cnj`
+                   é a forma canônica NNNNNNN-DD.AAAA.J.TR.OOOO (None sem 20 dígitos) e `status` é None
+                   para números válidos ou o status de número inválido a ser exibido no resultado.
+
+    Raises:
+        ValueError: Se a planilha não tiver a coluna dos processos.
+    """
+    if os.path.splitext(file_path)[1].lower() in (".xlsx", ".xlsm"):
+        values = _iter_column_xlsx(file_path)
+    else:
+        values = _iter_column_pandas(file_path)
+
+    def numbers():
+        chunk = []
+        for value in values:
+            chunk.append(value)
+            if len(chunk) >= chunk_size:
+                yield from _validate_chunk(chunk)
+                chunk = []
+        if chunk:
+            yield from _validate_chunk(chunk)
+
+    return numbers()
+
+def estimate_process_count(file_path):
+    """
+    Estima, sem ler as linhas, quantos processos a planilha contém (para a barra de progresso).
+
+    Returns:
+        int or None: O número de linhas de dados declarado pela planilha, ou None se não for possível estimar.
+    """
+    if os.path.splitext(file_path)[1].lower() not in (".xlsx", ".xlsm"):
+        return None
+    try:
+        workbook = load_workbook(file_path, read_only=True)
+        try:
+            max_row = workbook.active.max_row
+        finally:
+            workbook.close()
+    except Exception as e:
+        logging.warning(f"Não foi possível estimar o tamanho da planilha: {e}")
+        return None
+    return max(0, max_row - 1) if max_row else None
 
 def read_process_numbers_from_excel(file_path):
     """
     Lê os números dos processos de um arquivo Excel.
-    Valida cada número para garantir que tem 20 caracteres numéricos.
+    Valida cada número (20 dígitos e dígitos verificadores do padrão CNJ); os válidos são retornados na forma canônica.
+    Para planilhas grandes, prefira `iter_process_numbers_from_excel`, que não carrega tudo em memória.
     
     Returns:
         tuple: (valid_numbers, invalid_numbers) onde:
@@ -32,26 +152,11 @@ def read_process_numbers_from_excel(file_path):
                - invalid_numbers é uma lista de números de processo inválidos
     """
     try:
-        df = pd.read_excel(file_path)
-        
-        # Identificar a coluna correta
-        process_column = None
-        if "PROCESSO" in df.columns:
-            process_column = "PROCESSO"
-        elif "processo" in df.columns:
-            process_column = "processo"
-        else:
-            logging.error("O arquivo Excel deve conter uma coluna chamada 'PROCESSO' ou 'processo'.")
-            return None, None
-        
-        # Converter todos os números para string e validar
-        all_numbers = df[process_column].astype(str).tolist()
         valid_numbers = []
         invalid_numbers = []
-        
-        for num in all_numbers:
-            if is_valid_process_number(num):
-                valid_numbers.append(num)
+        for num, canonical, status in iter_process_numbers_from_excel(file_path):
+            if status is None:
+                valid_numbers.append(canonical)
             else:
                 invalid_numbers.append(num)
                 
@@ -60,6 +165,9 @@ def read_process_numbers_from_excel(file_path):
                                    f"Eles serão incluídos no resultado final como 'NÚMERO DE PROCESSO INVÁLIDO'.")
                 
         return valid_numbers, invalid_numbers
+    except ValueError as e:
+        logging.error(str(e))
+        return None, None
     except Exception as e:
         logging.error(f"Ocorreu um erro ao ler o arquivo Excel: {e}", exc_info=True)
         return None, None
@@ -73,6 +181,8 @@ def save_results_to_excel(results_list, default_filename="resultados_consulta.xl
         logging.info("Não há resultados para salvar.")
         return None
  
+    from tkinter import filedialog # Importado sob demanda: apenas os diálogos de salvamento dependem do Tk.
+
     # Cria um DataFrame do Pandas a partir da lista de dicionários.
     output_df = pd.DataFrame(results_list)
     
@@ -96,3 +206,77 @@ def save_results_to_excel(results_list, default_filename="resultados_consulta.xl
         # Se o usuário cancelou a caixa de diálogo de salvamento.
         logging.info("Salvamento do arquivo de resultados cancelado.")
         return None
+
+class StreamingExcelWriter:
+    """
+    Escreve os resultados em uma planilha à medida que ficam prontos, usando o modo "write-only"
+    do openpyxl: as linhas vão para um arquivo temporário, sem manter a planilha inteira em memória.
+    Ao final, `finalize` grava o arquivo e o move para o destino escolhido.
+    Os demais formatos de resultados (CSV, Parquet, Arrow) estão em utils/result_writers.py.
+    """
+    extension = ".xlsx"
+    file_type_label = "Excel files"
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.rows_written = 0
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet()
+        self._sheet.append(self.columns)
+        fd, self._temp_path = tempfile.mkstemp(suffix=".xlsx")
+        os.close(fd)
+
+    def append(self, row):
+        """Adiciona uma linha (dicionário indexado pelos nomes das colunas)."""
+        with span(STAGE_EXCEL_WRITE):
+            self._sheet.append([row.get(column, "") for column in self.columns])
+        self.rows_written += 1
+
+    def finalize(self, output_file_path):
+        """
+        Conclui a planilha e a move para `output_file_path`.
+
+        Returns:
+            str or None: O caminho do arquivo salvo, ou None em caso de erro.
+        """
+        try:
+            with span(STAGE_EXCEL_SAVE):
+                self._workbook.save(self._temp_path)
+                shutil.move(self._temp_path, output_file_path)
+            logging.info(f"Resultados salvos em:\n{output_file_path}")
+            return output_file_path
+        except Exception as e:
+            logging.error("Não foi possível salvar o arquivo Excel: %s", e, exc_info=True)
+            return None
+
+    def discard(self):
+        """Descarta a planilha temporária (por exemplo, se o usuário cancelar o salvamento)."""
+        try:
+            os.remove(self._temp_path)
+        except OSError:
+            pass
+
+def save_streamed_results_to_excel(writer, default_filename="resultados_consulta"):
+    """
+    Pergunta ao usuário onde salvar e conclui o arquivo gerado por um `StreamingExcelWriter` (ou por
+    outro escritor de utils/result_writers.py, no formato dele).
+    Retorna o caminho do arquivo salvo ou None se o salvamento for cancelado.
+    """
+    if not writer.rows_written:
+        logging.info("Não há resultados para salvar.")
+        writer.discard()
+        return None
+
+    from tkinter import filedialog # Importado sob demanda (ver `save_results_to_excel`).
+
+    output_file_path = filedialog.asksaveasfilename(
+        defaultextension=writer.extension,
+        initialfile=default_filename + writer.extension,
+        filetypes=[(writer.file_type_label, "*" + writer.extension)]
+    )
+
+    if output_file_path:
+        return writer.finalize(output_file_path)
+    logging.info("Salvamento do arquivo de resultados cancelado.")
+    writer.discard()
+    return None
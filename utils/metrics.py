@@ -0,0 +1,178 @@
+# Este módulo coleta a duração de cada etapa da consulta (busca e parsing no SAJ, abertura do Chrome,
+# login, navegação, busca e detalhes no PROJUDI, gravação da planilha) e gera, ao final do lote,
+# um resumo com percentis por etapa e a vazão, exportável em JSON e no formato "textfile" do Prometheus.
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+
+# Etapas instrumentadas (rótulo usado nos logs, no JSON e no Prometheus)
+STAGE_SAJ_RATE_LIMIT = "saj_rate_limit_wait"
+STAGE_SAJ_FETCH = "saj_fetch"
+STAGE_SAJ_PARSE = "saj_parse"
+STAGE_PROJUDI_RATE_LIMIT = "projudi_rate_limit_wait"
+STAGE_CHROME_LAUNCH = "chrome_launch"
+STAGE_CHROMEDRIVER_RESOLVE = "chromedriver_resolve" # Localização do chromedriver (cache ou webdriver-manager)
+STAGE_PROJUDI_TIME_TO_INTERACTIVE = "projudi_time_to_interactive" # Da navegação até a página de login ficar pronta
+STAGE_PROJUDI_LOGIN = "projudi_login"
+STAGE_PROJUDI_MENU = "projudi_menu_navigation"
+STAGE_PROJUDI_SEARCH = "projudi_search"
+STAGE_PROJUDI_DETAIL = "projudi_detail_extraction"
+STAGE_EXCEL_WRITE = "excel_write"
+STAGE_EXCEL_SAVE = "excel_save"
+STAGE_OUTPUT_WRITE = "output_write" # Gravação dos resultados em CSV, Parquet ou Arrow
+STAGE_OUTPUT_SAVE = "output_save"
+
+PERCENTILES = (50, 95, 99)
+PROMETHEUS_PREFIX = "tjam_consulta"
+
+def _percentile(sorted_samples, percentile):
+    # Método "nearest rank".
+    rank = max(1, math.ceil(percentile / 100 * len(sorted_samples)))
+    return sorted_samples[rank - 1]
+
+class MetricsRegistry:
+    """
+    Amostras de duração por etapa e contagem de itens concluídos. Pode ser usado a partir de várias threads.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Descarta as amostras (chamado no início de cada lote)."""
+        with self._lock:
+            self._samples = {}
+            self._items = 0
+            self._started_at = time.time()
+            self._started_monotonic = time.monotonic()
+
+    def record(self, stage, seconds):
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = array('d')
+            samples.append(seconds)
+
+    @contextmanager
+    def span(self, stage):
+        """Mede a duração do bloco `with` e a registra na etapa `stage` (mesmo se houver exceção)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+
+    def item_completed(self, count=1):
+        with self._lock:
+            self._items += count
+
+    def drain(self):
+        """
+        Retira e retorna as amostras registradas até agora, como pares (etapa, segundos).
+        Usado pelos workers do PROJUDI para enviar suas medições ao processo principal.
+        """
+        with self._lock:
+            samples, self._samples = self._samples, {}
+        return [(stage, seconds) for stage, values in samples.items() for seconds in values]
+
+    def merge(self, samples):
+        """Incorpora amostras obtidas com `drain` em outro processo."""
+        for stage, seconds in samples:
+            self.record(stage, seconds)
+
+    def summary(self):
+        """
+        Returns:
+            dict: {"started_at", "elapsed_seconds", "items", "items_per_minute",
+                   "stages": {etapa: {"count", "total_seconds", "p50", "p95", "p99"}}}.
+        """
+        with self._lock:
+            samples = {stage: sorted(values) for stage, values in self._samples.items()}
+            items = self._items
+            started_at = self._started_at
+            elapsed = time.monotonic() - self._started_monotonic
+
+        stages = {}
+        for stage, values in sorted(samples.items()):
+            if not values:
+                continue
+            stage_summary = {"count": len(values), "total_seconds": round(math.fsum(values), 6)}
+            for percentile in PERCENTILES:
+                stage_summary[f"p{percentile}"] = round(_percentile(values, percentile), 6)
+            stages[stage] = stage_summary
+
+        return {
+            "started_at": started_at,
+            "elapsed_seconds": round(elapsed, 3),
+            "items": items,
+            "items_per_minute": round(items / elapsed * 60, 2) if elapsed > 0 else 0.0,
+            "stages": stages,
+        }
+
+def log_summary(summary):
+    """Registra no log o resumo por etapa (percentis em milissegundos)."""
+    logging.info(f"Métricas do lote: {summary['items']} processos em {summary['elapsed_seconds']:.1f} s "
+                 f"({summary['items_per_minute']:.1f} processos/min).")
+    for stage, values in summary["stages"].items():
+        logging.info(f"  {stage}: {values['count']}x, total {values['total_seconds']:.1f} s, "
+                     f"p50 {values['p50'] * 1000:.0f} ms, p95 {values['p95'] * 1000:.0f} ms, p99 {values['p99'] * 1000:.0f} ms")
+
+def _write_atomically(path, content):
+    # O coletor "textfile" do Prometheus pode ler o arquivo a qualquer momento: grava em um temporário e renomeia.
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(temp_path, path)
+    except Exception:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+def write_json(summary, path):
+    _write_atomically(path, json.dumps(summary, ensure_ascii=False, indent=2))
+
+def format_prometheus(summary):
+    """Formata o resumo no formato de exposição de texto do Prometheus."""
+    lines = [
+        f"# HELP {PROMETHEUS_PREFIX}_stage_duration_seconds Duração de cada etapa da consulta no último lote.",
+        f"# TYPE {PROMETHEUS_PREFIX}_stage_duration_seconds summary",
+    ]
+    for stage, values in summary["stages"].items():
+        for percentile in PERCENTILES:
+            lines.append(f'{PROMETHEUS_PREFIX}_stage_duration_seconds{{stage="{stage}",quantile="{percentile / 100}"}} '
+                         f'{values[f"p{percentile}"]}')
+        lines.append(f'{PROMETHEUS_PREFIX}_stage_duration_seconds_sum{{stage="{stage}"}} {values["total_seconds"]}')
+        lines.append(f'{PROMETHEUS_PREFIX}_stage_duration_seconds_count{{stage="{stage}"}} {values["count"]}')
+    lines += [
+        f"# HELP {PROMETHEUS_PREFIX}_batch_items Processos concluídos no último lote.",
+        f"# TYPE {PROMETHEUS_PREFIX}_batch_items gauge",
+        f"{PROMETHEUS_PREFIX}_batch_items {summary['items']}",
+        f"# HELP {PROMETHEUS_PREFIX}_batch_items_per_minute Vazão do último lote.",
+        f"# TYPE {PROMETHEUS_PREFIX}_batch_items_per_minute gauge",
+        f"{PROMETHEUS_PREFIX}_batch_items_per_minute {summary['items_per_minute']}",
+        f"# HELP {PROMETHEUS_PREFIX}_batch_duration_seconds Duração do último lote.",
+        f"# TYPE {PROMETHEUS_PREFIX}_batch_duration_seconds gauge",
+        f"{PROMETHEUS_PREFIX}_batch_duration_seconds {summary['elapsed_seconds']}",
+        f"# HELP {PROMETHEUS_PREFIX}_batch_last_run_timestamp_seconds Início do último lote (Unix).",
+        f"# TYPE {PROMETHEUS_PREFIX}_batch_last_run_timestamp_seconds gauge",
+        f"{PROMETHEUS_PREFIX}_batch_last_run_timestamp_seconds {summary['started_at']:.0f}",
+    ]
+    return "\n".join(lines) + "\n"
+
+def write_prometheus_textfile(summary, path):
+    _write_atomically(path, format_prometheus(summary))
+
+# Registro global do processo, usado pelos módulos instrumentados.
+metrics = MetricsRegistry()
+span = metrics.span
@@ -0,0 +1,156 @@
+# Este módulo coleta o histórico completo de movimentações (todas as linhas das tabelas do SAJ e do
+# PROJUDI, e não apenas a mais recente) em formato longo: processo, seq, data, descricao, sistema.
+# As linhas são gravadas em arquivos Parquet particionados pela data da execução
+# (<dir>/run_date=AAAA-MM-DD/part-*.parquet), legíveis por pyarrow, pandas, DuckDB, Spark etc.
+# O pyarrow é opcional: só é necessário quando o histórico é ativado.
+import logging
+import os
+import threading
+import uuid
+from datetime import date, datetime
+
+from utils.constants import HISTORY_FLUSH_ROWS
+
+HISTORY_COLUMNS = ["process", "seq", "date", "description", "source"]
+PARTITION_KEY = "run_date"
+
+def _parse_date(text):
+    try:
+        return datetime.strptime(text, "%d/%m/%Y").date()
+    except (TypeError, ValueError):
+        return None # Datas ausentes ou fora do padrão (por exemplo, "Data não encontrada")
+
+def write_parquet_part(rows, partition_dir):
+    """
+    Grava as linhas em um novo arquivo Parquet da partição (escrita atômica).
+
+    Args:
+        rows (list): Tuplas (processo, seq, data_dd/mm/aaaa, descricao, sistema).
+        partition_dir (str): Diretório da partição, por exemplo "historico/run_date=2024-05-28".
+
+    Returns:
+        str: O caminho do arquivo gravado.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    processes, seqs, dates, descriptions, sources = zip(*rows)
+    table = pa.table({
+        "process": pa.array(processes, pa.string()),
+        "seq": pa.array(seqs, pa.int32()),
+        "date": pa.array([_parse_date(text) for text in dates], pa.date32()),
+        "description": pa.array(descriptions, pa.string()),
+        "source": pa.array(sources, pa.string()),
+    })
+    os.makedirs(partition_dir, exist_ok=True)
+    file_name = f"part-{datetime.now():%H%M%S}-{uuid.uuid4().hex[:8]}.parquet"
+    path = os.path.join(partition_dir, file_name)
+    temp_path = path + ".tmp"
+    pq.write_table(table, temp_path)
+    os.replace(temp_path, path)
+    return path
+
+class MovementHistory:
+    """
+    Acumula as movimentações registradas durante um lote. Pode ser usado a partir de várias threads.
+
+    No processo principal, `start` define o diretório de saída, e as linhas são gravadas a cada
+    `flush_rows` linhas e em `finish`. Nos workers do PROJUDI, `enable` apenas ativa a coleta, e as
+    linhas seguem para o processo principal com `drain`/`merge` (como as métricas).
+    """
+    def __init__(self, flush_rows=HISTORY_FLUSH_ROWS):
+        self.flush_rows = flush_rows
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._rows = []
+        self._output_dir = None
+        self._run_date = None
+        self._files = []
+        self._rows_written = 0
+
+    @property
+    def partition_dir(self):
+        return os.path.join(self._output_dir, f"{PARTITION_KEY}={self._run_date.isoformat()}")
+
+    def enable(self):
+        """Ativa a coleta sem gravação (usado nos workers do PROJUDI)."""
+        self.enabled = True
+
+    def start(self, output_dir, run_date=None):
+        """
+        Ativa a coleta e a gravação em `output_dir`, na partição da data `run_date` (padrão: hoje).
+
+        Raises:
+            ImportError: Se o pyarrow não estiver instalado.
+        """
+        from utils.result_writers import require_pyarrow # Sob demanda: os workers do PROJUDI não carregam pandas/openpyxl
+        require_pyarrow("O histórico completo de movimentações")
+        with self._lock:
+            self._rows = []
+            self._files = []
+            self._rows_written = 0
+            self._output_dir = output_dir
+            self._run_date = run_date or date.today()
+            self.enabled = True
+
+    def record(self, process_number, source, movements):
+        """
+        Registra as movimentações de um processo, da mais recente (seq 1) para a mais antiga.
+
+        Args:
+            movements (list): Pares (data, descricao), na ordem da tabela do sistema de origem.
+        """
+        if not self.enabled or not movements:
+            return
+        self.merge([(process_number, seq, movement_date, description, source)
+                    for seq, (movement_date, description) in enumerate(movements, start=1)])
+
+    def drain(self):
+        """Retira e retorna as linhas ainda não gravadas (enviadas pelos workers ao processo principal)."""
+        with self._lock:
+            rows, self._rows = self._rows, []
+        return rows
+
+    def merge(self, rows):
+        """Incorpora linhas obtidas com `drain` em outro processo."""
+        if not rows:
+            return
+        with self._lock:
+            self._rows.extend(rows)
+            if self._output_dir is None or len(self._rows) < self.flush_rows:
+                return
+            rows, self._rows = self._rows, []
+        self._write(rows)
+
+    def _write(self, rows):
+        try:
+            path = write_parquet_part(rows, self.partition_dir)
+        except Exception as e:
+            logging.error(f"Não foi possível gravar {len(rows)} movimentações do histórico em {self.partition_dir}: {e}")
+            return
+        with self._lock:
+            self._files.append(path)
+            self._rows_written += len(rows)
+
+    def finish(self):
+        """
+        Grava as linhas restantes e desativa a coleta.
+
+        Returns:
+            dict: Linhas gravadas, arquivos criados e diretório da partição (ou {} se o histórico não foi iniciado).
+        """
+        if self._output_dir is None:
+            self.enabled = False
+            return {}
+        rows = self.drain()
+        if rows:
+            self._write(rows)
+        with self._lock:
+            self.enabled = False
+            summary = {"rows": self._rows_written, "files": list(self._files), "partition": self.partition_dir}
+            self._output_dir = None
+        logging.info(f"Histórico de movimentações: {summary['rows']} linhas gravadas em {summary['partition']}.")
+        return summary
+
+# Histórico do processo atual (cada worker do PROJUDI tem o seu).
+movement_history = MovementHistory()
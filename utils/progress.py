@@ -0,0 +1,119 @@
+# Este módulo implementa o canal de progresso de uma consulta em lote: as threads de consulta
+# registram cada processo concluído, e a interface lê, em intervalos fixos, eventos com o total
+# concluído, a vazão recente, a divisão por sistema de origem e a estimativa de término.
+# Nenhum widget é acessado fora da thread da interface.
+import collections
+import queue
+import threading
+import time
+
+from utils.constants import PROGRESS_PUBLISH_INTERVAL, PROGRESS_RATE_WINDOW
+
+# Tipos de evento
+EVENT_PROGRESS = "progress"
+EVENT_FINISHED = "finished"
+
+# Estado do lote em um instante: processos concluídos, total estimado (ou None), vazão recente
+# (processos/min), contagem por sistema de origem, segundos restantes estimados (ou None) e duração (s).
+ProgressSnapshot = collections.namedtuple(
+    "ProgressSnapshot", ["completed", "total", "items_per_minute", "by_source", "eta_seconds", "elapsed_seconds"]
+)
+
+class ProgressChannel:
+    """
+    Canal de eventos de progresso entre as threads de consulta e a interface.
+
+    `item_completed` pode ser chamada de várias threads ao mesmo tempo; um evento `EVENT_PROGRESS`
+    é publicado no máximo a cada `publish_interval` segundos. `finish` publica o estado final e um
+    evento `EVENT_FINISHED`. A interface consome os eventos com `poll`, na sua própria thread.
+    """
+    def __init__(self, total=None, publish_interval=PROGRESS_PUBLISH_INTERVAL, rate_window=PROGRESS_RATE_WINDOW):
+        self.publish_interval = publish_interval
+        self.rate_window = rate_window
+        self._events = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._total = total
+        self._completed = 0
+        self._by_source = collections.Counter()
+        self._recent = collections.deque() # Instantes de conclusão dentro da janela de vazão
+        self._started = time.monotonic()
+        self._last_published = 0.0
+
+    def set_total(self, total):
+        with self._lock:
+            self._total = total
+        self._publish(force=True)
+
+    def item_completed(self, source, count=1):
+        """Registra `count` processos concluídos, obtidos do sistema `source`."""
+        now = time.monotonic()
+        with self._lock:
+            self._completed += count
+            self._by_source[source] += count
+            self._recent.extend([now] * count)
+        self._publish()
+
+    def finish(self, **details):
+        """Publica o estado final e o evento de término (com `details`, por exemplo o resumo do lote)."""
+        self._publish(force=True)
+        self._events.put((EVENT_FINISHED, details))
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self._lock:
+            while self._recent and now - self._recent[0] > self.rate_window:
+                self._recent.popleft()
+            completed, total = self._completed, self._total
+            by_source = dict(self._by_source)
+            recent = len(self._recent)
+        elapsed = now - self._started
+        window = min(elapsed, self.rate_window)
+        items_per_minute = recent / window * 60 if window > 0 else 0.0
+        eta_seconds = None
+        if total and items_per_minute > 0:
+            eta_seconds = max(total - completed, 0) / items_per_minute * 60
+        return ProgressSnapshot(completed, total, items_per_minute, by_source, eta_seconds, elapsed)
+
+    def _publish(self, force=False):
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_published < self.publish_interval:
+                return
+            self._last_published = now
+        self._events.put((EVENT_PROGRESS, self.snapshot()))
+
+    def poll(self):
+        """
+        Retira os eventos pendentes (sem bloquear).
+
+        Returns:
+            tuple: (ultimo_progresso, detalhes_do_termino): o `ProgressSnapshot` mais recente (ou None se
+                   não houver) e os detalhes passados a `finish` (ou None se o lote não terminou).
+        """
+        latest, finished = None, None
+        while True:
+            try:
+                kind, payload = self._events.get_nowait()
+            except queue.Empty:
+                return latest, finished
+            if kind == EVENT_PROGRESS:
+                latest = payload
+            else:
+                finished = payload
+
+def format_progress(snapshot):
+    """
+    Texto de uma linha com o progresso, por exemplo:
+    "120/1000 (12%) · 35.2 proc/min · CACHE 5, PROJUDI 15, SAJ 100 · restante ~25min00s".
+    """
+    parts = [f"{snapshot.completed}/{snapshot.total}" if snapshot.total else f"{snapshot.completed}"]
+    if snapshot.total:
+        parts[0] += f" ({min(snapshot.completed / snapshot.total, 1):.0%})"
+    parts.append(f"{snapshot.items_per_minute:.1f} proc/min")
+    if snapshot.by_source:
+        parts.append(", ".join(f"{source} {count}" for source, count in sorted(snapshot.by_source.items())))
+    if snapshot.eta_seconds is not None and snapshot.completed < (snapshot.total or 0):
+        minutes, seconds = divmod(int(snapshot.eta_seconds), 60)
+        hours, minutes = divmod(minutes, 60)
+        parts.append(f"restante ~{hours}h{minutes:02d}min" if hours else f"restante ~{minutes}min{seconds:02d}s")
+    return " · ".join(parts)
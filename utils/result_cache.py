@@ -0,0 +1,119 @@
+# Este módulo mantém um cache local (SQLite) dos resultados das consultas, para que processos
+# consultados recentemente não precisem ser buscados novamente no SAJ/PROJUDI.
+import logging
+import sqlite3
+import threading
+import time
+
+from utils.constants import (
+    STATUS_SEGREDO_JUSTICA, STATUS_NAO_DISPONIVEL, STATUS_DATA_NAO_ENCONTRADA,
+    PROJUDI_PROCESS_NAO_ENCONTRADO,
+    RESULT_CACHE_DB_PATH, RESULT_CACHE_TTL_FRESH, RESULT_CACHE_TTL_SEGREDO, RESULT_CACHE_TTL_NOT_FOUND
+)
+
+# Tipos de resultado, cada um com sua própria validade no cache.
+OUTCOME_FRESH = "fresh"
+OUTCOME_SEGREDO = "segredo"
+OUTCOME_NOT_FOUND = "not_found"
+OUTCOME_ERROR = "error"
+
+DEFAULT_TTLS = {
+    OUTCOME_FRESH: RESULT_CACHE_TTL_FRESH,
+    OUTCOME_SEGREDO: RESULT_CACHE_TTL_SEGREDO,
+    OUTCOME_NOT_FOUND: RESULT_CACHE_TTL_NOT_FOUND,
+}
+
+def normalize_process_number(process_number):
+    """Chave do cache: apenas os dígitos do número do processo."""
+    return ''.join(filter(str.isdigit, str(process_number)))
+
+def classify_outcome(date, description):
+    """
+    Classifica um resultado de consulta para definir sua validade no cache.
+
+    Returns:
+        str: OUTCOME_SEGREDO, OUTCOME_NOT_FOUND, OUTCOME_FRESH (movimentação com data) ou
+             OUTCOME_ERROR (qualquer outro caso, nunca armazenado).
+    """
+    if description == STATUS_SEGREDO_JUSTICA:
+        return OUTCOME_SEGREDO
+    if description == PROJUDI_PROCESS_NAO_ENCONTRADO:
+        return OUTCOME_NOT_FOUND
+    if date and date not in (STATUS_NAO_DISPONIVEL, STATUS_DATA_NAO_ENCONTRADA):
+        return OUTCOME_FRESH
+    return OUTCOME_ERROR
+
+class ResultCache:
+    """
+    Cache persistente de resultados, indexado pelo número normalizado do processo.
+    Pode ser usado a partir de várias threads.
+    """
+    def __init__(self, db_path=RESULT_CACHE_DB_PATH, ttls=None):
+        self.db_path = db_path
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                process_key TEXT PRIMARY KEY,
+                date TEXT,
+                description TEXT,
+                executed_name TEXT,
+                source TEXT,
+                outcome TEXT,
+                fetched_at REAL
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, process_number):
+        """
+        Retorna o resultado em cache ainda válido para o processo.
+
+        Returns:
+            tuple or None: (data, descricao, nome_executado, sistema_de_origem), ou None se não houver
+                           entrada ou se ela tiver expirado.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT date, description, executed_name, source, outcome, fetched_at FROM results WHERE process_key = ?",
+                (normalize_process_number(process_number),)
+            ).fetchone()
+        if row is None:
+            return None
+        date, description, executed_name, source, outcome, fetched_at = row
+        ttl = self.ttls.get(outcome)
+        # Entradas gravadas com uma classificação que não vale mais (por exemplo, erros armazenados por versões anteriores).
+        if ttl is None or outcome != classify_outcome(date, description) or time.time() - fetched_at > ttl:
+            return None
+        return date, description, executed_name, source
+
+    def put(self, process_number, date, description, executed_name, source):
+        """
+        Armazena o resultado de uma consulta. Resultados de erro não são armazenados.
+
+        Returns:
+            bool: True se o resultado foi armazenado.
+        """
+        outcome = classify_outcome(date, description)
+        if outcome == OUTCOME_ERROR:
+            return False
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (process_key, date, description, executed_name, source, outcome, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (normalize_process_number(process_number), str(date), str(description), str(executed_name),
+                 source, outcome, time.time())
+            )
+            self._conn.commit()
+        return True
+
+    def close(self):
+        with self._lock:
+            try:
+                self._conn.close()
+            except sqlite3.Error as e:
+                logging.warning(f"Erro ao fechar o cache de resultados: {e}")
@@ -0,0 +1,179 @@
+# Este módulo define os formatos do arquivo de resultados. Todos os escritores têm a interface de
+# `StreamingExcelWriter` (append, rows_written, finalize, discard): as linhas são gravadas em um arquivo
+# temporário à medida que ficam prontas, e `finalize` o move para o destino escolhido.
+# CSV é gravado linha a linha; Parquet e Arrow IPC, em blocos de `RESULT_WRITER_BATCH_ROWS` linhas,
+# com todas as colunas como texto. O pyarrow é opcional: só é necessário para esses dois formatos.
+import csv
+import logging
+import os
+import shutil
+import tempfile
+
+from utils.excel_handler import StreamingExcelWriter
+from utils.metrics import span, STAGE_OUTPUT_WRITE, STAGE_OUTPUT_SAVE
+from utils.constants import OUTPUT_FORMAT_DEFAULT, RESULT_WRITER_BATCH_ROWS
+
+def require_pyarrow(feature):
+    """
+    Raises:
+        ImportError: Se o pyarrow não estiver instalado (a mensagem cita `feature`).
+    """
+    try:
+        import pyarrow # noqa: F401
+        import pyarrow.parquet # noqa: F401
+    except ImportError as e:
+        raise ImportError(f"{feature} requer o pacote pyarrow (pip install pyarrow).") from e
+
+class _TempFileWriter:
+    """Base dos escritores que gravam em um arquivo temporário e o movem para o destino em `finalize`."""
+    extension = ""
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.rows_written = 0
+        fd, self._temp_path = tempfile.mkstemp(suffix=self.extension)
+        os.close(fd)
+
+    def _close(self):
+        raise NotImplementedError
+
+    def finalize(self, output_file_path):
+        """
+        Conclui o arquivo e o move para `output_file_path`.
+
+        Returns:
+            str or None: O caminho do arquivo salvo, ou None em caso de erro.
+        """
+        try:
+            with span(STAGE_OUTPUT_SAVE):
+                self._close()
+                shutil.move(self._temp_path, output_file_path)
+            logging.info(f"Resultados salvos em:\n{output_file_path}")
+            return output_file_path
+        except Exception as e:
+            logging.error("Não foi possível salvar o arquivo de resultados: %s", e, exc_info=True)
+            return None
+
+    def discard(self):
+        """Descarta o arquivo temporário (por exemplo, se o usuário cancelar o salvamento)."""
+        try:
+            self._close()
+        except Exception:
+            pass
+        try:
+            os.remove(self._temp_path)
+        except OSError:
+            pass
+
+class StreamingCsvWriter(_TempFileWriter):
+    """Resultados em CSV (UTF-8, separados por vírgula), gravados linha a linha."""
+    extension = ".csv"
+    file_type_label = "CSV files"
+
+    def __init__(self, columns):
+        super().__init__(columns)
+        self._file = open(self._temp_path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.columns)
+
+    def append(self, row):
+        """Adiciona uma linha (dicionário indexado pelos nomes das colunas)."""
+        with span(STAGE_OUTPUT_WRITE):
+            self._writer.writerow([row.get(column, "") for column in self.columns])
+        self.rows_written += 1
+
+    def _close(self):
+        self._file.close()
+
+class _ArrowBatchWriter(_TempFileWriter):
+    """Base dos formatos do pyarrow: as linhas são acumuladas por coluna e gravadas em blocos."""
+    feature = ""
+
+    def __init__(self, columns, batch_rows=RESULT_WRITER_BATCH_ROWS):
+        require_pyarrow(self.feature)
+        import pyarrow as pa
+
+        super().__init__(columns)
+        self.batch_rows = max(1, batch_rows)
+        self._schema = pa.schema([(column, pa.string()) for column in self.columns])
+        self._batch = {column: [] for column in self.columns}
+        self._pending = 0
+        self._sink = self._open_sink(self._temp_path, self._schema)
+
+    def _open_sink(self, path, schema):
+        raise NotImplementedError
+
+    def append(self, row):
+        """Adiciona uma linha (dicionário indexado pelos nomes das colunas)."""
+        with span(STAGE_OUTPUT_WRITE):
+            for column in self.columns:
+                self._batch[column].append(str(row.get(column, "")))
+            self._pending += 1
+            if self._pending >= self.batch_rows:
+                self._write_batch()
+        self.rows_written += 1
+
+    def _write_batch(self):
+        import pyarrow as pa
+
+        if not self._pending:
+            return
+        self._sink.write_batch(pa.record_batch([self._batch[column] for column in self.columns], schema=self._schema))
+        self._batch = {column: [] for column in self.columns}
+        self._pending = 0
+
+    def _close(self):
+        if self._sink is None:
+            return
+        self._write_batch()
+        self._sink.close()
+        self._sink = None
+
+class ParquetResultWriter(_ArrowBatchWriter):
+    """Resultados em Parquet; cada bloco de linhas vira um row group."""
+    extension = ".parquet"
+    file_type_label = "Parquet files"
+    feature = "O formato Parquet"
+
+    def _open_sink(self, path, schema):
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(path, schema)
+
+class ArrowIpcResultWriter(_ArrowBatchWriter):
+    """Resultados em Arrow IPC (formato de arquivo, legível com `pyarrow.ipc.open_file` ou Feather)."""
+    extension = ".arrow"
+    file_type_label = "Arrow IPC files"
+    feature = "O formato Arrow IPC"
+
+    def _open_sink(self, path, schema):
+        import pyarrow as pa
+        return pa.ipc.new_file(path, schema)
+
+# formato -> classe do escritor
+RESULT_WRITERS = {
+    "xlsx": StreamingExcelWriter,
+    "csv": StreamingCsvWriter,
+    "parquet": ParquetResultWriter,
+    "arrow": ArrowIpcResultWriter,
+}
+
+def create_result_writer(output_format, columns):
+    """
+    Cria o escritor do arquivo de resultados no formato indicado.
+
+    Raises:
+        ValueError: Se o formato não for conhecido.
+        ImportError: Se o formato exigir o pyarrow e ele não estiver instalado.
+    """
+    writer_class = RESULT_WRITERS.get(output_format)
+    if writer_class is None:
+        raise ValueError(f"Formato de resultados desconhecido: {output_format} (use {', '.join(RESULT_WRITERS)}).")
+    return writer_class(columns)
+
+def format_for_path(path, default=OUTPUT_FORMAT_DEFAULT):
+    """Formato correspondente à extensão do arquivo (`default` se a extensão não for reconhecida)."""
+    extension = os.path.splitext(path or "")[1].lower()
+    for output_format, writer_class in RESULT_WRITERS.items():
+        if writer_class.extension == extension:
+            return output_format
+    return default
@@ -0,0 +1,119 @@
+# Este módulo mantém um índice (SQLite) de em qual sistema (SAJ ou PROJUDI) cada processo foi
+# resolvido pela última vez, além de estatísticas por segmento de origem (J.TR.OOOO) e ano.
+# Processos conhecidos (ou previstos) como do PROJUDI são consultados direto no PROJUDI,
+# sem a requisição ao SAJ que só levaria ao fallback.
+import logging
+import sqlite3
+import threading
+import time
+
+from utils.result_cache import normalize_process_number
+from utils.constants import (
+    SOURCE_SAJ, SOURCE_PROJUDI, ROUTING_INDEX_DB_PATH, ROUTING_MIN_SEGMENT_SAMPLES, ROUTING_PROJUDI_SHARE
+)
+
+def segment_key(process_number):
+    """
+    Chave do segmento de origem de um número CNJ: "J.TR.OOOO/AAAA" (justiça, tribunal, foro e ano).
+
+    Returns:
+        str or None: A chave, ou None se o número não tiver 20 dígitos.
+    """
+    digits = normalize_process_number(process_number)
+    if len(digits) != 20:
+        return None
+    return f"{digits[13]}.{digits[14:16]}.{digits[16:20]}/{digits[9:13]}"
+
+class RoutingIndex:
+    """
+    Índice persistente de roteamento entre SAJ e PROJUDI. Pode ser usado a partir de várias threads.
+    """
+    def __init__(self, db_path=ROUTING_INDEX_DB_PATH, min_segment_samples=ROUTING_MIN_SEGMENT_SAMPLES,
+                 projudi_share=ROUTING_PROJUDI_SHARE):
+        self.db_path = db_path
+        self.min_segment_samples = min_segment_samples
+        self.projudi_share = projudi_share
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS process_routes (
+                process_key TEXT PRIMARY KEY,
+                system TEXT,
+                updated_at REAL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS segment_routes (
+                segment_key TEXT PRIMARY KEY,
+                saj_count INTEGER DEFAULT 0,
+                projudi_count INTEGER DEFAULT 0,
+                updated_at REAL
+            )
+        """)
+        self._conn.commit()
+
+    def predict(self, process_number):
+        """
+        Prevê em qual sistema o processo deve ser consultado primeiro.
+
+        Returns:
+            str or None: `SOURCE_PROJUDI` ou `SOURCE_SAJ` quando o processo já foi resolvido antes,
+                         `SOURCE_PROJUDI` quando quase todos os processos do mesmo segmento/ano estão
+                         no PROJUDI, ou None (sem previsão: consulta o SAJ primeiro, como de costume).
+        """
+        key = segment_key(process_number)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT system FROM process_routes WHERE process_key = ?", (normalize_process_number(process_number),)
+            ).fetchone()
+            if row is not None:
+                return row[0]
+            if key is None:
+                return None
+            counts = self._conn.execute(
+                "SELECT saj_count, projudi_count FROM segment_routes WHERE segment_key = ?", (key,)
+            ).fetchone()
+        if counts is None:
+            return None
+        saj_count, projudi_count = counts
+        total = saj_count + projudi_count
+        if total >= self.min_segment_samples and projudi_count / total >= self.projudi_share:
+            return SOURCE_PROJUDI
+        return None
+
+    def record(self, process_number, system):
+        """
+        Registra o sistema em que o processo foi resolvido (apenas resultados conclusivos devem ser registrados).
+        Cada processo conta uma única vez nas estatísticas do segmento: uma nova consulta no mesmo sistema não
+        altera as contagens, e uma mudança de sistema transfere a contagem do sistema anterior para o novo.
+        """
+        if system not in (SOURCE_SAJ, SOURCE_PROJUDI):
+            return
+        now = time.time()
+        key = segment_key(process_number)
+        process_key = normalize_process_number(process_number)
+        with self._lock:
+            row = self._conn.execute("SELECT system FROM process_routes WHERE process_key = ?", (process_key,)).fetchone()
+            previous = row[0] if row is not None else None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO process_routes (process_key, system, updated_at) VALUES (?, ?, ?)",
+                (process_key, system, now)
+            )
+            if key is not None and previous != system:
+                saj_delta = (system == SOURCE_SAJ) - (previous == SOURCE_SAJ)
+                projudi_delta = (system == SOURCE_PROJUDI) - (previous == SOURCE_PROJUDI)
+                self._conn.execute(
+                    "INSERT INTO segment_routes (segment_key, saj_count, projudi_count, updated_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(segment_key) DO UPDATE SET saj_count = MAX(0, saj_count + ?), "
+                    "projudi_count = MAX(0, projudi_count + ?), updated_at = excluded.updated_at",
+                    (key, max(0, saj_delta), max(0, projudi_delta), now, saj_delta, projudi_delta)
+                )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            try:
+                self._conn.close()
+            except sqlite3.Error as e:
+                logging.warning(f"Erro ao fechar o índice de roteamento: {e}")
@@ -0,0 +1,88 @@
+# Este módulo guarda (SQLite), para cada processo, o hash do trecho relevante da última página do SAJ,
+# os validadores enviados pelo servidor (ETag/Last-Modified) e o resultado extraído dela.
+# Em uma nova consulta, se o SAJ responder 304 ou a página tiver o mesmo hash, o resultado anterior
+# é reaproveitado sem parsing, e o lote informa quantas páginas mudaram e quantas não.
+import collections
+import logging
+import sqlite3
+import threading
+import time
+
+from utils.result_cache import normalize_process_number
+from utils.constants import SAJ_FINGERPRINTS_DB_PATH
+
+# Situação de uma página em relação à consulta anterior
+PAGE_NEW = "new"
+PAGE_CHANGED = "changed"
+PAGE_UNCHANGED = "unchanged"
+
+# Última página conhecida de um processo: hash do trecho relevante, validadores HTTP (ou None) e
+# o resultado de `parse_saj_page` (data, descricao, nome_executado, motivo_fallback).
+StoredPage = collections.namedtuple("StoredPage", ["content_hash", "etag", "last_modified", "parsed"])
+
+class SajFingerprintStore:
+    """
+    Registro persistente das páginas do SAJ já interpretadas. Pode ser usado a partir de várias threads.
+    """
+    def __init__(self, db_path=SAJ_FINGERPRINTS_DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._counts = collections.Counter()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS saj_pages (
+                process_key TEXT PRIMARY KEY,
+                content_hash TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                date TEXT,
+                description TEXT,
+                executed_name TEXT,
+                fallback_reason TEXT,
+                updated_at REAL
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, process_number):
+        """
+        Returns:
+            StoredPage or None: A última página registrada do processo, ou None se ele nunca foi consultado.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash, etag, last_modified, date, description, executed_name, fallback_reason "
+                "FROM saj_pages WHERE process_key = ?",
+                (normalize_process_number(process_number),)
+            ).fetchone()
+        if row is None:
+            return None
+        return StoredPage(row[0], row[1], row[2], tuple(row[3:]))
+
+    def put(self, process_number, content_hash, etag, last_modified, parsed):
+        """Registra a página atual do processo e o resultado extraído dela."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO saj_pages (process_key, content_hash, etag, last_modified, date, description, "
+                "executed_name, fallback_reason, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (normalize_process_number(process_number), content_hash, etag, last_modified, *parsed, time.time())
+            )
+            self._conn.commit()
+
+    def count(self, page_state):
+        """Contabiliza uma página como `PAGE_NEW`, `PAGE_CHANGED` ou `PAGE_UNCHANGED`."""
+        with self._lock:
+            self._counts[page_state] += 1
+
+    def stats(self):
+        """Contagem de páginas novas, alteradas e sem alteração desde a criação do registro."""
+        with self._lock:
+            return {state: self._counts[state] for state in (PAGE_NEW, PAGE_CHANGED, PAGE_UNCHANGED)}
+
+    def close(self):
+        with self._lock:
+            try:
+                self._conn.close()
+            except sqlite3.Error as e:
+                logging.warning(f"Erro ao fechar o registro de páginas do SAJ: {e}")
@@ -0,0 +1,67 @@
+# Este módulo guarda (SQLite) a última movimentação conhecida de cada processo acompanhado no modo
+# de acompanhamento (cli.py --watch) e quando ele foi verificado pela última vez, para que cada nova
+# verificação informe apenas os processos com movimentação nova.
+import collections
+import logging
+import sqlite3
+import threading
+import time
+
+from utils.result_cache import normalize_process_number
+from utils.constants import WATCH_STATE_DB_PATH
+
+# Última situação conhecida de um processo; `checked_at` é o instante (time.time()) da verificação.
+WatchedProcess = collections.namedtuple(
+    "WatchedProcess", ["date", "description", "executed_name", "source", "checked_at"]
+)
+
+class WatchState:
+    """
+    Situação persistente dos processos acompanhados. Pode ser usada a partir de várias threads.
+    """
+    def __init__(self, db_path=WATCH_STATE_DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS watched_processes (
+                process_key TEXT PRIMARY KEY,
+                date TEXT,
+                description TEXT,
+                executed_name TEXT,
+                source TEXT,
+                checked_at REAL
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, process_number):
+        """
+        Returns:
+            WatchedProcess or None: A última situação conhecida, ou None se o processo nunca foi verificado.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT date, description, executed_name, source, checked_at FROM watched_processes WHERE process_key = ?",
+                (normalize_process_number(process_number),)
+            ).fetchone()
+        return WatchedProcess(*row) if row is not None else None
+
+    def record(self, process_number, date, description, executed_name, source):
+        """Registra a situação atual do processo, verificada agora."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO watched_processes (process_key, date, description, executed_name, source, checked_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (normalize_process_number(process_number), str(date), str(description), str(executed_name), source,
+                 time.time())
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            try:
+                self._conn.close()
+            except sqlite3.Error as e:
+                logging.warning(f"Erro ao fechar o registro de processos acompanhados: {e}")